@@ -0,0 +1,218 @@
+"""Throughput and memory benchmarks of the data pipeline scripts.
+
+For every scale, a synthetic benchmark (see synthetic_benchmark.py) is written
+to a scratch directory and each script is run on it as a subprocess, so its
+wall time, CPU time and peak RSS are measured in isolation. Worker processes are
+not included in the RSS, so the scripts run with ``--jobs 1``.
+
+Results are written as JSON; pass a previous results file with ``--compare`` to
+print the change of every measurement against it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import click
+
+from synthetic_benchmark import Shape, write_synthetic_benchmark
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+SCALES: dict[str, Shape] = {
+    "small": Shape(games=3, seeds=8, models=6, rounds=10, tokens=32),
+    "medium": Shape(games=3, seeds=60, models=10, rounds=20, tokens=64),
+    "large": Shape(games=3, seeds=250, models=10, rounds=30, tokens=128),
+}
+
+
+@dataclass
+class Measurement:
+    scale: str
+    case: str
+    entries: int
+    input_bytes: int
+    wall_s: list[float]
+    cpu_s: list[float]
+    max_rss_kb: int
+
+    @property
+    def wall_median(self) -> float:
+        return statistics.median(self.wall_s)
+
+
+CASES = ("find_switchiest", "export_csv", "export_json", "extract", "generate_daily_games")
+
+
+def _cases(bench: Path, out: Path) -> dict[str, list[str]]:
+    """Command line of every benchmarked case, relative to the scripts directory."""
+    return {
+        "index": ["-c", f"from benchmark_index import build_index; build_index(__import__('pathlib').Path({str(bench)!r}))"],
+        "find_switchiest": [
+            "find_switchiest.py", "--game-data", str(bench), "--output", str(out / "switchiest.json"), "--jobs", "1",
+        ],
+        "export_csv": [
+            "export_barrace_csv.py", "--game-data", str(bench), "--game-name", "Condense", "--seed", "1000",
+            "--output", str(out / "export.csv"), "--format", "csv",
+        ],
+        "export_json": [
+            "export_barrace_csv.py", "--game-data", str(bench), "--game-name", "Condense", "--seed", "1000",
+            "--output", str(out / "export.json"), "--format", "json",
+        ],
+        "extract": ["extract.py", str(bench), "--game", "Condense", "--seed", "1000"],
+        "generate_daily_games": [
+            "generate_daily_games.py", "--benchmark-file", str(bench), "--output-dir", str(out / "daily"),
+            "--games-dir", str(out / "games"), "--year", "2025", "--month", "1", "--jobs", "1", "--no-precompress",
+        ],
+    }
+
+
+def _run(args: list[str]) -> tuple[float, float, int]:
+    """Run a script; return (wall seconds, CPU seconds, peak RSS in KB)."""
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, *args], cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, stderr=stderr
+        )
+        # wait4 rather than wait, for the resource usage of this child alone
+        _pid, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            stderr.seek(0)
+            message = stderr.read().decode(errors="replace")
+            raise click.ClickException(f"{args[0]} failed:\n{message}")
+    return wall, usage.ru_utime + usage.ru_stime, usage.ru_maxrss
+
+
+def _reset(bench: Path, out: Path) -> None:
+    # Every run starts from scratch: no outputs, manifests or extract results
+    shutil.rmtree(out, ignore_errors=True)
+    shutil.rmtree(bench.parent / bench.stem, ignore_errors=True)
+    out.mkdir()
+
+
+def run_scale(name: str, shape: Shape, cases: list[str], repeat: int, workdir: Path) -> list[Measurement]:
+    bench = workdir / name / "benchmarkResults.json"
+    out = workdir / name / "out"
+    click.echo(f"[{name}] writing {shape.entries} entries...", err=True)
+    entries = write_synthetic_benchmark(bench, shape)
+    commands = _cases(bench, out)
+
+    # Build the sidecar index once, so the other cases measure warm reads
+    _run(commands["index"])
+
+    results = []
+    for case in cases:
+        walls: list[float] = []
+        cpus: list[float] = []
+        rss = 0
+        for _ in range(repeat):
+            _reset(bench, out)
+            wall, cpu, peak = _run(commands[case])
+            walls.append(wall)
+            cpus.append(cpu)
+            rss = max(rss, peak)
+        m = Measurement(name, case, entries, bench.stat().st_size, walls, cpus, rss)
+        click.echo(f"[{name}] {case:<22} {m.wall_median:8.3f} s  {rss / 1024:8.1f} MB", err=True)
+        results.append(m)
+    return results
+
+
+def _compare(results: list[Measurement], baseline: dict[str, Any]) -> None:
+    previous = {(r["scale"], r["case"]): r for r in baseline["results"]}
+    click.echo(f"{'Scale':<8} {'Case':<22} {'Time':>18} {'Peak RSS':>20}")
+    for m in results:
+        old = previous.get((m.scale, m.case))
+        if old is None:
+            continue
+        old_wall = statistics.median(old["wall_s"])
+        click.echo(
+            f"{m.scale:<8} {m.case:<22} "
+            f"{old_wall:7.3f} -> {m.wall_median:7.3f} s "
+            f"{old['max_rss_kb'] / 1024:7.1f} -> {m.max_rss_kb / 1024:7.1f} MB"
+        )
+
+
+@click.command()
+@click.option(
+    "--scale",
+    "scales",
+    type=click.Choice(list(SCALES)),
+    multiple=True,
+    default=("small", "medium"),
+    show_default=True,
+    help="Benchmark scale (repeatable).",
+)
+@click.option(
+    "--case",
+    "cases",
+    type=click.Choice(CASES),
+    multiple=True,
+    help="Script to benchmark (repeatable).  [default: all]",
+)
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True, help="Runs per case.")
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
+    default=Path("bench_results.json"),
+    show_default=True,
+    help="Where to write the results JSON.",
+)
+@click.option(
+    "--compare",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
+    help="Previous results JSON to compare against.",
+)
+@click.option(
+    "--workdir",
+    type=click.Path(path_type=Path, file_okay=False, dir_okay=True),
+    help="Scratch directory for the synthetic benchmarks.  [default: a temporary directory]",
+)
+def main(
+    scales: tuple[str, ...],
+    cases: tuple[str, ...],
+    repeat: int,
+    output: Path,
+    compare: Path | None,
+    workdir: Path | None,
+) -> None:
+    """Time and memory-profile the pipeline scripts on synthetic benchmarks."""
+    selected = list(cases) or list(CASES)
+    with tempfile.TemporaryDirectory(prefix="xega-bench-") as tmp:
+        root = workdir or Path(tmp)
+        results = [
+            m
+            for name in scales
+            for m in run_scale(name, SCALES[name], selected, repeat, root)
+        ]
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scales": {name: asdict(SCALES[name]) for name in scales},
+        "results": [asdict(m) for m in results],
+    }
+    output.write_text(json.dumps(report, indent=1))
+    click.echo(f"Wrote {len(results)} measurements to {output}.")
+
+    if compare is not None:
+        _compare(results, json.loads(compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
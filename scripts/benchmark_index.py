@@ -0,0 +1,158 @@
+"""Sidecar index of a benchmark file by (game, map_seed, model).
+
+The index is a small SQLite database next to the benchmark
+(``benchmarkResults.json.idx.sqlite``) holding the byte range of every entry, so
+tools that need one (game, seed) can seek straight to its entries instead of
+parsing the whole file. It is built on first use and rebuilt whenever the
+benchmark's size or mtime no longer match the ones recorded at build time.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+from benchmark_io import fingerprint, iter_game_result_spans, read_game_result
+from benchmark_records import get_game_name, get_model, get_seed
+
+INDEX_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE entries (
+    ord INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    seed TEXT NOT NULL,
+    model TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX entries_by_key ON entries (game, seed, model);
+"""
+
+
+def index_path(benchmark: Path) -> Path:
+    return benchmark.with_name(benchmark.name + ".idx.sqlite")
+
+
+def _entry_key(entry: dict[str, Any]) -> tuple[str, str, str]:
+    # The same accessors as a plain pass over the benchmark, so both group alike
+    return get_game_name(entry), get_seed(entry), get_model(entry)
+
+
+def _meta(benchmark: Path) -> dict[str, str]:
+    # The meta table holds strings
+    return {
+        "version": str(INDEX_VERSION),
+        **{key: str(value) for key, value in fingerprint(benchmark).items()},
+    }
+
+
+def _is_fresh(path: Path, benchmark: Path) -> bool:
+    if not path.exists():
+        return False
+    try:
+        with closing(sqlite3.connect(path)) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        return False
+    return meta == _meta(benchmark)
+
+
+def build_index(benchmark: Path) -> Path:
+    """(Re)build the index of ``benchmark`` with one streaming pass over it."""
+    path = index_path(benchmark)
+    meta = _meta(benchmark)
+    temp_path = path.with_suffix(".tmp")
+    temp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany(
+            "INSERT INTO entries (game, seed, model, offset, length) VALUES (?, ?, ?, ?, ?)",
+            (
+                (*_entry_key(entry), offset, length)
+                for offset, length, entry in iter_game_result_spans(
+                    benchmark, skip_xrt_history=True
+                )
+            ),
+        )
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        conn.commit()
+    finally:
+        conn.close()
+    temp_path.replace(path)
+    return path
+
+
+class BenchmarkIndex:
+    """Read access to a benchmark file through its sidecar index."""
+
+    def __init__(self, benchmark: Path, *, rebuild: bool = False) -> None:
+        self.benchmark = benchmark
+        path = index_path(benchmark)
+        if rebuild or not _is_fresh(path, benchmark):
+            build_index(benchmark)
+        self._conn = sqlite3.connect(path)
+
+    def __enter__(self) -> BenchmarkIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def games(self) -> list[str]:
+        rows = self._conn.execute("SELECT DISTINCT game FROM entries ORDER BY game")
+        return [game for (game,) in rows]
+
+    def seeds(self, game: str) -> list[str]:
+        rows = self._conn.execute(
+            "SELECT DISTINCT seed FROM entries WHERE game = ? ORDER BY seed", (game,)
+        )
+        return [seed for (seed,) in rows]
+
+    def groups(self) -> list[tuple[str, str]]:
+        """All (game, seed) pairs, in order of first appearance in the benchmark."""
+        rows = self._conn.execute(
+            "SELECT game, seed FROM entries GROUP BY game, seed ORDER BY MIN(ord)"
+        )
+        return [(game, seed) for game, seed in rows]
+
+    def spans(
+        self, game: str, seed: str, model: str | None = None
+    ) -> list[tuple[int, int]]:
+        query = "SELECT offset, length FROM entries WHERE game = ? AND seed = ?"
+        params: tuple[str, ...] = (game, seed)
+        if model is not None:
+            query += " AND model = ?"
+            params += (model,)
+        return list(self._conn.execute(query + " ORDER BY ord", params))
+
+    def iter_entries(
+        self, game: str, seed: str, model: str | None = None, *, skip_xrt_history: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the entries of one (game, seed), in benchmark order.
+
+        ``skip_xrt_history`` drops the histories, as in ``iter_game_results``.
+        """
+        return self._read(self.spans(game, seed, model), skip_xrt_history)
+
+    def iter_group_entries(
+        self, groups: Iterable[tuple[str, str]]
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the entries of several (game, seed) groups, in benchmark order."""
+        spans = sorted(span for game, seed in groups for span in self.spans(game, seed))
+        return self._read(spans)
+
+    def _read(
+        self, spans: list[tuple[int, int]], skip_xrt_history: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        with self.benchmark.open("rb") as f:
+            for offset, length in spans:
+                yield read_game_result(f, offset, length, skip_xrt_history=skip_xrt_history)
@@ -0,0 +1,248 @@
+"""Streaming access to benchmark JSON files.
+
+Benchmark files (``benchmarkResults.json``) are too large to ``json.load`` in
+one go. The helpers here walk the top-level ``game_results`` array and decode
+one entry at a time, so peak memory is bounded by the largest single entry.
+
+Both the full benchmark layout (``{"game_results": [...], ...}``) and the bare
+list written by ``extract.py`` / ``generate_daily_games.py`` are accepted.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+# A value cut by the end of the window fails to decode at most this many
+# characters before it (e.g. in ``tru`` or ``\ud83d\ude``), or in a string
+# running up to it
+_CUT_MARGIN = 16
+
+
+def _utf8_len(s: str) -> int:
+    return len(s) if s.isascii() else len(s.encode("utf-8"))
+
+
+class _Reader:
+    """Growable text window over a UTF-8 file, decoded incrementally.
+
+    With ``track_offsets``, ``span`` holds the byte range of the last value;
+    ``offset`` is the byte position ``f`` starts at.
+    """
+
+    def __init__(self, f: BinaryIO, *, track_offsets: bool = False, offset: int = 0) -> None:
+        self._f = f
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.track_offsets = track_offsets
+        self.span = (0, 0)
+        # Byte offset of buf[_mark]; only ever moves forward
+        self._mark = 0
+        self._mark_bytes = offset
+
+    def byte_offset(self, idx: int) -> int:
+        self._mark_bytes += _utf8_len(self.buf[self._mark : idx])
+        self._mark = idx
+        return self._mark_bytes
+
+    def fill(self, size: int = CHUNK_SIZE) -> bool:
+        """Read more data, dropping the consumed prefix. False at end of file."""
+        if self.eof:
+            return False
+        if self.pos:
+            if self.track_offsets:
+                self.byte_offset(self.pos)
+                self._mark = 0
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        raw = self._f.read(size)
+        if not raw:
+            self.eof = True
+            self.buf += self._utf8.decode(b"", final=True)
+            return False
+        self.buf += self._utf8.decode(raw)
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            n = len(self.buf)
+            while self.pos < n and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < n:
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"Malformed benchmark JSON: expected one of {chars!r}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading more data until it is complete."""
+        self.peek()
+        start = self.byte_offset(self.pos) if self.track_offsets else 0
+        size = CHUNK_SIZE
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Only a value cut by the window is worth reading more for; grow
+                # geometrically so a huge entry is re-attempted O(log n) times only.
+                cut = len(self.buf) - e.pos <= _CUT_MARGIN or e.msg.startswith("Unterminated string")
+                if not cut or not self.fill(size):
+                    raise
+                size *= 2
+                continue
+            if end == len(self.buf) and not self.eof:
+                # A trailing number may continue in the next chunk.
+                self.fill(size)
+                continue
+            self.pos = end
+            if self.track_offsets:
+                self.span = (start, self.byte_offset(end))
+            return value
+
+
+def _strip_xrt_history(entry: dict[str, Any]) -> None:
+    for run in entry.get("game_results") or []:
+        if isinstance(run, dict):
+            run.pop("xrt_history", None)
+
+
+def _iter_array(reader: _Reader) -> Iterator[Any]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    yield from _iter_items(reader)
+
+
+def _iter_items(reader: _Reader) -> Iterator[Any]:
+    """The remaining values of an array, after its ``[`` or a ``,``."""
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+def _iter_entries(reader: _Reader) -> Iterator[Any]:
+    ch = reader.peek()
+    if ch == "[":
+        yield from _iter_array(reader)
+        return
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "game_results":
+            yield from _iter_array(reader)
+        else:
+            reader.value()
+        if reader.expect(",}") == "}":
+            return
+
+
+def iter_game_results(
+    path: Path, *, skip_xrt_history: bool = False
+) -> Iterator[dict[str, Any]]:
+    """Yield the entries of a benchmark file's ``game_results`` one at a time.
+
+    With ``skip_xrt_history`` the (bulky) ``xrt_history`` of every run is
+    dropped as soon as the entry is decoded, for callers that only need scores.
+    """
+    with path.open("rb") as f:
+        for entry in _iter_entries(_Reader(f)):
+            if skip_xrt_history and isinstance(entry, dict):
+                _strip_xrt_history(entry)
+            yield entry
+
+
+def iter_game_result_spans(
+    path: Path, *, skip_xrt_history: bool = False
+) -> Iterator[tuple[int, int, dict[str, Any]]]:
+    """Like :func:`iter_game_results`, yielding ``(offset, length, entry)``.
+
+    ``offset`` and ``length`` are the byte range of the entry in the file, to be
+    read back later with :func:`read_game_result`.
+    """
+    with path.open("rb") as f:
+        reader = _Reader(f, track_offsets=True)
+        for entry in _iter_entries(reader):
+            start, end = reader.span
+            if skip_xrt_history and isinstance(entry, dict):
+                _strip_xrt_history(entry)
+            yield start, end - start, entry
+
+
+def iter_appended_spans(
+    path: Path, end: int, *, skip_xrt_history: bool = False
+) -> Iterator[tuple[int, int, dict[str, Any]]]:
+    """Like :func:`iter_game_result_spans`, for the entries after byte ``end``.
+
+    ``end`` is where an entry of the ``game_results`` array ends (the end of its
+    last span in a previous pass), so a file that has only grown since is read
+    from there instead of from the start.
+    """
+    with path.open("rb") as f:
+        f.seek(end)
+        reader = _Reader(f, track_offsets=True, offset=end)
+        if reader.expect(",]") == "]":
+            return
+        for entry in _iter_items(reader):
+            start, stop = reader.span
+            if skip_xrt_history and isinstance(entry, dict):
+                _strip_xrt_history(entry)
+            yield start, stop - start, entry
+
+
+def read_game_result(
+    f: BinaryIO, offset: int, length: int, *, skip_xrt_history: bool = False
+) -> dict[str, Any]:
+    """Decode the single entry stored at ``offset`` in an open benchmark file."""
+    f.seek(offset)
+    entry = json.loads(f.read(length))
+    if skip_xrt_history and isinstance(entry, dict):
+        _strip_xrt_history(entry)
+    return entry
+
+
+def fingerprint(path: Path) -> dict[str, int]:
+    """Size and modification time of a benchmark file.
+
+    Files derived from a benchmark (index, summary, token store and index, daily
+    games manifest) record it and are rebuilt when it no longer matches.
+    """
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def write_game_results(path: Path, entries: Iterable[dict[str, Any]]) -> int:
+    """Write ``{"game_results": [...]}`` one entry at a time; return the count.
+
+    The bytes match ``json.dump({"game_results": list(entries)}, f)``.
+    """
+    count = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        f.write('{"game_results": [')
+        for entry in entries:
+            if count:
+                f.write(", ")
+            json.dump(entry, f)
+            count += 1
+        f.write("]}")
+    return count
@@ -0,0 +1,158 @@
+"""Typed, compact records of benchmark entries.
+
+Raw entries are deeply nested dicts where every field has to be looked up
+defensively. The records here are built once from a raw entry and keep only
+what the scripts read: the (game, seed, model) key, run scores as an
+``array('d')``, and optionally each run's move and token scores, with token
+strings interned so repeated tokens share one object across runs and models.
+
+The raw accessors (``get_model``, ``run_scores``, ...) are shared by the
+scripts for the places that still work on raw entries.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+
+def get_game_name(entry: dict[str, Any]) -> str:
+    game_meta = (entry.get("game") or {}).get("game") or {}
+    return str(game_meta.get("name", "-"))
+
+
+def get_seed(entry: dict[str, Any]) -> str:
+    """``game.game.map_seed``, falling back to the config's ``game.map_seed``.
+
+    Every script groups entries by this seed, so that grouping through the
+    sidecars and through a plain pass over the benchmark always agree.
+    """
+    config = entry.get("game") or {}
+    game_meta = config.get("game") or {}
+    return str(game_meta.get("map_seed", config.get("map_seed", "-")))
+
+
+def get_model(entry: dict[str, Any]) -> str:
+    players = (entry.get("game") or {}).get("players") or []
+    if not players:
+        return "-"
+    opts = players[0].get("options") or {}
+    return str(opts.get("model", "-"))
+
+
+def run_scores(entry: dict[str, Any]) -> array[float]:
+    """``scores.black`` of every run; missing scores count as 0.0 to keep runs aligned."""
+    scores = array("d")
+    for run in entry.get("game_results", []) or []:
+        s = (run.get("scores") or {}).get("black")
+        scores.append(0.0 if s is None else float(s))
+    return scores
+
+
+def cumulative_max(xs: Sequence[float]) -> list[float]:
+    out: list[float] = []
+    cur = float("-inf")
+    for v in xs:
+        if v > cur:
+            cur = v
+        out.append(cur)
+    return out
+
+
+def move_and_token_pairs(run: dict[str, Any]) -> tuple[str, list[Any] | None]:
+    """First elicited move of a run and the (token, score) pairs of its last token reward."""
+    move = ""
+    token_pairs = None
+    for ev in run.get("xrt_history") or []:
+        t = ev.get("type")
+        if not move and t == "elicit_response":
+            move = ev.get("response") or ""
+        if t == "reward":
+            val = ev.get("value") or {}
+            if val.get("__TokenXentList__"):
+                token_pairs = val.get("pairs")
+                # don't break; still allow move to be found later if needed
+    return move, token_pairs
+
+
+def reward_values(game: str, run: dict[str, Any]) -> list[dict[str, Any]]:
+    """Values of a run's reward events, in the order the web app shows their tokens.
+
+    That is their order in ``xrt_history``, except for Contrast, whose positive
+    (scale 1) text comes before the negative one.
+    """
+    values = [
+        ev.get("value") or {}
+        for ev in run.get("xrt_history") or []
+        if ev.get("type") == "reward"
+    ]
+    if game == "Contrast":
+        values.sort(key=lambda value: -value.get("scale", 1))
+    return values
+
+
+@dataclass(slots=True)
+class TokenScores:
+    """Token strings (interned) and their scores for one reward event."""
+
+    tokens: list[str]
+    # An array of doubles when all scores are floats; otherwise (e.g. integer
+    # scores) the scores as they were, so that pairs() gives back the same values
+    scores: array[float] | list[float]
+
+    @classmethod
+    def from_pairs(cls, pairs: list[Any]) -> TokenScores:
+        scores = [score for _tok, score in pairs]
+        return cls(
+            [sys.intern(str(tok)) for tok, _score in pairs],
+            array("d", scores) if all(type(s) is float for s in scores) else scores,
+        )
+
+    def pairs(self) -> list[list[Any]]:
+        return [[tok, score] for tok, score in zip(self.tokens, self.scores)]
+
+
+@dataclass(slots=True)
+class Run:
+    move: str
+    token_scores: TokenScores | None
+
+
+@dataclass(slots=True)
+class Entry:
+    """One benchmark entry: a model's runs on a (game, seed)."""
+
+    game: str
+    seed: str
+    model: str
+    scores: array[float]
+    # Empty unless built with runs=True
+    runs: list[Run]
+
+    @classmethod
+    def from_json(cls, entry: dict[str, Any], *, runs: bool = False) -> Entry:
+        """Build the record of a raw entry; ``runs`` also keeps moves and token scores."""
+        records: list[Run] = []
+        if runs:
+            for run in entry.get("game_results") or []:
+                move, pairs = move_and_token_pairs(run)
+                records.append(
+                    Run(move, TokenScores.from_pairs(pairs) if pairs is not None else None)
+                )
+        return cls(
+            get_game_name(entry),
+            get_seed(entry),
+            get_model(entry),
+            run_scores(entry),
+            records,
+        )
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.game, self.seed
+
+    def cumulative_max(self) -> list[float]:
+        return cumulative_max(self.scores)
@@ -0,0 +1,293 @@
+"""Compact columnar encoding of game files for the web app.
+
+A game file normally is the list of raw benchmark entries of one (game, seed),
+where each round repeats full ``xrt_history`` events and every token string.
+The compact layout keeps only what the site reads, decoded back into that raw
+shape by ``decodeCompactGame`` in ``src/lib/dataset.ts``::
+
+    {
+      "format": "xega-compact",
+      "version": 1,
+      "game": {"name": ..., "map_seed": ...},
+      "precision": 3,                  # fixed-point values are round(x * 10**precision)
+      "tokens": [" the", ...],         # interned token strings
+      "texts": [[0, 5, 2, ...], ...],  # interned token-id sequences of reward events
+      "players": ["gpt-5", ...],       # players[0].id of each entry
+      "results": [                     # one per player
+        {
+          "scores": [13742, ...],      # fixed-point scores.black per round
+          "moves": ["...", ...],       # first elicit_response per round (or null)
+          "rewards": [[[scale, text, [fixed-point token scores]], ...], ...]
+        }
+      ],
+      "events": [...]                  # highlight events (see highlights.py), if numpy is installed
+    }
+
+Reward texts are usually identical across rounds and models (Condense scores
+the same text every round), so they are stored once and referenced by index.
+
+Token scores are most of a game file, but the bar race only needs scores and
+moves. :func:`write_split_game` writes them apart: a race file with the same
+header, the scores and moves, and only the scales of the reward events::
+
+    {
+      "format": "xega-race",
+      "version": 1,
+      "game": ..., "precision": 3, "players": [...],
+      "results": [{"scores": [...], "moves": [...], "scales": [[1], ...]}],
+      "maxAbsScore": 4.571,            # largest |token score|, for the color scale
+      "shards": ["Condense_1003.5d41402abc4b.tokens/0.json", ...],  # one per player, relative
+      "events": [...]
+    }
+
+and next to it one token-score shard per player, fetched by the client when it
+first displays that player's tokens. The shard directory is named after a hash
+of the shards, so a new version is written next to the old one and the race
+file switches between them in one rename::
+
+    {
+      "format": "xega-tokens",
+      "version": 1,
+      "player": "gpt-5",
+      "precision": 3,
+      "tokens": [...], "texts": [...],
+      "rounds": [[[text, [fixed-point token scores]], ...], ...]
+    }
+
+A shard's sequences are in display order (see ``reward_values``), so the client
+does not need the per-game reward conventions to use them.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+from typing import Any
+
+from benchmark_records import reward_values, run_scores
+
+try:
+    import highlights
+except ImportError:  # numpy missing: the client detects events itself
+    highlights = None
+
+FORMAT = "xega-compact"
+RACE_FORMAT = "xega-race"
+SHARD_FORMAT = "xega-tokens"
+VERSION = 1
+DEFAULT_PRECISION = 3
+
+
+class _Interner:
+    def __init__(self) -> None:
+        self.ids: dict[Any, int] = {}
+        self.values: list[Any] = []
+
+    def __call__(self, value: Any) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+
+def _events(entries: list[dict[str, Any]], precision: int) -> list[dict[str, Any]] | None:
+    if highlights is None:
+        return None
+    # Detected on the fixed-point values, which are what the client decodes
+    return highlights.compute_events(entries, highlights.fixed_point(precision))
+
+
+def _game_meta(entries: list[dict[str, Any]]) -> dict[str, Any]:
+    game_meta = entries[0]["game"]["game"] if entries else {}
+    return {"name": game_meta.get("name"), "map_seed": game_meta.get("map_seed")}
+
+
+def encode_compact(
+    entries: list[dict[str, Any]], precision: int = DEFAULT_PRECISION
+) -> dict[str, Any]:
+    """Encode the raw entries of one (game, seed) into the compact layout."""
+    scale = 10**precision
+    tokens = _Interner()
+    texts = _Interner()
+
+    players: list[str] = []
+    results: list[dict[str, Any]] = []
+    for entry in entries:
+        players.append(str(entry["game"]["players"][0]["id"]))
+        scores = [round(score * scale) for score in run_scores(entry)]
+        moves: list[str | None] = []
+        rewards: list[list[list[Any]]] = []
+        for run in entry.get("game_results") or []:
+            move: str | None = None
+            round_rewards: list[list[Any]] = []
+            for ev in run.get("xrt_history") or []:
+                if ev.get("type") == "elicit_response" and move is None:
+                    move = ev.get("response") or ""
+                elif ev.get("type") == "reward":
+                    value = ev.get("value") or {}
+                    pairs = value.get("pairs") or []
+                    text = texts(tuple(tokens(tok) for tok, _score in pairs))
+                    fixed = [round(score * scale) for _tok, score in pairs]
+                    round_rewards.append([value.get("scale", 1), text, fixed])
+            moves.append(move)
+            rewards.append(round_rewards)
+        results.append({"scores": scores, "moves": moves, "rewards": rewards})
+
+    data = {
+        "format": FORMAT,
+        "version": VERSION,
+        "game": _game_meta(entries),
+        "precision": precision,
+        "tokens": tokens.values,
+        "texts": [list(text) for text in texts.values],
+        "players": players,
+        "results": results,
+    }
+    events = _events(entries, precision)
+    if events is not None:
+        data["events"] = events
+    return data
+
+
+def dumps_compact(
+    entries: list[dict[str, Any]], precision: int = DEFAULT_PRECISION
+) -> str:
+    """Compact game file contents, without whitespace (write it as UTF-8)."""
+    return json.dumps(
+        encode_compact(entries, precision), separators=(",", ":"), ensure_ascii=False
+    )
+
+
+def _is_shard_dir(race_file: Path, path: Path) -> bool:
+    # <stem>.<hash>.tokens, or <stem>.tokens as written before shards were versioned
+    return re.fullmatch(re.escape(race_file.stem) + r"(\.[0-9a-f]{12})?\.tokens", path.name) is not None
+
+
+def shard_dir(race_file: Path) -> Path | None:
+    """Directory of the token-score shards a split game file points to (None: no shards)."""
+    with race_file.open(encoding="utf-8") as f:
+        shards = json.load(f)["shards"]
+    return race_file.parent / Path(shards[0]).parent if shards else None
+
+
+def encode_split(
+    entries: list[dict[str, Any]],
+    precision: int = DEFAULT_PRECISION,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Encode one (game, seed) as a race file and one token-score shard per player.
+
+    The race's ``shards`` are the shard file names; prefix them with the
+    location of their directory relative to the race file.
+    """
+    scale = 10**precision
+    game = _game_meta(entries)
+    players: list[str] = []
+    results: list[dict[str, Any]] = []
+    shards: list[dict[str, Any]] = []
+    max_abs = 0
+    for entry in entries:
+        player = str(entry["game"]["players"][0]["id"])
+        tokens = _Interner()
+        texts = _Interner()
+        scores = [round(score * scale) for score in run_scores(entry)]
+        moves: list[str | None] = []
+        scales: list[list[Any]] = []
+        rounds: list[list[list[Any]]] = []
+        for run in entry.get("game_results") or []:
+            moves.append(
+                next(
+                    (
+                        ev.get("response") or ""
+                        for ev in run.get("xrt_history") or []
+                        if ev.get("type") == "elicit_response"
+                    ),
+                    None,
+                )
+            )
+            scales.append(
+                [
+                    (ev.get("value") or {}).get("scale", 1)
+                    for ev in run.get("xrt_history") or []
+                    if ev.get("type") == "reward"
+                ]
+            )
+            sequences: list[list[Any]] = []
+            for value in reward_values(str(game["name"]), run):
+                pairs = value.get("pairs") or []
+                text = texts(tuple(tokens(tok) for tok, _score in pairs))
+                fixed = [round(score * scale) for _tok, score in pairs]
+                max_abs = max(max_abs, max(map(abs, fixed), default=0))
+                sequences.append([text, fixed])
+            rounds.append(sequences)
+        players.append(player)
+        results.append({"scores": scores, "moves": moves, "scales": scales})
+        shards.append(
+            {
+                "format": SHARD_FORMAT,
+                "version": VERSION,
+                "player": player,
+                "precision": precision,
+                "tokens": tokens.values,
+                "texts": [list(text) for text in texts.values],
+                "rounds": rounds,
+            }
+        )
+
+    race = {
+        "format": RACE_FORMAT,
+        "version": VERSION,
+        "game": game,
+        "precision": precision,
+        "players": players,
+        "results": results,
+        "maxAbsScore": max_abs / scale,
+        "shards": [f"{i}.json" for i in range(len(shards))],
+    }
+    events = _events(entries, precision)
+    if events is not None:
+        race["events"] = events
+    return race, shards
+
+
+def write_split_game(
+    race_file: Path, entries: list[dict[str, Any]], precision: int = DEFAULT_PRECISION
+) -> list[Path]:
+    """Write the race file and its token-score shards (see :func:`shard_dir`).
+
+    The shards go to a new directory named after their hash, then the race file
+    is atomically replaced by one pointing to it, and only then are the previous
+    shard directories removed: a reader sees either version, never a race file
+    without its shards. Returns the shard paths.
+    """
+    race, shards = encode_split(entries, precision)
+    contents = [json.dumps(shard, separators=(",", ":"), ensure_ascii=False) for shard in shards]
+    digest = hashlib.sha256()
+    for content in contents:
+        digest.update(content.encode("utf-8"))
+    directory = race_file.with_name(f"{race_file.stem}.{digest.hexdigest()[:12]}.tokens")
+
+    # Same hash, same shards: a directory only gets its name once it is complete
+    if not directory.is_dir():
+        temp_dir = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        temp_dir.mkdir(parents=True)
+        for i, content in enumerate(contents):
+            (temp_dir / f"{i}.json").write_text(content, encoding="utf-8")
+        temp_dir.rename(directory)
+
+    race["shards"] = [f"{directory.name}/{name}" for name in race["shards"]]
+    temp_file = race_file.with_suffix(".tmp")
+    temp_file.write_text(
+        json.dumps(race, separators=(",", ":"), ensure_ascii=False), encoding="utf-8"
+    )
+    temp_file.replace(race_file)
+
+    for path in race_file.parent.glob(glob.escape(race_file.stem) + ".*tokens"):
+        if path != directory and _is_shard_dir(race_file, path):
+            shutil.rmtree(path, ignore_errors=True)
+    return [race_file.parent / url for url in race["shards"]]
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import json
+import os
 import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
 import click
 
+import profiling
+from benchmark_index import BenchmarkIndex
+from benchmark_io import iter_game_results
+from benchmark_records import Entry, TokenScores, cumulative_max, get_game_name, get_seed
+from compact_format import DEFAULT_PRECISION, dumps_compact, shard_dir, write_split_game
+from json_rounding import dump_rounded
+from precompress import PrecompressManifest, precompress, precompress_directory
+from summarize import load_summary
+
 # --- Heuristic mappings ---
 
 
@@ -103,139 +116,136 @@ def nice_model_name(model_name: str, *, warn: bool = True) -> str:
     return model_name
 
 
-# --- JSON helpers ---
-
-
-def _get_game_name(entry: dict[str, Any]) -> str:
-    game_meta = (entry.get("game") or {}).get("game") or {}
-    return str(game_meta.get("name", "-"))
-
-
-def _get_seed(entry: dict[str, Any]) -> str:
-    return str((entry.get("game") or {}).get("map_seed", "-"))
-
-
-def _get_model(entry: dict[str, Any]) -> str:
-    players = (entry.get("game") or {}).get("players") or []
-    if not players:
-        return "-"
-    opts = players[0].get("options") or {}
-    return str(opts.get("model", "-"))
-
-
-def _extract_run_scores(entry: dict[str, Any]) -> list[float]:
-    scores: list[float] = []
-    for run in entry.get("game_results", []) or []:
-        s = (run.get("scores") or {}).get("black")
-        if s is None:
-            s = 0.0
-        scores.append(float(s))
-    return scores
-
-
-def _cumulative_max(xs: list[float]) -> list[float]:
-    out: list[float] = []
-    cur = float("-inf")
-    for v in xs:
-        if v > cur:
-            cur = v
-        out.append(cur)
-    return out
-
-
-def _extract_move_and_token_pairs(run: dict[str, Any]) -> tuple[str, list[Any] | None]:
-    xrt = run.get("xrt_history") or []
-    move = ""
-    token_pairs = None
-    for ev in xrt:
-        t = ev.get("type")
-        if not move and t == "elicit_response":
-            move = ev.get("response") or ""
-        if t == "reward":
-            val = ev.get("value") or {}
-            if val.get("__TokenXentList__"):
-                token_pairs = val.get("pairs")
-                # don't break; still allow move to be found later if needed
-    return move, token_pairs
-
-
-@click.command()
-@click.option(
-    "--game-data",
-    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
-    required=True,
-    help="Path to benchmark JSON (full or filtered).",
-)
-@click.option("--game-name", required=True, type=str, help="Game name to export.")
-@click.option("--seed", required=True, type=str, help="Seed to export.")
-@click.option(
-    "--output",
-    type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
-    required=True,
-    help="Output file path (CSV or JSON).",
-)
-@click.option(
-    "--format",
-    "fmt",
-    type=click.Choice(["csv", "json"], case_sensitive=False),
-    default="csv",
-    show_default=True,
-    help="Export format: csv or json.",
-)
-def main(game_data: Path, game_name: str, seed: str, output: Path, fmt: str) -> None:
-    """Export a bar-race dataset.
+def write_csv_dataset(
+    model_to_series: dict[str, list[float]], output: Path
+) -> tuple[int, int]:
+    """Write the CSV bar-race dataset from each model's cumulative-max series.
 
-    CSV: columns model, nice_model, company, logo, Round 1..T
-    JSON: list of rounds; each round is a list of model objects with fields
-          model, nice_model, company, logo, score, move, token_scores
+    Shorter series are padded with their last value (empty ones with 0.0).
+    Returns (models_count, rounds_count).
     """
-    with game_data.open("r", encoding="utf-8") as f:
-        data: dict[str, Any] = json.load(f)
-
-    entries: list[dict[str, Any]] = [
-        e
-        for e in (data.get("game_results") or [])
-        if _get_game_name(e) == game_name and _get_seed(e) == seed
+    max_T = max((len(series) for series in model_to_series.values()), default=0)
+    header = ["model", "nice_model", "company", "logo"] + [
+        f"Round {i}" for i in range(1, max_T + 1)
     ]
-    if not entries:
-        raise click.ClickException(
-            f"No entries found for game={game_name!r}, seed={seed!r}."
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for m in sorted(model_to_series):
+            series = model_to_series[m]
+            padded = series + [series[-1] if series else 0.0] * (max_T - len(series))
+            nice = nice_model_name(m)
+            company = infer_company(m)
+            logo = infer_logo(m)
+            row = [m, nice, company, logo] + [f"{v:.2f}" for v in padded]
+            writer.writerow(row)
+    return len(model_to_series), max_T
+
+
+LONG_HEADER = ["game", "seed", "model", "round", "score", "cummax"]
+
+
+def write_long_csv(
+    records: Iterable[Entry], output: Path, append: bool = False
+) -> tuple[int, int]:
+    """Write the long CSV layout: one row per (model, round), as records come.
+
+    Rows are game, seed, model, round (from 1), score and its cumulative max;
+    runs are not padded. With ``append`` the rows go after those already in
+    ``output`` and the header is only written to a new or empty file, so the
+    exports of many groups can build up one file. Nothing is written without
+    records. Returns (models_count, rounds_count).
+    """
+    models: set[str] = set()
+    max_T = 0
+    f = None
+    try:
+        for record in records:
+            if f is None:
+                output.parent.mkdir(parents=True, exist_ok=True)
+                f = output.open("a" if append else "w", encoding="utf-8", newline="")
+                writer = csv.writer(f)
+                if f.tell() == 0:
+                    writer.writerow(LONG_HEADER)
+            best = cumulative_max(record.scores)
+            for t, (score, cummax) in enumerate(zip(record.scores, best), 1):
+                writer.writerow([record.game, record.seed, record.model, t, score, cummax])
+            models.add(record.model)
+            max_T = max(max_T, len(record.scores))
+    finally:
+        if f is not None:
+            f.close()
+    return len(models), max_T
+
+
+def write_csv(
+    records: Iterable[Entry], output: Path, long: bool = False, append: bool = False
+) -> tuple[int, int]:
+    """Write the CSV layout of score records: wide (one row per model) or long.
+
+    Only the run scores are kept in memory for the wide layout; the long one is
+    streamed. Nothing is written without records.
+    """
+    if long:
+        return write_long_csv(records, output, append)
+    series = {record.model: record.cumulative_max() for record in records}
+    if not series:
+        return 0, 0
+    return write_csv_dataset(series, output)
+
+
+def export_dataset(
+    entries: list[dict[str, Any]],
+    output: Path,
+    fmt: str,
+    precision: int | None = None,
+    long: bool = False,
+) -> tuple[int, int]:
+    """Write the bar-race dataset of one (game, seed) group.
+
+    ``precision`` rounds the floats of the JSON formats to that many decimals
+    while they are encoded (None keeps them exact; compact and split default to 3).
+    ``long`` picks the long CSV layout (see :func:`write_long_csv`).
+    Returns (models_count, rounds_count).
+    """
+    if fmt.lower() == "split":
+        output.parent.mkdir(parents=True, exist_ok=True)
+        write_split_game(
+            output, entries, DEFAULT_PRECISION if precision is None else precision
         )
+        return len(entries), max(len(e.get("game_results") or []) for e in entries)
 
-    # Build per-model cumulative series and per-run metadata
-    model_to_series: dict[str, list[float]] = {}
+    if fmt.lower() == "compact":
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            dumps_compact(
+                entries, DEFAULT_PRECISION if precision is None else precision
+            ),
+            encoding="utf-8",
+        )
+        return len(entries), max(len(e.get("game_results") or []) for e in entries)
+
+    if fmt.lower() == "csv":
+        return write_csv((Entry.from_json(e) for e in entries), output, long)
+
+    # Build per-model round scores and per-run metadata
     model_to_moves: dict[str, list[str]] = {}
-    model_to_tokenpairs: dict[str, list[list[Any] | None]] = {}
+    model_to_tokenscores: dict[str, list[TokenScores | None]] = {}
     model_to_round_scores: dict[str, list[float]] = {}
     max_T = 0
     for e in entries:
-        model = _get_model(e)
-        runs = e.get("game_results") or []
-        scores = _extract_run_scores(e)
-        cm = _cumulative_max(scores)
-        model_to_series[model] = cm
-        model_to_round_scores[model] = scores
-        moves: list[str] = []
-        tokenpairs: list[list[Any] | None] = []
-        for run in runs:
-            move, pairs = _extract_move_and_token_pairs(run)
-            moves.append(move)
-            tokenpairs.append(pairs)
-        model_to_moves[model] = moves
-        model_to_tokenpairs[model] = tokenpairs
-        if len(cm) > max_T:
-            max_T = len(cm)
+        record = Entry.from_json(e, runs=True)
+        model = record.model
+        model_to_round_scores[model] = record.scores.tolist()
+        model_to_moves[model] = [run.move for run in record.runs]
+        model_to_tokenscores[model] = [run.token_scores for run in record.runs]
+        if len(record.scores) > max_T:
+            max_T = len(record.scores)
 
     # Pad with last value to common length; pad moves with empty and token pairs with None
-    for model, series in list(model_to_series.items()):
-        if not series:
-            model_to_series[model] = [0.0] * max_T
-        else:
-            last = series[-1]
-            if len(series) < max_T:
-                model_to_series[model] = series + [last] * (max_T - len(series))
+    for model, raw_series in list(model_to_round_scores.items()):
         # raw per-move scores
-        raw_series = model_to_round_scores.get(model, [])
         if not raw_series:
             model_to_round_scores[model] = [0.0] * max_T
         else:
@@ -248,41 +258,20 @@ def main(game_data: Path, game_name: str, seed: str, output: Path, fmt: str) ->
         mv = model_to_moves.get(model, [])
         if len(mv) < max_T:
             model_to_moves[model] = mv + [""] * (max_T - len(mv))
-        # token pairs
-        tp = model_to_tokenpairs.get(model, [])
-        if len(tp) < max_T:
-            model_to_tokenpairs[model] = tp + [None] * (max_T - len(tp))
+        # token scores
+        ts = model_to_tokenscores.get(model, [])
+        if len(ts) < max_T:
+            model_to_tokenscores[model] = ts + [None] * (max_T - len(ts))
 
     # Sort models by name
-    models = list(model_to_series.keys())
-    models.sort()
-
-    if fmt.lower() == "csv":
-        header = ["model", "nice_model", "company", "logo"] + [
-            f"Round {i}" for i in range(1, max_T + 1)
-        ]
-        output.parent.mkdir(parents=True, exist_ok=True)
-        with output.open("w", encoding="utf-8", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-            for m in models:
-                nice = nice_model_name(m)
-                company = infer_company(m)
-                logo = infer_logo(m)
-                row = [m, nice, company, logo] + [
-                    f"{v:.2f}" for v in model_to_series[m]
-                ]
-                writer.writerow(row)
-        click.echo(
-            f"Wrote {len(models)} models, {max_T} rounds to {output} for game={game_name}, seed={seed}."
-        )
-        return
+    models = sorted(model_to_round_scores)
 
     # JSON export
     rounds: list[list[dict[str, Any]]] = []
     for t in range(max_T):
         round_items: list[dict[str, Any]] = []
         for m in models:
+            token_scores = model_to_tokenscores[m][t]
             round_items.append(
                 {
                     "model": m,
@@ -291,7 +280,9 @@ def main(game_data: Path, game_name: str, seed: str, output: Path, fmt: str) ->
                     "logo": infer_logo(m),
                     "score": float(model_to_round_scores[m][t]),
                     "move": model_to_moves[m][t],
-                    "token_scores": model_to_tokenpairs[m][t],
+                    "token_scores": (
+                        token_scores.pairs() if token_scores is not None else None
+                    ),
                 }
             )
         rounds.append(round_items)
@@ -302,11 +293,377 @@ def main(game_data: Path, game_name: str, seed: str, output: Path, fmt: str) ->
         "rounds": rounds,
     }
     with output.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+        dump_rounded(data, f, precision, indent=2)
+    return len(models), max_T
+
+
+def _iter_records(
+    game_data: Path, game_name: str, seed: str, index: bool
+) -> Iterator[Entry]:
+    """Score records of one group's entries, decoded one at a time.
+
+    Only the scores are needed, so the histories are dropped as entries are read.
+    """
+    if index:
+        with BenchmarkIndex(game_data) as bench_index:
+            for entry in bench_index.iter_entries(game_name, seed, skip_xrt_history=True):
+                yield Entry.from_json(entry)
+    else:
+        for entry in iter_game_results(game_data, skip_xrt_history=True):
+            if get_game_name(entry) == game_name and get_seed(entry) == seed:
+                yield Entry.from_json(entry)
+
+
+# --- Batch export ---
+
+# Bump whenever export_dataset's output changes, so batch runs rewrite every file
+EXPORT_VERSION = "2"
+BATCH_MANIFEST = ".export-manifest.json"
+
+
+def _read_groups(path: Path) -> list[tuple[str, str]]:
+    """Parse a groups file: one ``<game> <seed>`` pair per line, ``#`` comments."""
+    groups: list[tuple[str, str]] = []
+    for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        parts = line.split("#", 1)[0].split()
+        if not parts:
+            continue
+        if len(parts) != 2:
+            raise click.ClickException(
+                f"{path}:{lineno}: expected '<game> <seed>', got {line!r}"
+            )
+        groups.append((parts[0], parts[1]))
+    return groups
+
+
+def _export_group(
+    game_data: Path,
+    spans: list[tuple[int, int]],
+    output: Path,
+    fmt: str,
+    precision: int | None,
+    long: bool,
+    previous_digest: str | None,
+    compress: bool,
+    previous_compressed: str | None,
+) -> tuple[str, bool, str | None]:
+    """Export one group from its byte spans.
+
+    Runs in a worker process; the output is skipped when it exists and the
+    group's raw entries hash to the same digest as in the previous run. With
+    ``compress``, .gz/.br siblings are refreshed if the output changed.
+    Returns (input_digest, written, output_digest or None).
+    """
+    digest = hashlib.sha256(f"{EXPORT_VERSION}:{fmt.lower()}:{precision}:{long}".encode())
+    raw_entries: list[bytes] = []
+    with game_data.open("rb") as f:
+        for offset, length in spans:
+            f.seek(offset)
+            raw = f.read(length)
+            digest.update(raw)
+            raw_entries.append(raw)
+    hexdigest = digest.hexdigest()
+    written = hexdigest != previous_digest or not output.exists()
+    if written:
+        export_dataset(
+            [json.loads(raw) for raw in raw_entries], output, fmt, precision, long
+        )
+    compressed = precompress(output, previous_compressed) if compress else None
+    if compress and written and fmt.lower() == "split":
+        shards = shard_dir(output)
+        if shards is not None:
+            precompress_directory(shards)
+    return hexdigest, written, compressed
+
+
+def export_batch(
+    game_data: Path,
+    groups: list[tuple[str, str]] | None,
+    output_dir: Path,
+    fmt: str,
+    jobs: int,
+    compress: bool = False,
+    precision: int | None = None,
+    long: bool = False,
+    spans: dict[tuple[str, str], list[tuple[int, int]]] | None = None,
+) -> None:
+    """Export one dataset per (game, seed) group into ``output_dir``.
+
+    ``groups=None`` exports every group of the benchmark. Groups are located
+    through the sidecar index, unless ``spans`` already has their byte spans,
+    and written by a pool of ``jobs`` processes.
+    """
+    with profiling.stage("locate_groups") as stage:
+        if spans is None:
+            with BenchmarkIndex(game_data) as bench_index:
+                if groups is None:
+                    groups = bench_index.groups()
+                group_spans = {key: bench_index.spans(*key) for key in groups}
+        else:
+            group_spans = {key: spans.get(key, []) for key in (spans if groups is None else groups)}
+        stage.add(len(group_spans))
+
+    missing = [key for key, spans in group_spans.items() if not spans]
+    for game_name, seed in missing:
+        click.secho(
+            f"[warn] No entries found for game={game_name!r}, seed={seed!r}.",
+            fg="yellow",
+            err=True,
+        )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = output_dir / BATCH_MANIFEST
+    manifest: dict[str, str] = (
+        json.loads(manifest_file.read_text()) if manifest_file.exists() else {}
+    )
+
+    compress_manifest = PrecompressManifest(output_dir) if compress else None
+
+    ext = "csv" if fmt.lower() == "csv" else "json"
+    written = skipped = 0
+    with profiling.stage("export_groups") as stage, ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        for (game_name, seed), spans in group_spans.items():
+            if not spans:
+                continue
+            name = f"{game_name}_{seed}.{ext}"
+            futures[name] = pool.submit(
+                _export_group,
+                game_data,
+                spans,
+                output_dir / name,
+                fmt,
+                precision,
+                long,
+                manifest.get(name),
+                compress,
+                compress_manifest.digests.get(name) if compress_manifest else None,
+            )
+        for name, future in futures.items():
+            manifest[name], was_written, compressed = future.result()
+            if compress_manifest is not None and compressed is not None:
+                compress_manifest.digests[name] = compressed
+            if was_written:
+                written += 1
+            else:
+                skipped += 1
+        stage.add(written)
+
+    temp_file = manifest_file.with_suffix(".tmp")
+    temp_file.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    temp_file.replace(manifest_file)
+    if compress_manifest is not None:
+        compress_manifest.save()
     click.echo(
-        f"Wrote JSON with {len(rounds)} rounds x {len(models)} models to {output} for game={game_name}, seed={seed}."
+        f"Exported {written} groups to {output_dir} ({skipped} unchanged, {len(missing)} missing)."
     )
 
 
+@click.command()
+@click.option(
+    "--game-data",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
+    required=True,
+    help="Path to benchmark JSON (full or filtered).",
+)
+@click.option("--game-name", type=str, help="Game name to export.")
+@click.option("--seed", type=str, help="Seed to export.")
+@click.option(
+    "--all",
+    "export_all",
+    is_flag=True,
+    help="Batch mode: export every (game, seed) group of the benchmark.",
+)
+@click.option(
+    "--groups-from",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
+    help="Batch mode: export the groups listed in this file, one '<game> <seed>' per line.",
+)
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path, dir_okay=True, file_okay=True),
+    required=True,
+    help="Output file path (CSV or JSON); output directory in batch mode.",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["csv", "json", "compact", "split"], case_sensitive=False),
+    default="csv",
+    show_default=True,
+    help="Export format: csv, json, compact (the web app's compact game file), "
+    "or split (its race file plus per-model token-score shards).",
+)
+@click.option(
+    "--precision",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Round floats of the JSON formats to this many decimals.  [default: exact; 3 for compact and split]",
+)
+@click.option(
+    "--index/--no-index",
+    default=True,
+    show_default=True,
+    help="Seek through a sidecar index of the benchmark (built on first use).",
+)
+@click.option(
+    "--summary",
+    is_flag=True,
+    help="CSV only: read the scores from the benchmark's summary file (see summarize.py; built on first use).",
+)
+@click.option(
+    "--long",
+    is_flag=True,
+    help="CSV only: long layout, one row per (model, round) with columns game, seed, model, round, score, cummax.",
+)
+@click.option(
+    "--append",
+    is_flag=True,
+    help="With --long: append the rows to --output instead of replacing it (the header is written once).",
+)
+@click.option(
+    "--precompress",
+    "compress",
+    is_flag=True,
+    help="Also write .gz/.br siblings of the outputs (refreshed only when they change).",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Batch mode: number of worker processes.  [default: CPU count]",
+)
+@profiling.options
+def main(
+    game_data: Path,
+    game_name: str | None,
+    seed: str | None,
+    export_all: bool,
+    groups_from: Path | None,
+    output: Path,
+    fmt: str,
+    precision: int | None,
+    index: bool,
+    summary: bool,
+    long: bool,
+    append: bool,
+    compress: bool,
+    jobs: int | None,
+    profile: Path | None,
+    profile_with: tuple[str, ...],
+) -> None:
+    """Export a bar-race dataset.
+
+    CSV: columns model, nice_model, company, logo, Round 1..T
+         (with --long: game, seed, model, round, score, cummax; one row per run)
+    JSON: list of rounds; each round is a list of model objects with fields
+          model, nice_model, company, logo, score, move, token_scores
+    Compact: the web app's compact game file (see compact_format.py)
+    Split: the compact file's scores and moves, with the token scores in one
+           shard per model under <output stem>.<hash>.tokens/, fetched by the web app on demand
+
+    With --all or --groups-from, one dataset per (game, seed) group is written
+    to the --output directory as <game>_<seed>.csv or .json; groups whose entries
+    are unchanged since the previous batch run are skipped.
+    """
+    profiling.start("export_barrace_csv", profile, profile_with)
+    if long and fmt.lower() != "csv":
+        raise click.UsageError("--long is a CSV layout; it requires --format csv.")
+    if append and not long:
+        raise click.UsageError("--append requires --long.")
+    if export_all or groups_from:
+        if append:
+            raise click.UsageError("--append writes a single file; it does not apply to batch mode.")
+        if export_all and groups_from:
+            raise click.UsageError("--all and --groups-from are mutually exclusive.")
+        if not index:
+            raise click.UsageError("Batch mode requires the sidecar index.")
+        groups = _read_groups(groups_from) if groups_from else None
+        export_batch(
+            game_data,
+            groups,
+            output,
+            fmt,
+            jobs or os.cpu_count() or 1,
+            compress,
+            precision,
+            long,
+        )
+        return
+    if game_name is None or seed is None:
+        raise click.UsageError(
+            "--game-name and --seed are required unless --all or --groups-from is given."
+        )
+
+    if summary and fmt.lower() != "csv":
+        raise click.UsageError("--summary only has the scores; it requires --format csv.")
+
+    if fmt.lower() == "csv":
+        # Only scores are read, one entry at a time
+        records: Iterable[Entry]
+        if summary:
+            group = next(
+                (
+                    g
+                    for g in load_summary(game_data)
+                    if g.game == game_name and g.seed == seed
+                ),
+                None,
+            )
+            records = (
+                Entry(group.game, group.seed, model, scores, [])
+                for model, scores in zip(group.models, group.scores)
+            ) if group is not None else ()
+        else:
+            records = _iter_records(game_data, game_name, seed, index)
+        with profiling.stage("export") as stage:
+            n_models, n_rounds = write_csv(records, output, long, append)
+            stage.add(n_models)
+        if n_models == 0:
+            raise click.ClickException(
+                f"No entries found for game={game_name!r}, seed={seed!r}."
+            )
+    else:
+        entries: list[dict[str, Any]]
+        with profiling.stage("read_entries") as stage:
+            if index:
+                with BenchmarkIndex(game_data) as bench_index:
+                    entries = list(bench_index.iter_entries(game_name, seed))
+            else:
+                entries = [
+                    e
+                    for e in iter_game_results(game_data)
+                    if get_game_name(e) == game_name and get_seed(e) == seed
+                ]
+            stage.add(len(entries))
+        if not entries:
+            raise click.ClickException(
+                f"No entries found for game={game_name!r}, seed={seed!r}."
+            )
+
+        with profiling.stage("export") as stage:
+            n_models, n_rounds = export_dataset(entries, output, fmt, precision)
+            stage.add(n_models)
+
+    if compress:
+        with profiling.stage("precompress"):
+            compress_manifest = PrecompressManifest(output.parent)
+            compress_manifest.update(output)
+            compress_manifest.save()
+            if fmt.lower() == "split":
+                shards = shard_dir(output)
+                if shards is not None:
+                    precompress_directory(shards)
+    if fmt.lower() == "csv":
+        click.echo(
+            f"Wrote {n_models} models, {n_rounds} rounds to {output} for game={game_name}, seed={seed}."
+        )
+    else:
+        kind = {"compact": "compact JSON", "split": "split JSON"}.get(fmt.lower(), "JSON")
+        click.echo(
+            f"Wrote {kind} with {n_rounds} rounds x {n_models} models to {output} for game={game_name}, seed={seed}."
+        )
+
+
 if __name__ == "__main__":
     main()
@@ -8,36 +8,62 @@
 # ///
 
 import json
+from collections.abc import Iterable
+from fnmatch import fnmatchcase
 from pathlib import Path
 
 import typer
 from InquirerPy import inquirer
 
+import profiling
+from benchmark_index import BenchmarkIndex
+from benchmark_io import iter_game_results
+from benchmark_records import get_game_name, get_seed
+from summarize import load_summary
+
 
 app = typer.Typer()
 
 
-@app.command()
-def extract_gamee_data(benchmark: Path, game: str = "", seed: str = "") -> None:
-    data = json.load(benchmark.open())
-    game_results = data["game_results"]
+def list_groups(benchmark: Path, bench_index: BenchmarkIndex | None) -> list[tuple[str, str]]:
+    """All (game, seed) pairs in order of first appearance, from a cached sidecar."""
+    if bench_index is not None:
+        return bench_index.groups()
+    # The summary is rebuilt only when the benchmark changes
+    return [(group.game, group.seed) for group in load_summary(benchmark)]
+
+
+def select_groups(
+    groups: list[tuple[str, str]], patterns: Iterable[str]
+) -> list[tuple[str, str]]:
+    """The groups matching any of the GAME:SEED glob patterns, in benchmark order."""
+    patterns = list(patterns)
+    for pattern in patterns:
+        if not any(fnmatchcase(f"{game}:{seed}", pattern) for game, seed in groups):
+            raise typer.Exit(f"No (game, seed) in benchmark matches {pattern}")
+    return [
+        (game, seed)
+        for game, seed in groups
+        if any(fnmatchcase(f"{game}:{seed}", pattern) for pattern in patterns)
+    ]
+
 
-    game_names = {result["game"]["game"]["name"] for result in game_results}
+def pick_group(groups: list[tuple[str, str]], game: str, seed: str) -> tuple[str, str]:
+    """Complete a (game, seed) with the fuzzy pickers, checking it is in the benchmark."""
+    seeds_by_game: dict[str, list[str]] = {}
+    for name, group_seed in groups:
+        seeds_by_game.setdefault(name, []).append(group_seed)
 
     if not game:
         game = inquirer.fuzzy(
             message="Select a game",
-            choices=list(game_names),
+            choices=list(seeds_by_game),
         ).execute()
 
-    if game not in game_names:
+    if game not in seeds_by_game:
         raise typer.Exit(f"Game name {game} not found in benchmark")
 
-    seeds = {
-        result["game"]["game"]["map_seed"]
-        for result in game_results
-        if result["game"]["game"]["name"] == game
-    }
+    seeds = seeds_by_game[game]
     if not seed:
         seed = inquirer.fuzzy(
             message="Select a seed",
@@ -45,24 +71,78 @@ def extract_gamee_data(benchmark: Path, game: str = "", seed: str = "") -> None:
         ).execute()
     if seed not in seeds:
         raise typer.Exit(f"Seed {seed} for game {game} not found in benchmark")
+    return game, seed
 
-    # Collect the data
-    games = [
-        result
-        for result in game_results
-        if result["game"]["game"]["name"] == game
-        and result["game"]["game"]["map_seed"] == seed
-    ]
+
+def collect_entries(
+    benchmark: Path, bench_index: BenchmarkIndex | None, groups: list[tuple[str, str]]
+) -> dict[tuple[str, str], list[dict]]:
+    """The entries of every group, in benchmark order.
+
+    Without the index, all groups are collected in a single pass over the benchmark.
+    """
+    if bench_index is not None:
+        return {group: list(bench_index.iter_entries(*group)) for group in groups}
+    entries: dict[tuple[str, str], list[dict]] = {group: [] for group in groups}
+    for result in iter_game_results(benchmark):
+        group = entries.get((get_game_name(result), get_seed(result)))
+        if group is not None:
+            group.append(result)
+    return entries
+
+
+@app.command()
+def extract_gamee_data(
+    benchmark: Path,
+    game: str = "",
+    seed: str = "",
+    group: list[str] = typer.Option(
+        [], help="GAME:SEED to extract, globs allowed (e.g. 'Condense:*'). Repeatable; no picker."
+    ),
+    all_groups: bool = typer.Option(False, "--all", help="Extract every (game, seed); no picker."),
+    index: bool = True,
+    profile: Path | None = typer.Option(None, help=profiling.PROFILE_HELP),
+    profile_with: list[profiling.Dump] = typer.Option([], help=profiling.PROFILE_WITH_HELP),
+) -> None:
+    profiling.start("extract", profile, profile_with)
+    if (group or all_groups) and (game or seed):
+        raise typer.Exit("--game/--seed cannot be combined with --group/--all")
+
+    # The sidecar index (built on first use) lets us seek straight to the entries
+    bench_index = BenchmarkIndex(benchmark) if index else None
+    try:
+        with profiling.stage("list_groups") as stage:
+            groups = list_groups(benchmark, bench_index)
+            stage.add(len(groups))
+        if all_groups:
+            selected = groups
+        elif group:
+            selected = select_groups(groups, group)
+        else:
+            selected = [pick_group(groups, game, seed)]
+
+        output_dir = benchmark.parent / benchmark.stem
+        output_dir.mkdir(parents=True, exist_ok=True)
+        outputs = {(name, s): output_dir / f"{name}_{s}.json" for name, s in selected}
+        missing = [key for key, output in outputs.items() if not output.exists()]
+
+        # Collect the data, only for the files still to write
+        with profiling.stage("read_entries") as stage:
+            entries = collect_entries(benchmark, bench_index, missing) if missing else {}
+            stage.add(sum(map(len, entries.values())))
+    finally:
+        if bench_index is not None:
+            bench_index.close()
 
     # Save the data
-    output = benchmark.parent / benchmark.stem / f"{game}_{seed}.json"
-    output.parent.mkdir(parents=True, exist_ok=True)
-    if output.exists():
-        print(f"File {output} already exists, skipping")
-    else:
-        output.write_text(json.dumps(games, indent=1))
-
-    print(f"Saved data to {output}")
+    with profiling.stage("write_files") as stage:
+        for key, output in outputs.items():
+            if key in entries:
+                output.write_text(json.dumps(entries[key], indent=1))
+                stage.add()
+            else:
+                print(f"File {output} already exists, skipping")
+            print(f"Saved data to {output}")
 
 if __name__ == "__main__":
     app()
@@ -1,50 +1,26 @@
 from __future__ import annotations
 
-import json
+import heapq
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 import click
 
+try:
+    import race_metrics
+except ImportError:  # needs NumPy, an optional speedup
+    race_metrics = None
 
-def _get_game_name(entry: dict[str, Any]) -> str:
-    game_meta = (entry.get("game") or {}).get("game") or {}
-    return str(game_meta.get("name", "-"))
-
-
-def _get_seed(entry: dict[str, Any]) -> str:
-    return str((entry.get("game") or {}).get("map_seed", "-"))
-
-
-def _get_model(entry: dict[str, Any]) -> str:
-    players = (entry.get("game") or {}).get("players") or []
-    if not players:
-        return "-"
-    opts = players[0].get("options") or {}
-    return str(opts.get("model", "-"))
-
-
-def _extract_run_scores(entry: dict[str, Any]) -> list[float]:
-    scores: list[float] = []
-    for run in entry.get("game_results", []) or []:
-        s = (run.get("scores") or {}).get("black")
-        if s is None:
-            # Treat missing as 0.0 to keep timeline alignment; unlikely in practice
-            s = 0.0
-        scores.append(float(s))
-    return scores
-
-
-def _cumulative_max(xs: list[float]) -> list[float]:
-    if not xs:
-        return []
-    out: list[float] = []
-    cur = float("-inf")
-    for v in xs:
-        if v > cur:
-            cur = v
-        out.append(cur)
-    return out
+import profiling
+from benchmark_index import BenchmarkIndex
+from benchmark_io import iter_game_results, write_game_results
+from benchmark_records import Entry, cumulative_max, get_game_name, get_seed
+from summarize import load_summary
 
 
 def _rank_positions_at_t(
@@ -64,44 +40,170 @@ def _rank_positions_at_t(
     return {m: i + 1 for i, (m, _s) in enumerate(snap)}
 
 
-def _compute_switchiness_for_group(
-    entries: list[dict[str, Any]],
+def _count_switches_python(
+    model_to_cummax: dict[str, list[float]], max_T: int, top_n: int
+) -> int:
+    total_switches = 0
+    prev_pos: dict[str, int] | None = None
+
+    for t in range(0, max_T):
+        pos_t = _rank_positions_at_t(model_to_cummax, t)
+        if prev_pos is not None:
+            # Count upward moves that land in top_n at current t
+            for model, new_pos in pos_t.items():
+                old_pos = prev_pos.get(model, len(pos_t) + 1)
+                if new_pos <= top_n and new_pos < old_pos:
+                    total_switches += 1
+        prev_pos = pos_t
+
+    return total_switches
+
+
+ENGINES = ("numpy", "python") if race_metrics is not None else ("python",)
+DEFAULT_METRICS = ("switches",)
+
+
+def _compute_metrics_for_group(
+    model_to_scores: dict[str, Sequence[float]],
     top_n: int,
-) -> tuple[int, int]:
-    """Return (total_switches, timeline_len_T).
+    metrics: Sequence[str] = DEFAULT_METRICS,
+    engine: str = ENGINES[0],
+) -> tuple[tuple[float, ...], int]:
+    """Return (metric_values, timeline_len_T).
 
-    - Aggregate all models for this (game, seed)
+    - Aggregate all models for this (game, seed), given their run scores
     - Use cumulative max of scores over runs per model
-    - For t = 1..T-1, count models whose rank improves and finish within top_n at t
+    - Evaluate every requested metric of race_metrics on the resulting race;
+      "switches" counts, for t = 1..T-1, models whose rank improves and finish
+      within top_n at t. The python engine only supports that one.
     """
     # Collect per-model cumulative max score sequences
     model_to_cummax: dict[str, list[float]] = {}
     max_T = 0
-    for entry in entries:
-        model = _get_model(entry)
-        scores = _extract_run_scores(entry)
-        cm = _cumulative_max(scores)
+    for model, scores in model_to_scores.items():
+        cm = cumulative_max(scores)
         model_to_cummax[model] = cm
         if len(cm) > max_T:
             max_T = len(cm)
 
     if max_T <= 1 or len(model_to_cummax) <= 1:
-        return 0, max_T
+        return (0.0,) * len(metrics), max_T
 
-    total_switches = 0
-    prev_pos: dict[str, int] | None = None
+    if engine == "numpy":
+        race = race_metrics.Race(model_to_cummax, max_T, top_n)
+        return race_metrics.evaluate(race, metrics), max_T
+    return (float(_count_switches_python(model_to_cummax, max_T, top_n)),), max_T
 
-    for t in range(0, max_T):
-        pos_t = _rank_positions_at_t(model_to_cummax, t)
-        if prev_pos is not None:
-            # Count upward moves that land in top_n at current t
-            for model, new_pos in pos_t.items():
-                old_pos = prev_pos.get(model, len(pos_t) + 1)
-                if new_pos <= top_n and new_pos < old_pos:
-                    total_switches += 1
-        prev_pos = pos_t
 
-    return total_switches, max_T
+def score_group(
+    model_to_scores: dict[str, array[float]],
+    top_n: int,
+    engine: str,
+    weights: dict[str, float],
+) -> tuple[float, tuple[float, ...], int, int]:
+    """Worker entry point: (score, metric_values, models_count, timeline_T) of a group."""
+    values, T = _compute_metrics_for_group(model_to_scores, top_n, list(weights), engine)
+    score = sum(w * v for w, v in zip(weights.values(), values))
+    return score, values, len(model_to_scores), T
+
+
+def parse_weights(specs: Sequence[str], available: Iterable[str]) -> dict[str, float]:
+    """Parse ``name`` or ``name=weight`` specs into {metric: weight}."""
+    available = set(available)
+    weights: dict[str, float] = {}
+    for spec in specs:
+        name, _, weight = spec.partition("=")
+        name = name.strip()
+        if name not in available:
+            raise ValueError(
+                f"Unknown metric {name!r}; available: {', '.join(sorted(available))}"
+            )
+        try:
+            weights[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight in {spec!r}") from None
+    return weights
+
+
+def resolve_weights(metric_specs: Sequence[str], engine: str) -> dict[str, float]:
+    """{metric: weight} of the --metric specs, checked against the engine."""
+    if engine == "python":
+        if any(spec.partition("=")[0].strip() != "switches" for spec in metric_specs):
+            raise click.UsageError("The python engine only supports the 'switches' metric.")
+        available: Iterable[str] = ("switches",)
+    else:
+        available = race_metrics.METRICS
+    try:
+        return parse_weights(metric_specs, available)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--metric") from None
+
+
+GroupKey = tuple[str, str]
+# ((game, seed), weighted_score, metric_values, models_count, timeline_T)
+Scored = tuple[GroupKey, float, tuple[float, ...], int, int]
+
+
+def format_value(value: float, width: int) -> str:
+    """A summary cell: whole numbers (counts) as integers, other values in %g."""
+    if float(value).is_integer():
+        return f"{int(value):{width}d}"
+    return f"{value:{width}g}"
+
+
+def rank_key(item: Scored) -> tuple[float, int, int, str, str]:
+    # Rank by weighted score desc, then by models_count desc, then by T desc
+    key, score, _values, models_count, T = item
+    return (-score, -models_count, -T, key[0], key[1])
+
+
+def _iter_group_scores(
+    game_data: Path, games_filter: set[str] | None, summary: bool = False
+) -> Iterator[tuple[GroupKey, dict[str, array[float]]]]:
+    """Yield ((game, seed), {model: run_scores}) for every group to score.
+
+    With the summary, the run scores come straight from the benchmark's summary
+    file. Otherwise a streaming pass, which drops the histories as it goes,
+    accumulates the run scores of all groups first. (The index would decode
+    whole entries to get the same scores; it only serves to write the selection.)
+    """
+    if summary:
+        for group in load_summary(game_data):
+            if games_filter and group.game not in games_filter:
+                continue
+            yield (group.game, group.seed), group.model_scores()
+        return
+
+    groups: dict[GroupKey, dict[str, array[float]]] = {}
+    for e in iter_game_results(game_data, skip_xrt_history=True):
+        record = Entry.from_json(e)
+        if games_filter and record.game not in games_filter:
+            continue
+        groups.setdefault(record.key, {})[record.model] = record.scores
+    yield from groups.items()
+
+
+def _iter_scored(
+    groups: Iterable[tuple[GroupKey, dict[str, array[float]]]],
+    score: Callable[[dict[str, array[float]]], tuple[Any, ...]],
+    jobs: int,
+) -> Iterator[Scored]:
+    """Score groups in order, keeping at most a few tasks per worker in flight."""
+    if jobs <= 1:
+        for key, model_to_scores in groups:
+            yield (key, *score(model_to_scores))
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: deque[tuple[GroupKey, Future[Any]]] = deque()
+        for key, model_to_scores in groups:
+            pending.append((key, pool.submit(score, model_to_scores)))
+            if len(pending) >= jobs * 4:
+                done_key, future = pending.popleft()
+                yield (done_key, *future.result())
+        while pending:
+            done_key, future = pending.popleft()
+            yield (done_key, *future.result())
 
 
 @click.command()
@@ -138,67 +240,120 @@ def _compute_switchiness_for_group(
     required=True,
     help="Output JSON file containing only selected game entries.",
 )
+@click.option(
+    "--metric",
+    "metric_specs",
+    type=str,
+    multiple=True,
+    default=DEFAULT_METRICS,
+    show_default=True,
+    help="Metric to rank by, as NAME or NAME=WEIGHT (repeatable; weighted sum). "
+    "See race_metrics.py for the available metrics.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default=ENGINES[0],
+    show_default=True,
+    help="Switchiness implementation (numpy is used when available).",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes used to score the groups.",
+)
+@click.option(
+    "--index/--no-index",
+    default=True,
+    show_default=True,
+    help="Read the selected entries through a sidecar index of the benchmark (built on first use).",
+)
+@click.option(
+    "--summary",
+    is_flag=True,
+    help="Score the groups from the benchmark's summary file (see summarize.py; built on first use).",
+)
+@profiling.options
 def main(
-    game_data: Path, top_n: int, top_k: int, games: tuple[str, ...], output: Path
+    game_data: Path,
+    top_n: int,
+    top_k: int,
+    games: tuple[str, ...],
+    output: Path,
+    metric_specs: tuple[str, ...],
+    engine: str,
+    jobs: int,
+    index: bool,
+    summary: bool,
+    profile: Path | None,
+    profile_with: tuple[str, ...],
 ) -> None:
     """Find the most switchy (game, seed) groups and write a compact JSON with those entries.
 
     Switchiness is the sum over timesteps of the number of models whose rank improves
     (with cumulative-max scores) and that are within the top-N frontier at that timestep.
+    With --metric, groups are ranked by a weighted sum of other interestingness metrics
+    instead (lead changes, comebacks, ...), all computed in the same pass.
     """
-    with game_data.open("r", encoding="utf-8") as f:
-        data: dict[str, Any] = json.load(f)
-
-    all_entries: list[dict[str, Any]] = data.get("game_results") or []
+    profiling.start("find_switchiest", profile, profile_with)
+    weights = resolve_weights(metric_specs, engine)
 
     # Optional game filter
     games_filter: set[str] | None = set(games) if games else None
-    if games_filter:
-        all_entries = [e for e in all_entries if _get_game_name(e) in games_filter]
-
-    # Group entries by (game_name, seed)
-    groups: dict[tuple[str, str], list[dict[str, Any]]] = {}
-    for e in all_entries:
-        key = (_get_game_name(e), _get_seed(e))
-        groups.setdefault(key, []).append(e)
-
-    # Compute switchiness per group
-    scored: list[tuple[tuple[str, str], int, int, int]] = []
-    # each as ((game, seed), total_switches, models_count, timeline_T)
-    for key, entries in groups.items():
-        total_switches, T = _compute_switchiness_for_group(entries, top_n=top_n)
-        models_count = len({_get_model(e) for e in entries})
-        scored.append((key, total_switches, models_count, T))
-
-    # Rank by total_switches desc, then by models_count desc, then by T desc
-    scored.sort(key=lambda item: (-item[1], -item[2], -item[3], item[0][0], item[0][1]))
-
-    # Select top-k groups
-    selected_keys = [key for key, _s, _m, _t in scored[:top_k]]
-    selected_set = set(selected_keys)
 
-    # Collect all entries matching selected (game, seed)
-    selected_entries: list[dict[str, Any]] = []
-    for e in all_entries:
-        key = (_get_game_name(e), _get_seed(e))
-        if key in selected_set:
-            selected_entries.append(e)
+    analyzed = 0
+
+    def counted(items: Iterator[Scored]) -> Iterator[Scored]:
+        nonlocal analyzed
+        for item in items:
+            analyzed += 1
+            yield item
+
+    # Score groups as they come (workers only receive the compact score
+    # arrays) and keep the best top_k in a bounded heap
+    score = partial(score_group, top_n=top_n, engine=engine, weights=weights)
+    groups = _iter_group_scores(game_data, games_filter, summary)
+    with profiling.stage("score_groups") as stage:
+        top: list[Scored] = heapq.nsmallest(
+            top_k, counted(_iter_scored(groups, score, jobs)), key=rank_key
+        )
+        stage.add(analyzed)
+    selected_keys = [key for key, *_rest in top]
+    selected_set = set(selected_keys)
 
-    # Write output JSON with only the selected entries
-    out_obj: dict[str, Any] = {"game_results": selected_entries}
-    output.parent.mkdir(parents=True, exist_ok=True)
-    with output.open("w", encoding="utf-8") as f:
-        json.dump(out_obj, f)
+    # Stream the full entries matching selected (game, seed) to the output
+    with profiling.stage("write_selection") as stage:
+        if index:
+            with BenchmarkIndex(game_data) as bench_index:
+                stage.add(write_game_results(output, bench_index.iter_group_entries(selected_keys)))
+        else:
+            stage.add(write_game_results(
+                output,
+                (
+                    e
+                    for e in iter_game_results(game_data)
+                    if (get_game_name(e), get_seed(e)) in selected_set
+                ),
+            ))
 
     # Print brief summary
     click.echo(
-        f"Analyzed groups: {len(groups)}. Selected: {len(selected_keys)}. Top-N = {top_n}."
+        f"Analyzed groups: {analyzed}. Selected: {len(selected_keys)}. Top-N = {top_n}."
     )
-    click.echo("Rank | Switches | Models | T | Game | Seed")
-    for rank, (key, switches, mcount, T) in enumerate(scored[:top_k], start=1):
+    titles = [name.replace("_", " ").title() for name in weights]
+    show_score = len(weights) > 1
+    header = ["Rank", *titles] + (["Score"] if show_score else [])
+    click.echo(" | ".join(header + ["Models", "T", "Game", "Seed"]))
+    for rank, (key, score, values, mcount, T) in enumerate(top, start=1):
         g, s = key
-        click.echo(f"{rank:4d} | {switches:8d} | {mcount:6d} | {T:2d} | {g} | {s}")
-
+        cells = [f"{rank:4d}"]
+        cells += [format_value(v, max(8, len(t))) for t, v in zip(titles, values)]
+        if show_score:
+            cells.append(format_value(score, 5))
+        cells += [f"{mcount:6d}", f"{T:2d}", g, s]
+        click.echo(" | ".join(cells))
 
 if __name__ == "__main__":
     main()
@@ -3,84 +3,296 @@
 # requires-python = ">=3.12"
 # dependencies = [
 #     "typer",
+#     "brotli",
+#     "numpy",
 # ]
 # ///
 
+import hashlib
 import json
+import os
 import random
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
 import typer
 
+import profiling
+from benchmark_index import BenchmarkIndex
+from benchmark_io import fingerprint, read_game_result
+from benchmark_records import get_model
+from compact_format import dumps_compact, shard_dir, write_split_game
+from json_rounding import dump_rounded
+from precompress import PrecompressManifest, precompress_directory
+
 
 app = typer.Typer(add_completion=False)
 
 
-def load_benchmark_data(benchmark_file: Path) -> list[dict[str, Any]]:
-    """Load and parse a benchmark file, extracting all games."""
-    with benchmark_file.open() as f:
-        data = json.load(f)
+MANIFEST_NAME = '.daily-manifest.json'
+MANIFEST_VERSION = 1
+GAMES_INDEX_NAME = 'index.json'
+GAMES_INDEX_VERSION = 1
 
-    if 'game_results' not in data:
-        raise ValueError(f"Invalid benchmark file format: {benchmark_file}")
 
-    game_results = data['game_results']
-    if not game_results or not isinstance(game_results, list):
-        raise ValueError(f"No game results found in {benchmark_file}")
+class DailyManifest:
+    """State of previous runs, kept in the output directory.
+
+    ``games`` maps every game file name to a hash of its source entries and file
+    settings (format, precision) and the metadata derived from them, so reruns only
+    re-read the games whose entries or settings changed. ``used`` maps every
+    assigned gameId to its day, so games are never reused across months. Delete
+    the file to start over.
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self.path = output_dir / MANIFEST_NAME
+        data = json.loads(self.path.read_text()) if self.path.exists() else {}
+        if data.get('version') != MANIFEST_VERSION:
+            data = {}
+        self.benchmark: dict[str, Any] = data.get('benchmark', {})
+        self.games: dict[str, dict[str, Any]] = data.get('games', {})
+        self.used: dict[str, str] = data.get('used', {})
+
+    def available_games(self) -> list[dict[str, Any]]:
+        """Metadata of the games with a valid best model, in benchmark order."""
+        return [
+            {key: record[key] for key in ('gameId', 'gameUrl', 'gameType', 'bestModel', 'bestScore')}
+            for record in self.games.values()
+            if record['bestModel'] is not None
+        ]
+
+    def save(self) -> None:
+        data = {
+            'version': MANIFEST_VERSION,
+            'benchmark': self.benchmark,
+            'games': self.games,
+            'used': self.used,
+        }
+        temp_file = self.path.with_suffix('.tmp')
+        with temp_file.open('w') as f:
+            json.dump(data, f, indent=1)
+        temp_file.replace(self.path)
 
-    # Group results by game and seed
-    games_by_key = {}
-    for result in game_results:
+
+def game_metadata(game_type: str, map_seed: str, entries: list[dict[str, Any]]) -> dict[str, Any]:
+    """Month file metadata of one game; ``bestModel`` is None without valid model data."""
+    best_score = float('-inf')
+    best_model = None
+    for result in entries:
         if 'game' not in result or 'scores' not in result:
             continue
 
-        game_info = result['game']['game']
-        game_type = game_info['name']
-        map_seed = game_info['map_seed']
-        game_key = f"{game_type}_{map_seed}"
+        # Find the best model (highest score)
+        if 'black' in result['scores']:
+            score = result['scores']['black']
+            if score > best_score:
+                best_score = score
+                # Extract model from the first player
+                if 'players' in result['game'] and result['game']['players']:
+                    best_model = result['game']['players'][0]['options']['model']
+
+    return {
+        'gameId': f"{game_type.lower()}_{map_seed}",
+        'gameUrl': f"/games/{game_type}_{map_seed}.json",
+        'gameType': game_type,
+        'bestModel': best_model,
+        'bestScore': best_score,
+        'seed': map_seed,
+        'models': [get_model(result) for result in entries],
+        'rounds': max((len(result.get('game_results') or []) for result in entries), default=0),
+    }
+
+
+GAME_FORMATS = ('json', 'compact', 'split')
+
+
+def write_game_file(
+    game_file: Path,
+    entries: list[dict[str, Any]],
+    game_format: str = 'json',
+    precision: int = 3,
+) -> None:
+    """Write one game file atomically, with floats rounded to ``precision`` decimals."""
+    if game_format == 'split':
+        write_split_game(game_file, entries, precision)
+        return
+    temp_file = game_file.with_suffix('.tmp')
+    with temp_file.open('w') as f:
+        if game_format == 'compact':
+            f.write(dumps_compact(entries, precision))
+        else:
+            for i, result in enumerate(entries):
+                f.write(',\n' if i else '[\n')
+                dump_rounded(result, f, precision, indent=0)
+            f.write('\n]')
+    temp_file.replace(game_file)
+
+
+def extract_game(
+    benchmark_file: Path,
+    spans: list[tuple[int, int]],
+    game_file: Path,
+    game_type: str,
+    map_seed: str,
+    game_format: str = 'json',
+    precision: int = 3,
+) -> dict[str, Any] | None:
+    """Decode one game's entries from their byte spans, write its file and return its metadata.
+
+    Runs in a worker process; the file is only written when the game has a valid best model.
+    Results without a game or scores are left out, and None is returned if that is all of them.
+    """
+    with benchmark_file.open('rb') as f:
+        entries = [read_game_result(f, offset, length) for offset, length in spans]
+    entries = [result for result in entries if 'game' in result and 'scores' in result]
+    if not entries:
+        return None
+    metadata = game_metadata(game_type, map_seed, entries)
+    if metadata['bestModel'] is not None:
+        write_game_file(game_file, entries, game_format, precision)
+    return metadata
 
-        if game_key not in games_by_key:
-            games_by_key[game_key] = []
-        games_by_key[game_key].append(result)
 
-    # Process each game to find the best model and extract metadata
-    processed_games = []
-    for game_key, results in games_by_key.items():
-        # Find the best model (highest score)
-        best_score = float('-inf')
-        best_model = None
-
-        for result in results:
-            if 'scores' in result and 'black' in result['scores']:
-                score = result['scores']['black']
-                if score > best_score:
-                    best_score = score
-                    # Extract model from the first player
-                    if 'game' in result and 'players' in result['game'] and result['game']['players']:
-                        best_model = result['game']['players'][0]['options']['model']
-
-        if best_model is None:
-            print(f"Warning: Could not find valid model data for {game_key}")
-            continue
+GameGroup = tuple[str, str, list[tuple[int, int]], str]
+
+
+def index_groups(benchmark_file: Path) -> Iterator[GameGroup]:
+    """(game, seed, byte spans, hash of the entries) of every group, in benchmark order.
 
-        # Extract game metadata
-        game_info = results[0]['game']['game']
-        game_type = game_info['name']
-        map_seed = game_info['map_seed']
-        game_id = f"{game_type.lower()}_{map_seed}"
-
-        processed_games.append({
-            'gameId': game_id,
-            'gameUrl': f"/games/{game_type}_{map_seed}.json",
-            'gameType': game_type,
-            'bestModel': best_model,
-            'bestScore': best_score,
-            'data': results  # Include the full data for extraction
+    The entries are located through the benchmark's sidecar index.
+    """
+    with BenchmarkIndex(benchmark_file) as bench_index, benchmark_file.open('rb') as f:
+        for game_type, map_seed in bench_index.groups():
+            spans = bench_index.spans(game_type, map_seed)
+            digest = hashlib.sha256()
+            for offset, length in spans:
+                f.seek(offset)
+                digest.update(f.read(length))
+            yield game_type, map_seed, spans, digest.hexdigest()
+
+
+def update_games(
+    benchmark_file: Path,
+    games_dir: Path,
+    manifest: DailyManifest,
+    game_format: str = 'json',
+    precision: int = 3,
+    jobs: int = 1,
+    groups: Iterable[GameGroup] | None = None,
+) -> list[str]:
+    """Bring the game files and the manifest up to date with the benchmark.
+
+    Entries are hashed per (game, seed), as listed by ``groups`` (by default
+    :func:`index_groups`), together with the format and precision of the files;
+    only games that are new, changed, missing a file or written with other
+    settings are decoded and written, by a pool of ``jobs`` processes. Nothing is
+    read at all when neither the benchmark nor the settings changed since the
+    previous run. Returns the names of the game files written.
+    """
+    source = {
+        'path': str(benchmark_file.resolve()),
+        **fingerprint(benchmark_file),
+        'gameFormat': game_format,
+        'precision': precision,
+    }
+    if source == manifest.benchmark and all(
+        'rounds' in record for record in manifest.games.values()
+    ) and all(
+        (games_dir / Path(game['gameUrl']).name).exists() for game in manifest.available_games()
+    ):
+        return []
+
+    # Records in benchmark order; None until the game is (re)extracted
+    games: dict[str, dict[str, Any] | None] = {}
+    pending: dict[str, tuple[str, str, list[tuple[int, int]], str]] = {}
+    with profiling.stage('hash_groups') as stage:
+        for game_type, map_seed, spans, entries_digest in index_groups(benchmark_file) if groups is None else groups:
+            stage.add()
+            digest = hashlib.sha256(f"{game_format}:{precision}:{entries_digest}".encode()).hexdigest()
+            file_name = f"{game_type}_{map_seed}.json"
+            record = manifest.games.get(file_name)
+            # Records of older runs lack the index fields ('rounds', ...): extract those again
+            if record is not None and record['hash'] == digest and 'rounds' in record:
+                if record['bestModel'] is None or (games_dir / file_name).exists():
+                    games[file_name] = record
+                    continue
+            games[file_name] = None
+            pending[file_name] = (game_type, map_seed, spans, digest)
+
+    written: list[str] = []
+    if pending:
+        with profiling.stage('write_game_files') as stage, ProcessPoolExecutor(max_workers=jobs) as pool, typer.progressbar(
+            length=len(pending), label='Writing game files'
+        ) as progress:
+            futures = {
+                pool.submit(
+                    extract_game,
+                    benchmark_file,
+                    spans,
+                    games_dir / file_name,
+                    game_type,
+                    map_seed,
+                    game_format,
+                    precision,
+                ): (file_name, digest)
+                for file_name, (game_type, map_seed, spans, digest) in pending.items()
+            }
+            for future in as_completed(futures):
+                file_name, digest = futures[future]
+                metadata = future.result()
+                progress.update(1)
+                if metadata is None:
+                    # Not a game: its results lack a game or scores
+                    del games[file_name]
+                    continue
+                record = games[file_name] = {'hash': digest, **metadata}
+                if record['bestModel'] is None:
+                    print(f"Warning: Could not find valid model data for {file_name.removesuffix('.json')}")
+                else:
+                    written.append(file_name)
+            stage.add(len(written))
+
+    if not games:
+        raise ValueError(f"No game results found in {benchmark_file}")
+    manifest.games = games
+    manifest.benchmark = source
+    return written
+
+
+def write_games_index(games_dir: Path, manifest: DailyManifest) -> Path:
+    """Write ``index.json`` in the games directory: every game file and what it holds.
+
+    The file is only replaced when its contents change, so its mtime can be used
+    to invalidate caches of it (see src/app/api/games/route.ts).
+    """
+    games = []
+    for record in manifest.games.values():
+        if record['bestModel'] is None:
+            continue
+        game_file = games_dir / Path(record['gameUrl']).name
+        games.append({
+            'gameId': record['gameId'],
+            'gameUrl': record['gameUrl'],
+            'gameType': record['gameType'],
+            'seed': record['seed'],
+            'models': record['models'],
+            'rounds': record['rounds'],
+            'bestModel': record['bestModel'],
+            'bestScore': record['bestScore'],
+            'bytes': game_file.stat().st_size,
         })
+    contents = json.dumps({'version': GAMES_INDEX_VERSION, 'games': games}, indent=1)
 
-    return processed_games
+    index_file = games_dir / GAMES_INDEX_NAME
+    if not index_file.exists() or index_file.read_text() != contents:
+        temp_file = index_file.with_suffix('.tmp')
+        temp_file.write_text(contents)
+        temp_file.replace(index_file)
+    return index_file
 
 
 def get_days_in_month(year: int, month: int) -> list[str]:
@@ -98,14 +310,34 @@ def get_days_in_month(year: int, month: int) -> list[str]:
     return days
 
 
+def parse_month(value: str) -> tuple[int, int]:
+    """Parse a YYYY-MM string into (year, month)."""
+    parsed = datetime.strptime(value, '%Y-%m')
+    return parsed.year, parsed.month
+
+
+def months_between(start: tuple[int, int], end: tuple[int, int]) -> list[tuple[int, int]]:
+    """All (year, month) pairs from ``start`` to ``end``, both included."""
+    months = []
+    year, month = start
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
 def generate_month_file(
     year: int,
     month: int,
     available_games: list[dict[str, Any]],
-    used_games: set[str],
+    used_games: dict[str, str],
     output_dir: Path
-) -> None:
-    """Generate a month file with daily game assignments."""
+) -> Path:
+    """Generate a month file with daily game assignments and return its path.
+
+    ``used_games`` maps already assigned gameIds to their day; the games assigned
+    here are added to it.
+    """
     month_file = output_dir / f"{year:04d}-{month:02d}.json"
 
     # Get all days in the month
@@ -135,26 +367,74 @@ def generate_month_file(
             'bestScore': game['bestScore']
         }
 
-        used_games.add(game['gameId'])
-
-    # Write the month file atomically
-    temp_file = month_file.with_suffix('.tmp')
-    with temp_file.open('w') as f:
-        json.dump(month_data, f)
+        used_games[game['gameId']] = day
 
-    temp_file.replace(month_file)
+    # Write the month file atomically, and only when its contents change
+    contents = json.dumps(month_data)
+    if not month_file.exists() or month_file.read_text() != contents:
+        temp_file = month_file.with_suffix('.tmp')
+        temp_file.write_text(contents)
+        temp_file.replace(month_file)
     print(f"Generated {month_file} with {len(month_data)} days")
+    return month_file
+
+
+def write_daily_files(
+    manifest: DailyManifest,
+    months: list[tuple[int, int]],
+    output_dir: Path,
+    games_dir: Path,
+    seed: int = 42,
+    game_format: str = 'json',
+    precompress: bool = True,
+) -> list[Path]:
+    """Assign the manifest's games to the days of ``months`` and write their month files.
+
+    Also saves the manifest, writes the games index and, with ``precompress``,
+    the .gz/.br siblings. Returns the month files.
+    """
+    # Shuffle games for random assignment, reproducibly
+    processed_games = manifest.available_games()
+    random.Random(seed).shuffle(processed_games)
+
+    # Games assigned in other months stay used; these months are reassigned from scratch
+    month_prefixes = tuple(f"{y:04d}-{m:02d}-" for y, m in months)
+    used_games = {game_id: day for game_id, day in manifest.used.items() if not day.startswith(month_prefixes)}
+
+    # Generate the month files, drawing from the same shuffled games without reuse
+    with profiling.stage('month_files') as stage:
+        month_files = [
+            generate_month_file(y, m, processed_games, used_games, output_dir)
+            for y, m in months
+        ]
+        stage.add(len(month_files))
+    manifest.used = used_games
+    manifest.save()
+    with profiling.stage('games_index') as stage:
+        games_index = write_games_index(games_dir, manifest)
+        stage.add(len(processed_games))
+
+    if precompress:
+        with profiling.stage('precompress'):
+            games_manifest = PrecompressManifest(games_dir)
+            for game_data in processed_games:
+                game_file = games_dir / Path(game_data['gameUrl']).name
+                games_manifest.update(game_file)
+                if game_format == 'split':
+                    shards = shard_dir(game_file)
+                    if shards is not None:
+                        precompress_directory(shards)
+            games_manifest.update(games_index)
+            games_manifest.save()
+
+            daily_manifest = PrecompressManifest(output_dir)
+            for month_file in month_files:
+                daily_manifest.update(month_file)
+            daily_manifest.save()
+        print("Precompressed game and month files")
+
+    return month_files
 
-def round_floats(obj):
-    """Round floats to 3 decimal places for smaller game files."""
-    if isinstance(obj, float):
-        return round(obj, 3)
-    elif isinstance(obj, dict):
-        return {k: round_floats(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [round_floats(x) for x in obj]
-    else:
-        return obj
 
 THIS_YEAR = datetime.now().year
 THIS_MONTH = datetime.now().month
@@ -166,7 +446,15 @@ def generate_daily_games(
     games_dir: Path = typer.Option(Path("public/games"), help="Output directory for extracted game files"),
     year: int = typer.Option(THIS_YEAR, help="Year to generate"),
     month: int = typer.Option(THIS_MONTH, help="Month to generate (1-12)"),
-    seed: int = typer.Option(42, help="Random seed for reproducible results")
+    from_month: str | None = typer.Option(None, "--from", help="First month of a range to generate (YYYY-MM); overrides --year/--month"),
+    to_month: str | None = typer.Option(None, "--to", help="Last month of the range (YYYY-MM, default: --from)"),
+    seed: int = typer.Option(42, help="Random seed for reproducible results"),
+    game_format: str = typer.Option("json", help="Format of the game files: json (raw entries), compact, or split (race file plus per-model token-score shards); changing it rewrites them"),
+    precision: int = typer.Option(3, min=0, help="Decimal places kept for floats in the game files; changing it rewrites them"),
+    jobs: int | None = typer.Option(None, min=1, help="Number of worker processes writing game files [default: CPU count]"),
+    precompress: bool = typer.Option(True, help="Also write .gz/.br siblings of the game and month files"),
+    profile: Path | None = typer.Option(None, help=profiling.PROFILE_HELP),
+    profile_with: list[profiling.Dump] = typer.Option([], help=profiling.PROFILE_WITH_HELP),
 ) -> None:
     """
     Generate daily games rotation files from benchmark data.
@@ -174,9 +462,18 @@ def generate_daily_games(
     This script processes a benchmark JSON file and creates monthly rotation files
     for the daily games feature. Each month file contains a mapping of dates to
     game metadata including the best performing model and score.
+
+    With --from/--to, every month of the range is generated in one run, loading the
+    benchmark once and never assigning a game twice across the range.
+
+    Runs are incremental: a manifest in the output directory records the games
+    already assigned in other months and a hash of every game's entries, so only
+    new or changed games are re-read and rewritten.
+
+    The games directory also gets an index.json listing every game file with its
+    type, seed, models, rounds, best model and score, and size in bytes.
     """
-    # Set random seed for reproducibility
-    random.seed(seed)
+    profiling.start('generate_daily_games', profile, profile_with)
 
     # Validate inputs
     if not benchmark_file.exists():
@@ -185,47 +482,44 @@ def generate_daily_games(
     if not (1 <= month <= 12):
         raise typer.Exit(f"Month must be between 1 and 12, got: {month}")
 
+    if from_month is None and to_month is not None:
+        raise typer.Exit("--to requires --from")
+
+    if from_month is not None:
+        try:
+            start = parse_month(from_month)
+            end = parse_month(to_month) if to_month is not None else start
+        except ValueError:
+            raise typer.Exit(f"Months must be given as YYYY-MM, got: {from_month} to {to_month or from_month}")
+        months = months_between(start, end)
+        if not months:
+            raise typer.Exit(f"--to must not be before --from, got: {from_month} to {to_month}")
+    else:
+        months = [(year, month)]
+
+    if game_format not in GAME_FORMATS:
+        raise typer.Exit(f"Game format must be one of {', '.join(GAME_FORMATS)}, got: {game_format}")
+
     # Create output directories
     output_dir.mkdir(parents=True, exist_ok=True)
     games_dir.mkdir(parents=True, exist_ok=True)
 
     print(f"Loading benchmark data from {benchmark_file}")
 
-    # Load and process all games from benchmark
+    # Update the game files of new or changed games only
+    manifest = DailyManifest(output_dir)
     try:
-        available_games = load_benchmark_data(benchmark_file)
+        written = update_games(benchmark_file, games_dir, manifest, game_format, precision, jobs or os.cpu_count() or 1)
     except Exception as e:
         raise typer.Exit(f"Error loading benchmark data: {e}")
 
-    if not available_games:
+    processed_games = manifest.available_games()
+    if not processed_games:
         raise typer.Exit("No valid games could be loaded from benchmark")
 
-    print(f"Found {len(available_games)} games in benchmark")
-
-    # Extract games and process metadata
-    used_games = set()
-    processed_games = []
-
-    for game_data in available_games:
-        # Extract the game file to games_dir
-        game_file = games_dir / f"{game_data['gameType']}_{game_data['gameId'].split('_')[1]}.json"
-        if not game_file.exists():
-            with game_file.open('w') as f:
-                json.dump(round_floats(game_data['data']), f, indent=0)
-            print(f"Extracted {game_file}")
-
-        # Remove the data from game_data to keep it clean
-        del game_data['data']
-        processed_games.append(game_data)
-        print(f"Loaded {game_data['gameId']} - {game_data['gameType']} (best: {game_data['bestModel']}, score: {game_data['bestScore']:.2f})")
-
-    print(f"Successfully processed {len(processed_games)} games")
-
-    # Shuffle games for random assignment
-    random.shuffle(processed_games)
+    print(f"Found {len(processed_games)} games in benchmark ({len(written)} new or changed)")
 
-    # Generate the month file
-    generate_month_file(year, month, processed_games, used_games, output_dir)
+    write_daily_files(manifest, months, output_dir, games_dir, seed, game_format, precompress)
 
     print("Daily games generation completed!")
 
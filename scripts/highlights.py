@@ -0,0 +1,228 @@
+"""Highlight events of a game's score race, computed ahead of time for the web app.
+
+This is a port of the detectors of ``src/lib/tour/detectors.ts`` (first_to_top,
+lead_change, big_jump, max_token_positive, max_token_negative), evaluated on the
+(models x rounds) score matrix of one (game, seed) instead of frame by frame.
+Events have the client's shape::
+
+    {"type": ..., "modelId": ..., "round": ..., "magnitudeRaw": ...,
+     "magnitudeNorm": ..., "details": {...}}
+
+and come in the order of ``computeEvents``, so a game file can embed them and
+the client skips detection. The client detects events on the values it decodes
+from the game file, so pass the ``quantize`` matching how the file stores them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+
+from benchmark_records import reward_values, run_scores
+
+Quantize = Callable[[np.ndarray], np.ndarray]
+# Per reward event: (token ids, token scores)
+TokenSeqs = list[tuple[np.ndarray, np.ndarray]]
+
+
+def fixed_point(precision: int) -> Quantize:
+    """Values as decoded from a compact game file (``round(x * 10**p) / 10**p``)."""
+    scale = 10**precision
+    return lambda values: np.rint(values * scale) / scale
+
+
+class _Tokens:
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def __call__(self, token: str) -> int:
+        idx = self.ids.get(token)
+        if idx is None:
+            idx = self.ids[token] = len(self.strings)
+            self.strings.append(token)
+        return idx
+
+
+def _race_inputs(
+    entries: Sequence[dict[str, Any]], quantize: Quantize | None, tokens: _Tokens
+) -> tuple[list[str], np.ndarray, list[list[TokenSeqs]]] | None:
+    """(models, scores (M, T), token sequences [model][round]) as the client sees them.
+
+    None when the client would reject the entries (repeated models or uneven rounds).
+    """
+    models = [str(entry["game"]["players"][0]["id"]) for entry in entries]
+    runs = [entry.get("game_results") or [] for entry in entries]
+    if not runs or len(set(models)) != len(models):
+        return None
+    n_rounds = len(runs[0])
+    if n_rounds == 0 or any(len(r) != n_rounds for r in runs):
+        return None
+
+    game = str(entries[0]["game"]["game"]["name"])
+    q = quantize or (lambda values: values)
+    scores = q(np.array([run_scores(entry) for entry in entries], dtype=float))
+    token_seqs = [
+        [
+            [
+                (
+                    np.array([tokens(str(tok)) for tok, _score in value.get("pairs") or []], dtype=np.int64),
+                    q(np.array([score for _tok, score in value.get("pairs") or []], dtype=float)),
+                )
+                for value in reward_values(game, run)
+            ]
+            for run in r
+        ]
+        for r in runs
+    ]
+    return models, scores, token_seqs
+
+
+def _max_token_change(prev: TokenSeqs, curr: TokenSeqs, positive: bool) -> dict[str, Any] | None:
+    """Largest change of a same-position, same-token score between two rounds."""
+    changes: list[np.ndarray] = []
+    positions: list[tuple[int, int]] = []
+    for seq_index, ((prev_ids, prev_scores), (curr_ids, curr_scores)) in enumerate(zip(prev, curr)):
+        n = min(len(prev_ids), len(curr_ids))
+        same = prev_ids[:n] == curr_ids[:n]
+        fill = -np.inf if positive else np.inf
+        changes.append(np.where(same, curr_scores[:n] - prev_scores[:n], fill))
+        positions.extend((seq_index, i) for i in range(n))
+    if not positions:
+        return None
+    change = np.concatenate(changes)
+    # argmax/argmin return the first extremum, like the client's strict comparison
+    best = int(np.argmax(change) if positive else np.argmin(change))
+    value = float(change[best])
+    if not (value > 0 if positive else value < 0):
+        return None
+    seq_index, token_index = positions[best]
+    return {
+        "change": value,
+        "prevScore": float(prev[seq_index][1][token_index]),
+        "currScore": float(curr[seq_index][1][token_index]),
+        "tokenId": int(curr[seq_index][0][token_index]),
+        "seqIndex": seq_index,
+        "tokenIndex": token_index,
+    }
+
+
+def detect_events(
+    models: list[str], scores: np.ndarray, token_seqs: list[list[TokenSeqs]], tokens: list[str]
+) -> list[dict[str, Any]]:
+    n_models, n_rounds = scores.shape
+    best_scores = np.maximum.accumulate(scores, axis=1)
+    # Round of each model's running best (the first round reaching it)
+    improved = np.ones_like(scores, dtype=bool)
+    improved[:, 1:] = scores[:, 1:] > best_scores[:, :-1]
+    best_round = np.maximum.accumulate(np.where(improved, np.arange(n_rounds), 0), axis=1)
+    # Stable sort on -score: ties keep the models' order, as the client's sort does
+    order = np.argsort(-best_scores, axis=0, kind="stable")
+    leaders = order[0]
+
+    first_to_top: list[dict[str, Any]] = []
+    start_rank = np.empty(n_models, dtype=np.int64)
+    start_rank[order[:, 0]] = np.arange(1, n_models + 1)
+    _unique, first_rounds = np.unique(leaders, return_index=True)
+    for r in sorted(first_rounds.tolist()):
+        model = leaders[r]
+        rank = int(start_rank[model])
+        if rank > 1:
+            first_to_top.append({
+                "type": "first_to_top",
+                "modelId": models[model],
+                "round": r,
+                "magnitudeRaw": rank - 1,
+                "magnitudeNorm": (rank - 1) / max(1, n_models - 1),
+                "details": {"startRank": rank},
+            })
+
+    lead_changes: list[dict[str, Any]] = []
+    if n_models >= 2:
+        runner_up = order[1]
+        for r in (np.flatnonzero(leaders[1:] != leaders[:-1]) + 1).tolist():
+            leader_score = float(best_scores[leaders[r], r])
+            runner_up_score = float(best_scores[runner_up[r], r])
+            margin = leader_score - runner_up_score
+            lead_changes.append({
+                "type": "lead_change",
+                "modelId": models[leaders[r]],
+                "round": r,
+                "magnitudeRaw": margin,
+                "magnitudeNorm": margin,
+                "details": {
+                    "previousLeaderId": models[leaders[r - 1]],
+                    "margin": margin,
+                    "leaderScore": leader_score,
+                    "runnerUpScore": runner_up_score,
+                },
+            })
+
+    big_jumps: list[dict[str, Any]] = []
+    if n_rounds >= 2:
+        deltas = np.diff(best_scores, axis=1)
+        jump_rounds = np.argmax(deltas, axis=1) + 1
+        for m in range(n_models):
+            r = int(jump_rounds[m])
+            delta = float(deltas[m, r - 1])
+            if delta > 0:
+                big_jumps.append({
+                    "type": "big_jump",
+                    "modelId": models[m],
+                    "round": r,
+                    "magnitudeRaw": delta,
+                    "magnitudeNorm": delta * r / (r + 2),
+                    "details": {
+                        "delta": delta,
+                        "previousScore": float(best_scores[m, r - 1]),
+                        "newScore": float(best_scores[m, r]),
+                    },
+                })
+
+    token_events: dict[bool, list[dict[str, Any]]] = {True: [], False: []}
+    for r in range(1, n_rounds):
+        for m in range(n_models):
+            prev_best, curr_best = best_round[m, r - 1], best_round[m, r]
+            if prev_best == curr_best:
+                # Same best round on both sides: every change is zero
+                continue
+            for positive, events in token_events.items():
+                change = _max_token_change(token_seqs[m][prev_best], token_seqs[m][curr_best], positive)
+                if change is None:
+                    continue
+                details = {
+                    "token": tokens[change["tokenId"]],
+                    "previousScore": change["prevScore"],
+                    "currentScore": change["currScore"],
+                    "change": change["change"],
+                }
+                magnitude = change["change"]
+                if not positive:
+                    magnitude = details["absChange"] = abs(change["change"])
+                details["seqIndex"] = change["seqIndex"]
+                details["tokenIndex"] = change["tokenIndex"]
+                events.append({
+                    "type": "max_token_positive" if positive else "max_token_negative",
+                    "modelId": models[m],
+                    "round": r,
+                    "magnitudeRaw": magnitude,
+                    "magnitudeNorm": magnitude,
+                    "details": details,
+                })
+
+    # Same order as computeEvents in src/lib/highlights.ts
+    return first_to_top + lead_changes + big_jumps + token_events[True] + token_events[False]
+
+
+def compute_events(
+    entries: Sequence[dict[str, Any]], quantize: Quantize | None = None
+) -> list[dict[str, Any]] | None:
+    """Highlight events of one (game, seed) group, or None if the client cannot load it."""
+    tokens = _Tokens()
+    inputs = _race_inputs(entries, quantize, tokens)
+    if inputs is None:
+        return None
+    models, scores, token_seqs = inputs
+    return detect_events(models, scores, token_seqs, tokens.strings)
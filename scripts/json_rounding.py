@@ -0,0 +1,106 @@
+"""JSON encoding with floats rounded on the fly.
+
+Game files only need a few decimals, but rounding them used to mean building a
+rounded copy of every entry before ``json.dump``. :class:`RoundingEncoder`
+rounds each float as it is written instead, so entries are encoded in a single
+pass with no intermediate copy. The output is the same as dumping the rounded
+copy: ``repr(round(x, precision))`` for every float value.
+
+Only the pure-Python encoder accepts a custom float formatter, which is the one
+``json.dump`` and any ``indent`` already use, so nothing is lost in speed. It is
+built with ``json.encoder._make_iterencode``, which is private: without it,
+:func:`dump_rounded` falls back to dumping a rounded copy.
+
+As with the rounded copy, float dict keys are written exactly.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from json.encoder import INFINITY, encode_basestring, encode_basestring_ascii
+from typing import IO, Any
+
+try:
+    from json.encoder import _make_iterencode
+except ImportError:  # private, may go away
+    _make_iterencode = None
+
+
+def round_floats(obj: Any, precision: int) -> Any:
+    """Copy of ``obj`` with float values (not keys) rounded to ``precision`` decimals."""
+    if isinstance(obj, float):
+        return round(obj, precision)
+    if isinstance(obj, dict):
+        return {k: round_floats(v, precision) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [round_floats(x, precision) for x in obj]
+    return obj
+
+
+class RoundingEncoder(json.JSONEncoder):
+    """``json.JSONEncoder`` that rounds float values to ``precision`` decimals.
+
+    Pass it as ``cls`` to ``json.dump``/``json.dumps``; extra keyword arguments
+    reach the constructor, e.g. ``json.dump(obj, f, cls=RoundingEncoder, precision=3)``.
+    """
+
+    def __init__(self, *, precision: int = 3, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.precision = precision
+
+    def iterencode(self, o: Any, _one_shot: bool = False) -> Iterator[str]:
+        if _make_iterencode is None:
+            return super().iterencode(round_floats(o, self.precision), _one_shot)
+        markers: dict[int, Any] | None = {} if self.check_circular else None
+        encode_str = encode_basestring_ascii if self.ensure_ascii else encode_basestring
+        # The last float written, and its text. Float keys go through floatstr,
+        # then straight to encoder: that text is what tells them from values.
+        last: list[Any] = [None, None]
+
+        def floatstr(
+            f: float,
+            allow_nan: bool = self.allow_nan,
+            ndigits: int = self.precision,
+            _repr=float.__repr__,
+        ) -> str:
+            if f != f:
+                text = "NaN"
+            elif f == INFINITY:
+                text = "Infinity"
+            elif f == -INFINITY:
+                text = "-Infinity"
+            else:
+                text = last[1] = _repr(round(f, ndigits))
+                last[0] = f
+                return text
+            if not allow_nan:
+                raise ValueError(f"Out of range float values are not JSON compliant: {f!r}")
+            return text
+
+        def encoder(s: str, _encode_str=encode_str) -> str:
+            if s is last[1]:
+                s = float.__repr__(last[0])
+            return _encode_str(s)
+
+        iterencode = _make_iterencode(
+            markers,
+            self.default,
+            encoder,
+            self.indent,
+            floatstr,
+            self.key_separator,
+            self.item_separator,
+            self.sort_keys,
+            self.skipkeys,
+            _one_shot,
+        )
+        return iterencode(o, 0)
+
+
+def dump_rounded(obj: Any, f: IO[str], precision: int | None, **kwargs: Any) -> None:
+    """``json.dump`` with floats rounded to ``precision`` decimals (None: exact)."""
+    if precision is None:
+        json.dump(obj, f, **kwargs)
+    else:
+        json.dump(obj, f, cls=RoundingEncoder, precision=precision, **kwargs)
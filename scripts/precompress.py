@@ -0,0 +1,84 @@
+"""Precompressed ``.gz`` / ``.br`` siblings for generated static files.
+
+The server (or a proxy in front of it) can then serve the compressed bytes
+directly instead of compressing every response. Siblings are written
+atomically and only regenerated when the source's content hash changes; the
+hashes are kept in a small manifest per directory.
+
+Brotli needs the optional ``brotli`` package; without it only ``.gz`` is written.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional, gzip-only without it
+    brotli = None
+
+MANIFEST_NAME = ".precompressed.json"
+
+
+def _encodings() -> dict[str, Callable[[bytes], bytes]]:
+    encodings: dict[str, Callable[[bytes], bytes]] = {
+        ".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        encodings[".br"] = lambda data: brotli.compress(data, quality=11)
+    return encodings
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temp_file = path.with_name(path.name + ".tmp")
+    temp_file.write_bytes(data)
+    temp_file.replace(path)
+
+
+def precompress(path: Path, previous_digest: str | None = None) -> str:
+    """Write the compressed siblings of ``path`` and return its content digest.
+
+    Nothing is written when the content still hashes to ``previous_digest`` and
+    all siblings exist.
+    """
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    encodings = _encodings()
+    siblings = {path.with_name(path.name + ext): ext for ext in encodings}
+    if digest == previous_digest and all(p.exists() for p in siblings):
+        return digest
+    for sibling, ext in siblings.items():
+        _write_atomic(sibling, encodings[ext](data))
+    return digest
+
+
+class PrecompressManifest:
+    """Content digests of the precompressed files of one directory."""
+
+    def __init__(self, directory: Path) -> None:
+        self.path = directory / MANIFEST_NAME
+        self.digests: dict[str, str] = (
+            json.loads(self.path.read_text()) if self.path.exists() else {}
+        )
+
+    def update(self, path: Path) -> None:
+        """Precompress ``path`` (a file of this directory) if it changed."""
+        self.digests[path.name] = precompress(path, self.digests.get(path.name))
+
+    def save(self) -> None:
+        _write_atomic(
+            self.path, json.dumps(self.digests, indent=1, sort_keys=True).encode()
+        )
+
+
+def precompress_directory(directory: Path, pattern: str = "*.json") -> None:
+    """Precompress the files of ``directory`` matching ``pattern`` that changed."""
+    manifest = PrecompressManifest(directory)
+    for path in sorted(directory.glob(pattern)):
+        if path.name != MANIFEST_NAME:
+            manifest.update(path)
+    manifest.save()
@@ -0,0 +1,226 @@
+"""Per-stage timing and memory instrumentation of the pipeline scripts.
+
+The scripts mark their stages with :func:`stage`, counting what they process::
+
+    with profiling.stage("write_game_files") as s:
+        ...
+        s.add(len(pending))
+
+Stages cost nothing unless the script runs with ``--profile REPORT``
+(:func:`start`). Then every stage records its wall time, CPU time (its own and
+its worker processes'), the peak RSS of the process at its end, how much that
+peak grew during the stage, and its item count. When the script exits, the
+report is written as JSON (one line appended per run for a ``.jsonl`` path, to
+follow trends across runs) and summarized in one line on stderr.
+
+``--profile-with cprofile`` also dumps a cProfile profile of the whole run to
+``<report>.pstats`` (read it with ``pstats``); ``--profile-with tracemalloc``
+records the peak of Python allocations of every stage and dumps a tracemalloc
+snapshot to ``<report>.tracemalloc`` (``tracemalloc.Snapshot.load``).
+Stages are sequential: nest them and the outer one includes the inner ones.
+"""
+
+from __future__ import annotations
+
+import atexit
+import cProfile
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+import click
+
+
+class Dump(str, Enum):
+    """Optional profiles of a whole run, dumped next to the report."""
+
+    cprofile = "cprofile"
+    tracemalloc = "tracemalloc"
+
+
+DUMPS = tuple(dump.value for dump in Dump)
+PROFILE_HELP = (
+    "Write the wall time, CPU time, peak RSS and item count of every stage as JSON "
+    "to this file (appending a line to a .jsonl file) and summarize them on stderr."
+)
+PROFILE_WITH_HELP = (
+    "With --profile, also dump a cProfile (<report>.pstats) or tracemalloc "
+    "(<report>.tracemalloc) profile (repeatable)."
+)
+
+# ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+_RSS_UNIT = 1024 if sys.platform == "darwin" else 1
+
+
+def _usage() -> tuple[float, float, int]:
+    """(own CPU seconds, reaped children's CPU seconds, peak RSS in KB)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        own.ru_utime + own.ru_stime,
+        children.ru_utime + children.ru_stime,
+        own.ru_maxrss // _RSS_UNIT,
+    )
+
+
+@dataclass
+class Stage:
+    name: str
+    items: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    children_cpu_s: float = 0.0
+    peak_rss_kb: int = 0
+    rss_growth_kb: int = 0
+    # Peak of the Python allocations during the stage, with tracemalloc
+    traced_peak_kb: int | None = None
+
+    def add(self, n: int = 1) -> None:
+        self.items += n
+
+
+class _NullStage(Stage):
+    def add(self, n: int = 1) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage("")
+
+
+class Profiler:
+    def __init__(self, script: str, dumps: Iterable[str] = ()) -> None:
+        dumps = set(dumps)
+        unknown = dumps - set(DUMPS)
+        if unknown:
+            raise ValueError(f"Unknown profile dumps: {', '.join(sorted(unknown))}")
+        self.script = script
+        self.stages: list[Stage] = []
+        self._cprofile = cProfile.Profile() if "cprofile" in dumps else None
+        self._tracemalloc = "tracemalloc" in dumps
+        self._started = datetime.now(timezone.utc)
+        self._start_wall = time.perf_counter()
+        self._start_usage = _usage()
+        if self._tracemalloc:
+            tracemalloc.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        s = Stage(name)
+        wall = time.perf_counter()
+        cpu, children_cpu, rss = _usage()
+        if self._tracemalloc:
+            tracemalloc.reset_peak()
+        try:
+            yield s
+        finally:
+            end_cpu, end_children_cpu, end_rss = _usage()
+            s.wall_s = time.perf_counter() - wall
+            s.cpu_s = end_cpu - cpu
+            s.children_cpu_s = end_children_cpu - children_cpu
+            s.peak_rss_kb = end_rss
+            s.rss_growth_kb = end_rss - rss
+            if self._tracemalloc:
+                s.traced_peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+            self.stages.append(s)
+
+    def report(self) -> dict[str, Any]:
+        cpu, children_cpu, rss = _usage()
+        start_cpu, start_children_cpu, _rss = self._start_usage
+        return {
+            "script": self.script,
+            "argv": sys.argv[1:],
+            "started": self._started.isoformat(),
+            "python": platform.python_version(),
+            "wall_s": time.perf_counter() - self._start_wall,
+            "cpu_s": cpu - start_cpu,
+            "children_cpu_s": children_cpu - start_children_cpu,
+            "peak_rss_kb": rss,
+            "stages": [asdict(s) for s in self.stages],
+        }
+
+    def finish(self, report_file: Path) -> dict[str, Any]:
+        """Stop profiling; write the report and dumps, and summarize them on stderr."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(report_file.with_name(report_file.name + ".pstats"))
+        if self._tracemalloc:
+            tracemalloc.take_snapshot().dump(
+                str(report_file.with_name(report_file.name + ".tracemalloc"))
+            )
+            tracemalloc.stop()
+        report = self.report()
+
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        if report_file.suffix == ".jsonl":
+            with report_file.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+        else:
+            report_file.write_text(json.dumps(report, indent=1), encoding="utf-8")
+
+        stages = " | ".join(
+            f"{s.name} {s.wall_s:.2f}s" + (f" ({s.items})" if s.items else "")
+            for s in self.stages
+        )
+        click.echo(
+            f"[profile] {self.script}: {report['wall_s']:.2f}s wall, "
+            f"{report['cpu_s'] + report['children_cpu_s']:.2f}s CPU, "
+            f"{report['peak_rss_kb'] / 1024:.1f} MB peak RSS"
+            + (f" | {stages}" if stages else ""),
+            err=True,
+        )
+        return report
+
+
+_active: Profiler | None = None
+
+
+def stage(name: str) -> AbstractContextManager[Stage]:
+    """Time the block as the stage ``name`` of the running profile, if any."""
+    if _active is None:
+        return nullcontext(_NULL_STAGE)
+    return _active.stage(name)
+
+
+def start(script: str, report_file: Path | None, dumps: Iterable[str] = ()) -> None:
+    """Profile the rest of this process into ``report_file`` (nothing if it is None).
+
+    The report is written when the interpreter exits, so it covers early exits
+    and errors too.
+    """
+    global _active
+    if report_file is None:
+        return
+    try:
+        _active = Profiler(script, dumps)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--profile-with") from None
+    atexit.register(_active.finish, report_file)
+
+
+def options(f: Callable[..., Any]) -> Callable[..., Any]:
+    """The --profile and --profile-with options of a click command."""
+    f = click.option(
+        "--profile-with",
+        "profile_with",
+        type=click.Choice(DUMPS),
+        multiple=True,
+        help=PROFILE_WITH_HELP,
+    )(f)
+    return click.option(
+        "--profile",
+        "profile",
+        type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
+        help=PROFILE_HELP,
+    )(f)
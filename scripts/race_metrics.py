@@ -0,0 +1,107 @@
+"""Interestingness metrics over the score race of one (game, seed) group.
+
+Every metric reads a :class:`Race`: the padded cumulative-max scores of the
+group's models as an (M, T) array, with rows in model-name order, plus the rank
+of every model at every round. The race is built once per group and all the
+requested metrics are evaluated on it, so ranking costs a single pass however
+many metrics are combined. New metrics register themselves with ``@metric``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, Sequence
+
+import numpy as np
+
+MetricFn = Callable[["Race"], float]
+METRICS: dict[str, MetricFn] = {}
+
+
+def metric(name: str) -> Callable[[MetricFn], MetricFn]:
+    def register(fn: MetricFn) -> MetricFn:
+        METRICS[name] = fn
+        return fn
+
+    return register
+
+
+class Race:
+    """Cumulative-max scores and ranks of a group's models over time."""
+
+    __slots__ = ("models", "scores", "ranks", "top_n")
+
+    def __init__(
+        self, model_to_cummax: Mapping[str, Sequence[float]], max_T: int, top_n: int
+    ) -> None:
+        self.models = sorted(model_to_cummax)
+        self.top_n = top_n
+        # Missing rounds repeat the last score; models without runs rank last
+        self.scores = np.full((len(self.models), max_T), -np.inf)
+        for i, model in enumerate(self.models):
+            cm = model_to_cummax[model]
+            if len(cm):
+                self.scores[i, : len(cm)] = cm
+                self.scores[i, len(cm) :] = cm[-1]
+
+        # Rows are in name order, so a stable sort on -score breaks ties by name
+        order = np.argsort(-self.scores, axis=0, kind="stable")
+        self.ranks = np.empty_like(order)
+        positions = np.broadcast_to(
+            np.arange(1, len(self.models) + 1)[:, None], order.shape
+        )
+        np.put_along_axis(self.ranks, order, positions, axis=0)
+
+    def leaders(self) -> np.ndarray:
+        """Row index of the leading model at each round."""
+        return np.argmin(self.ranks, axis=0)
+
+
+@metric("switches")
+def switches(race: Race) -> float:
+    """Upward rank moves that land within the top-N frontier."""
+    ranks = race.ranks
+    improved = (ranks[:, 1:] <= race.top_n) & (ranks[:, 1:] < ranks[:, :-1])
+    return float(improved.sum())
+
+
+@metric("lead_changes")
+def lead_changes(race: Race) -> float:
+    """Rounds where the leader differs from the previous round's."""
+    leaders = race.leaders()
+    return float(np.count_nonzero(leaders[1:] != leaders[:-1]))
+
+
+@metric("distinct_leaders")
+def distinct_leaders(race: Race) -> float:
+    """Number of different models that held the lead at some round."""
+    return float(len(np.unique(race.leaders())))
+
+
+@metric("final_upset")
+def final_upset(race: Race) -> float:
+    """Places climbed in the last round by the final leader (0 if it already led)."""
+    if race.ranks.shape[1] < 2:
+        return 0.0
+    winner = race.leaders()[-1]
+    return float(race.ranks[winner, -2] - 1)
+
+
+@metric("comeback")
+def comeback(race: Race) -> float:
+    """Largest climb from a model's worst rank to its final rank."""
+    climbs = race.ranks.max(axis=1) - race.ranks[:, -1]
+    return float(climbs.max(initial=0))
+
+
+@metric("spread")
+def spread(race: Race) -> float:
+    """Standard deviation of the final scores (low means a close finish)."""
+    final = race.scores[:, -1]
+    final = final[np.isfinite(final)]
+    if len(final) < 2:
+        return 0.0
+    return float(final.std())
+
+
+def evaluate(race: Race, names: Sequence[str]) -> tuple[float, ...]:
+    return tuple(METRICS[name](race) for name in names)
@@ -0,0 +1,163 @@
+"""Per-(game, seed) summary of a benchmark, computed in one streaming pass.
+
+Most questions about a benchmark only need the score race of every group, not
+the moves or token scores that make up nearly all of its bytes. The summary is
+a small JSON file next to the benchmark (``benchmarkResults.json.summary.json``)
+with, for every group in order of first appearance::
+
+    {"game": "Condense", "seed": "1003",
+     "models": [...],            # one per entry, in benchmark order
+     "scores": [[...], ...],     # scores.black of every run, per entry
+     "cummax": [[...], ...],     # cumulative max of those scores
+     "best_model": "gpt-5",      # entry with the highest scores.black
+     "best_score": 14.2,
+     "rounds": 10}               # longest run count
+
+Tools that only need scores read it with :func:`load_summary`, which builds it
+on first use and rebuilds it whenever the benchmark's size or mtime change.
+"""
+
+from __future__ import annotations
+
+import json
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import click
+
+from benchmark_io import fingerprint, iter_game_results
+from benchmark_records import Entry, cumulative_max
+
+FORMAT = "xega-summary"
+SUMMARY_VERSION = 2
+
+
+def summary_path(benchmark: Path) -> Path:
+    return benchmark.with_name(benchmark.name + ".summary.json")
+
+
+@dataclass(slots=True)
+class GroupSummary:
+    game: str
+    seed: str
+    models: list[str] = field(default_factory=list)
+    scores: list[array[float]] = field(default_factory=list)
+    cummax: list[list[float]] = field(default_factory=list)
+    best_model: str | None = None
+    best_score: float | None = None
+    rounds: int = 0
+
+    def add(self, record: Entry, score: float | None) -> None:
+        """Add an entry's record and its overall ``scores.black``."""
+        self.models.append(record.model)
+        self.scores.append(record.scores)
+        self.cummax.append(cumulative_max(record.scores))
+        self.rounds = max(self.rounds, len(record.scores))
+        if score is not None and (self.best_score is None or score > self.best_score):
+            self.best_model = record.model
+            self.best_score = float(score)
+
+    def model_scores(self) -> dict[str, array[float]]:
+        """{model: run scores}; like the scripts, a repeated model keeps its last entry."""
+        return dict(zip(self.models, self.scores))
+
+    def model_cummax(self) -> dict[str, list[float]]:
+        return dict(zip(self.models, self.cummax))
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "game": self.game,
+            "seed": self.seed,
+            "models": self.models,
+            "scores": [s.tolist() for s in self.scores],
+            "cummax": self.cummax,
+            "best_model": self.best_model,
+            "best_score": self.best_score,
+            "rounds": self.rounds,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> GroupSummary:
+        return cls(
+            data["game"],
+            data["seed"],
+            data["models"],
+            [array("d", s) for s in data["scores"]],
+            data["cummax"],
+            data["best_model"],
+            data["best_score"],
+            data["rounds"],
+        )
+
+
+def summarize(benchmark: Path) -> list[GroupSummary]:
+    """Summarize every group of ``benchmark`` with one streaming pass over it."""
+    groups: dict[tuple[str, str], GroupSummary] = {}
+    for entry in iter_game_results(benchmark, skip_xrt_history=True):
+        record = Entry.from_json(entry)
+        group = groups.get(record.key)
+        if group is None:
+            group = groups[record.key] = GroupSummary(record.game, record.seed)
+        group.add(record, (entry.get("scores") or {}).get("black"))
+    return list(groups.values())
+
+
+def build_summary(benchmark: Path, output: Path | None = None) -> Path:
+    """(Re)write the summary of ``benchmark`` atomically; return its path."""
+    path = output or summary_path(benchmark)
+    data = {
+        "format": FORMAT,
+        "version": SUMMARY_VERSION,
+        "source": fingerprint(benchmark),
+        "groups": [group.to_json() for group in summarize(benchmark)],
+    }
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    temp_path.replace(path)
+    return path
+
+
+def _read(path: Path) -> dict[str, Any] | None:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != FORMAT or data.get("version") != SUMMARY_VERSION:
+        return None
+    return data
+
+
+def load_summary(benchmark: Path, *, rebuild: bool = False) -> list[GroupSummary]:
+    """Group summaries of ``benchmark``, from its summary file when it is fresh."""
+    path = summary_path(benchmark)
+    data = None if rebuild else _read(path)
+    if data is None or data["source"] != fingerprint(benchmark):
+        build_summary(benchmark)
+        data = _read(path)
+        assert data is not None
+    return [GroupSummary.from_json(group) for group in data["groups"]]
+
+
+@click.command()
+@click.option(
+    "--game-data",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
+    required=True,
+    help="Path to benchmark JSON (full or filtered).",
+)
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
+    help="Where to write the summary.  [default: <game-data>.summary.json, read by the other scripts]",
+)
+def main(game_data: Path, output: Path | None) -> None:
+    """Summarize a benchmark per (game, seed): models, run scores, cumulative
+    maxima, best model and score, and round count."""
+    path = build_summary(game_data, output)
+    click.echo(f"Wrote summary to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Generate a synthetic benchmarkResults.json of any size.
+
+Entries have the same shape as real benchmark entries (everything the scripts
+and the web app read: game and player metadata, per-run scores, the elicited
+move and the token-level reward events of each game), filled with seeded random
+data so that the output for given parameters is always the same.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import click
+
+from benchmark_io import write_game_results
+
+GAME_NAMES = ("Condense", "Contrast", "Synthesize")
+MODEL_NAMES = (
+    "gpt-5",
+    "o3",
+    "claude-opus-4-1-20250805",
+    "gemini-2.5-pro",
+    "grok-4-0709",
+    "deepseek-chat",
+    "gpt-4.1",
+    "claude-sonnet-4-20250514",
+    "gemini-2.5-flash",
+    "grok-3-mini",
+)
+# Scales of the reward events of a round, in xrt_history order: one text to make
+# likely (Condense), a negative and a positive text (Contrast), three texts at
+# once (Synthesize). As in the web app's converters, other games have one event.
+REWARD_SCALES = {
+    "Condense": (1,),
+    "Contrast": (-1, 1),
+    "Synthesize": (1, 1, 1),
+}
+TOKENS = (" the", " a", " of", " and", " to", " in", " is", " that", "ing", ".", ",", " é", "☃")
+
+
+@dataclass(frozen=True)
+class Shape:
+    """Dimensions of a synthetic benchmark."""
+
+    games: int = 3
+    seeds: int = 8
+    models: int = 6
+    rounds: int = 10
+    tokens: int = 32
+
+    @property
+    def entries(self) -> int:
+        return self.games * self.seeds * self.models
+
+
+def _names(base: tuple[str, ...], count: int) -> list[str]:
+    return [
+        base[i % len(base)] + (f"-{i // len(base)}" if i >= len(base) else "")
+        for i in range(count)
+    ]
+
+
+def iter_synthetic_entries(shape: Shape, seed: int = 0) -> Iterator[dict[str, Any]]:
+    rng = random.Random(seed)
+    models = _names(MODEL_NAMES, shape.models)
+    for game in _names(GAME_NAMES, shape.games):
+        scales = REWARD_SCALES.get(game.split("-")[0], (1,))
+        for s in range(shape.seeds):
+            map_seed = str(1000 + s)
+            texts = [[rng.choice(TOKENS) for _ in range(shape.tokens)] for _ in scales]
+            for model in models:
+                skill = rng.uniform(-2, 2)
+                runs = []
+                # Every model plays the same rounds, as the web app expects
+                for t in range(shape.rounds):
+                    score = round(rng.gauss(5 + skill, 3), 2)
+                    history: list[dict[str, Any]] = [
+                        {"type": "elicit_response", "response": f"move {t} of {model}"}
+                    ]
+                    for scale, text in zip(scales, texts):
+                        pairs = [[tok, rng.gauss(0, 2)] for tok in text]
+                        history.append(
+                            {
+                                "type": "reward",
+                                "value": {"__TokenXentList__": True, "scale": scale, "pairs": pairs},
+                            }
+                        )
+                    runs.append({"scores": {"black": score}, "xrt_history": history})
+                yield {
+                    "game": {
+                        "game": {"name": game, "map_seed": map_seed},
+                        "map_seed": map_seed,
+                        "players": [{"id": model, "options": {"model": model}}],
+                    },
+                    "scores": {"black": max(run["scores"]["black"] for run in runs)},
+                    "game_results": runs,
+                }
+
+
+def write_synthetic_benchmark(path: Path, shape: Shape, seed: int = 0) -> int:
+    """Write a synthetic benchmark to ``path``; return the number of entries."""
+    return write_game_results(path, iter_synthetic_entries(shape, seed))
+
+
+@click.command()
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
+    required=True,
+    help="Path of the benchmark JSON to write.",
+)
+@click.option("--games", type=click.IntRange(min=1), default=Shape.games, show_default=True, help="Number of games.")
+@click.option("--seeds", type=click.IntRange(min=1), default=Shape.seeds, show_default=True, help="Map seeds per game.")
+@click.option("--models", type=click.IntRange(min=1), default=Shape.models, show_default=True, help="Models per (game, seed).")
+@click.option("--rounds", type=click.IntRange(min=1), default=Shape.rounds, show_default=True, help="Rounds per model.")
+@click.option("--tokens", type=click.IntRange(min=0), default=Shape.tokens, show_default=True, help="Tokens per reward event.")
+@click.option("--random-seed", type=int, default=0, show_default=True, help="Seed of the generated data.")
+def main(
+    output: Path,
+    games: int,
+    seeds: int,
+    models: int,
+    rounds: int,
+    tokens: int,
+    random_seed: int,
+) -> None:
+    """Write a synthetic benchmark file for testing and benchmarking the scripts."""
+    count = write_synthetic_benchmark(
+        output, Shape(games, seeds, models, rounds, tokens), random_seed
+    )
+    click.echo(f"Wrote {count} entries ({output.stat().st_size / 1e6:.1f} MB) to {output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""The scripts import their siblings directly, as when run from ``scripts/``."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS))
+
+from synthetic_benchmark import Shape, write_synthetic_benchmark  # noqa: E402
+
+SMALL = Shape(games=2, seeds=3, models=4, rounds=6, tokens=5)
+
+
+@pytest.fixture
+def benchmark(tmp_path: Path) -> Path:
+    """A small synthetic benchmark."""
+    path = tmp_path / "benchmarkResults.json"
+    write_synthetic_benchmark(path, SMALL)
+    return path
+
+
+@pytest.fixture
+def split_seed_benchmark(benchmark: Path) -> Path:
+    """The small benchmark, with config seeds (``game.map_seed``) that differ from
+    the game seeds (``game.game.map_seed``)."""
+    data = json.loads(benchmark.read_text())
+    for entry in data["game_results"]:
+        entry["game"]["map_seed"] = "config-" + entry["game"]["map_seed"]
+    benchmark.write_text(json.dumps(data))
+    return benchmark
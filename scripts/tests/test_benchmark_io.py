@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmark_io import (
+    CHUNK_SIZE,
+    _iter_entries,
+    _Reader,
+    iter_appended_spans,
+    iter_game_result_spans,
+    iter_game_results,
+    read_game_result,
+    write_game_results,
+)
+from synthetic_benchmark import iter_synthetic_entries
+
+from conftest import SMALL
+
+
+def test_write_game_results_matches_json_dump(tmp_path: Path) -> None:
+    entries = list(iter_synthetic_entries(SMALL))
+    streamed, dumped = tmp_path / "streamed.json", tmp_path / "dumped.json"
+    assert write_game_results(streamed, iter(entries)) == len(entries)
+    with dumped.open("w", encoding="utf-8") as f:
+        json.dump({"game_results": entries}, f)
+    assert streamed.read_bytes() == dumped.read_bytes()
+
+    write_game_results(streamed, [])
+    assert json.loads(streamed.read_text()) == {"game_results": []}
+
+
+def test_entries_round_trip(benchmark: Path) -> None:
+    entries = list(iter_synthetic_entries(SMALL))
+    assert list(iter_game_results(benchmark)) == entries
+
+    spans = list(iter_game_result_spans(benchmark))
+    assert [entry for _offset, _length, entry in spans] == entries
+    with benchmark.open("rb") as f:
+        assert [read_game_result(f, offset, length) for offset, length, _entry in spans] == entries
+
+    # Resuming after any entry yields the ones after it
+    offset, length, _entry = spans[4]
+    assert list(iter_appended_spans(benchmark, offset + length)) == spans[5:]
+
+
+def test_bare_lists_and_other_keys(tmp_path: Path) -> None:
+    entries = list(iter_synthetic_entries(SMALL))[:3]
+    bare = tmp_path / "bare.json"
+    bare.write_text(json.dumps(entries, indent=1, ensure_ascii=False), encoding="utf-8")
+    assert list(iter_game_results(bare)) == entries
+
+    full = tmp_path / "full.json"
+    full.write_text(json.dumps({"meta": {"n": [1, 2]}, "game_results": entries, "after": 1.5}))
+    assert list(iter_game_results(full)) == entries
+
+
+def test_entries_larger_than_the_read_window(tmp_path: Path) -> None:
+    entries = [{"text": "é" * CHUNK_SIZE, "scores": [i / 7 for i in range(CHUNK_SIZE // 8)]}, {"n": 1}]
+    path = tmp_path / "big.json"
+    write_game_results(path, entries)
+    assert [entry for _offset, _length, entry in iter_game_result_spans(path)] == entries
+
+
+def test_malformed_entries_fail_without_reading_on(tmp_path: Path) -> None:
+    path = tmp_path / "malformed.json"
+    filler = json.dumps({"pad": "x" * 1000})
+    path.write_text('{"game_results": [{"a": 1 "b": 2}, ' + ", ".join([filler] * (8 * CHUNK_SIZE // 1000)) + "]}")
+
+    with path.open("rb") as f:
+        with pytest.raises(ValueError, match="delimiter"):
+            list(_iter_entries(_Reader(f)))
+        assert f.tell() <= 2 * CHUNK_SIZE
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from array import array
+
+from benchmark_records import TokenScores, get_seed
+
+
+def test_get_seed_prefers_the_game_seed() -> None:
+    assert get_seed({"game": {"game": {"map_seed": 7}, "map_seed": "config"}}) == "7"
+    assert get_seed({"game": {"game": {}, "map_seed": "config"}}) == "config"
+    assert get_seed({}) == "-"
+
+
+def test_token_scores_keep_their_type() -> None:
+    floats = TokenScores.from_pairs([["a", 0.5], ["b", -1.25]])
+    assert isinstance(floats.scores, array)
+    assert floats.pairs() == [["a", 0.5], ["b", -1.25]]
+
+    mixed = [["a", 0], ["b", 1.5], ["c", 2]]
+    pairs = TokenScores.from_pairs(mixed).pairs()
+    assert pairs == mixed
+    assert [type(score) for _tok, score in pairs] == [int, float, int]
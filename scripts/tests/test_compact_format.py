@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmark_io import iter_game_results
+from benchmark_records import reward_values
+from compact_format import encode_compact, encode_split, shard_dir, write_split_game
+
+
+def _group(benchmark: Path, game: str = "Condense", seed: str = "1000") -> list[dict[str, Any]]:
+    return [
+        entry
+        for entry in iter_game_results(benchmark)
+        if entry["game"]["game"]["name"] == game and entry["game"]["game"]["map_seed"] == seed
+    ]
+
+
+def _fixed(value: float, precision: int) -> float:
+    scale = 10**precision
+    return round(value * scale) / scale
+
+
+def _as_decoded(
+    entries: list[dict[str, Any]], precision: int, *, pairs: bool = True
+) -> list[dict[str, Any]]:
+    """What a decoder rebuilds of raw entries: what the web app reads, at ``precision``."""
+    decoded = []
+    for entry in entries:
+        runs = []
+        for run in entry["game_results"]:
+            history = [ev for ev in run["xrt_history"] if ev["type"] == "elicit_response"][:1]
+            for ev in run["xrt_history"]:
+                if ev["type"] == "reward":
+                    value = ev["value"]
+                    history.append({
+                        "type": "reward",
+                        "value": {
+                            "scale": value.get("scale", 1),
+                            "pairs": [[tok, _fixed(s, precision)] for tok, s in value["pairs"]] if pairs else [],
+                        },
+                    })
+            runs.append({"scores": {"black": _fixed(run["scores"]["black"], precision)}, "xrt_history": history})
+        game = entry["game"]
+        decoded.append({
+            "game": {"game": game["game"], "players": [{"id": game["players"][0]["id"]}]},
+            "game_results": runs,
+        })
+    return decoded
+
+
+def _decode_compact(compact: dict[str, Any]) -> list[dict[str, Any]]:
+    """decodeCompactGame of src/lib/dataset.ts."""
+    scale = 10 ** compact["precision"]
+    texts = [[compact["tokens"][i] for i in ids] for ids in compact["texts"]]
+    entries = []
+    for p, player in enumerate(compact["players"]):
+        result = compact["results"][p]
+        runs = []
+        for r, score in enumerate(result["scores"]):
+            history: list[dict[str, Any]] = []
+            if result["moves"][r] is not None:
+                history.append({"type": "elicit_response", "response": result["moves"][r]})
+            for reward_scale, text, values in result["rewards"][r]:
+                pairs = [[tok, v / scale] for tok, v in zip(texts[text], values)]
+                history.append({"type": "reward", "value": {"scale": reward_scale, "pairs": pairs}})
+            runs.append({"scores": {"black": score / scale}, "xrt_history": history})
+        entries.append({"game": {"game": compact["game"], "players": [{"id": player}]}, "game_results": runs})
+    return entries
+
+
+def _decode_race(race: dict[str, Any]) -> list[dict[str, Any]]:
+    """decodeRaceGame of src/lib/dataset.ts."""
+    scale = 10 ** race["precision"]
+    entries = []
+    for p, player in enumerate(race["players"]):
+        result = race["results"][p]
+        runs = []
+        for r, score in enumerate(result["scores"]):
+            history: list[dict[str, Any]] = []
+            if result["moves"][r] is not None:
+                history.append({"type": "elicit_response", "response": result["moves"][r]})
+            for reward_scale in result["scales"][r]:
+                history.append({"type": "reward", "value": {"scale": reward_scale, "pairs": []}})
+            runs.append({"scores": {"black": score / scale}, "xrt_history": history})
+        entries.append({"game": {"game": race["game"], "players": [{"id": player}]}, "game_results": runs})
+    return entries
+
+
+def _decode_shard(shard: dict[str, Any]) -> list[list[list[list[Any]]]]:
+    """decodeTokenShard of src/lib/dataset.ts."""
+    scale = 10 ** shard["precision"]
+    texts = [[shard["tokens"][i] for i in ids] for ids in shard["texts"]]
+    return [
+        [[[tok, v / scale] for tok, v in zip(texts[text], values)] for text, values in sequences]
+        for sequences in shard["rounds"]
+    ]
+
+
+@pytest.mark.parametrize("game", ["Condense", "Contrast"])
+@pytest.mark.parametrize("precision", [0, 3])
+def test_compact_round_trip(benchmark: Path, game: str, precision: int) -> None:
+    entries = _group(benchmark, game)
+    compact = json.loads(json.dumps(encode_compact(entries, precision)))
+    assert compact["precision"] == precision
+    assert _decode_compact(compact) == _as_decoded(entries, precision)
+
+
+@pytest.mark.parametrize("game", ["Condense", "Contrast"])
+def test_race_and_shards_round_trip(benchmark: Path, game: str) -> None:
+    entries = _group(benchmark, game)
+    race, shards = encode_split(entries, 2)
+    race, shards = json.loads(json.dumps(race)), json.loads(json.dumps(shards))
+
+    assert _decode_race(race) == _as_decoded(entries, 2, pairs=False)
+    assert race["maxAbsScore"] == max(
+        abs(_fixed(score, 2))
+        for entry in entries
+        for run in entry["game_results"]
+        for value in reward_values(game, run)
+        for _tok, score in value["pairs"]
+    )
+    assert len(race["shards"]) == len(shards) == len(entries)
+    for entry, shard in zip(entries, shards):
+        assert shard["player"] == entry["game"]["players"][0]["id"]
+        # Token scores in display order (Contrast: the positive text first)
+        assert _decode_shard(shard) == [
+            [[[tok, _fixed(s, 2)] for tok, s in value["pairs"]] for value in reward_values(game, run)]
+            for run in entry["game_results"]
+        ]
+
+
+def test_split_game_swaps_versioned_shard_dirs(benchmark: Path, tmp_path: Path) -> None:
+    race_file = tmp_path / "Condense_1000.json"
+    legacy = tmp_path / "Condense_1000.tokens"
+    legacy.mkdir()
+    other = tmp_path / "Condense_1001.json"
+    write_split_game(other, _group(benchmark, seed="1001"))
+
+    entries = _group(benchmark)
+    first = write_split_game(race_file, entries)
+    directory = shard_dir(race_file)
+    assert directory is not None and directory.is_dir()
+    assert all(path.parent == directory for path in first)
+    assert not legacy.exists()
+
+    # Same shards: same directory
+    assert write_split_game(race_file, entries) == first
+
+    entries[0]["game_results"][0]["xrt_history"][1]["value"]["pairs"][0][1] += 1.0
+    second = write_split_game(race_file, entries)
+    new_directory = shard_dir(race_file)
+    assert new_directory != directory and not directory.exists()
+    assert [path.name for path in second] == [path.name for path in first]
+    race = json.loads(race_file.read_text())
+    assert [tmp_path / url for url in race["shards"]] == second
+    assert all(path.exists() for path in second)
+    # Other games keep their shards
+    assert shard_dir(other).is_dir()
+
+
+def test_null_scores_count_as_zero(benchmark: Path) -> None:
+    entries = _group(benchmark)
+    entries[0]["game_results"][1]["scores"]["black"] = None
+    del entries[1]["game_results"][0]["scores"]
+
+    compact = encode_compact(entries)
+    race, _shards = encode_split(entries)
+    for data in (compact, race):
+        assert data["results"][0]["scores"][1] == 0
+        assert data["results"][1]["scores"][0] == 0
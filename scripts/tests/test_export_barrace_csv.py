@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import csv
+import os
+from pathlib import Path
+
+from click.testing import CliRunner
+
+import export_barrace_csv
+from benchmark_io import iter_game_results, write_game_results
+from benchmark_records import Entry, cumulative_max
+
+
+def _export(benchmark: Path, *args: str) -> None:
+    result = CliRunner().invoke(export_barrace_csv.main, ["--game-data", str(benchmark), *args])
+    assert result.exit_code == 0, result.output
+
+
+def _rows(path: Path) -> list[list[str]]:
+    with path.open(newline="") as f:
+        return list(csv.reader(f))
+
+
+def _long_rows(benchmark: Path, game: str, seed: str) -> list[list[str]]:
+    rows = []
+    for entry in iter_game_results(benchmark):
+        record = Entry.from_json(entry)
+        if record.key == (game, seed):
+            for t, (score, cummax) in enumerate(zip(record.scores, cumulative_max(record.scores)), 1):
+                rows.append([game, seed, record.model, str(t), str(score), str(cummax)])
+    return rows
+
+
+def test_long_csv(benchmark: Path, tmp_path: Path) -> None:
+    output = tmp_path / "long.csv"
+    _export(benchmark, "--game-name", "Contrast", "--seed", "1001", "--output", str(output), "--long")
+    assert _rows(output) == [export_barrace_csv.LONG_HEADER, *_long_rows(benchmark, "Contrast", "1001")]
+
+
+def test_long_csv_append(benchmark: Path, tmp_path: Path) -> None:
+    output = tmp_path / "long.csv"
+    groups = [("Condense", "1000"), ("Contrast", "1002"), ("Condense", "1002")]
+    for game, seed in groups:
+        _export(benchmark, "--game-name", game, "--seed", seed, "--output", str(output), "--long", "--append")
+
+    rows = _rows(output)
+    expected = [row for game, seed in groups for row in _long_rows(benchmark, game, seed)]
+    assert rows == [export_barrace_csv.LONG_HEADER, *expected]
+    assert len({tuple(row) for row in rows}) == len(rows)
+
+    # Without --append, the file starts over
+    _export(benchmark, "--game-name", "Condense", "--seed", "1000", "--output", str(output), "--long")
+    assert _rows(output) == [export_barrace_csv.LONG_HEADER, *_long_rows(benchmark, "Condense", "1000")]
+
+
+def test_batch_manifest_skips_unchanged_outputs(benchmark: Path, tmp_path: Path) -> None:
+    output_dir = tmp_path / "export"
+
+    def batch(*args: str) -> str:
+        result = CliRunner().invoke(
+            export_barrace_csv.main,
+            ["--game-data", str(benchmark), "--all", "--output", str(output_dir), "--jobs", "1", *args],
+        )
+        assert result.exit_code == 0, result.output
+        return result.output
+
+    assert "Exported 6 groups" in batch()
+    outputs = sorted(output_dir.glob("*.csv"))
+    assert len(outputs) == 6
+    assert (output_dir / export_barrace_csv.BATCH_MANIFEST).exists()
+
+    # Backdate the outputs: a rewrite would move their mtime forward
+    for path in outputs:
+        os.utime(path, ns=(0, 0))
+    output = batch()
+    assert "Exported 0 groups" in output and "(6 unchanged" in output
+    assert all(path.stat().st_mtime_ns == 0 for path in outputs)
+
+    # One changed group: only its output is rewritten
+    entries = list(iter_game_results(benchmark))
+    changed = next(e for e in entries if e["game"]["game"]["name"] == "Contrast" and e["game"]["map_seed"] == "1001")
+    changed["game_results"][0]["scores"]["black"] += 1.0
+    write_game_results(benchmark, entries)
+    assert "Exported 1 groups" in batch()
+    assert [path.name for path in outputs if path.stat().st_mtime_ns != 0] == ["Contrast_1001.csv"]
+
+    # A deleted output is written again, and other settings rewrite every output
+    (output_dir / "Condense_1000.csv").unlink()
+    assert "Exported 1 groups" in batch()
+    assert "Exported 6 groups" in batch("--long")
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+import extract
+
+
+def _extract(benchmark: Path, *args: str) -> dict[str, list]:
+    result = CliRunner().invoke(extract.app, [str(benchmark), *args])
+    assert result.exit_code == 0, result.output
+    output_dir = benchmark.parent / benchmark.stem
+    return {path.name: json.loads(path.read_text()) for path in sorted(output_dir.iterdir())}
+
+
+def test_index_and_single_pass_extract_the_same_groups(
+    split_seed_benchmark: Path, tmp_path: Path
+) -> None:
+    copy = tmp_path / "copy" / split_seed_benchmark.name
+    copy.parent.mkdir()
+    shutil.copy(split_seed_benchmark, copy)
+
+    indexed = _extract(split_seed_benchmark, "--all", "--index")
+    streamed = _extract(copy, "--all", "--no-index")
+    assert streamed == indexed
+    # Groups are named after the game's seed, as the picker shows them
+    assert "Condense_1000.json" in indexed
+    assert all(len(entries) == 4 for entries in indexed.values())
+
+
+def test_group_patterns(benchmark: Path) -> None:
+    files = _extract(benchmark, "--group", "Contrast:100[12]", "--no-index")
+    assert list(files) == ["Contrast_1001.json", "Contrast_1002.json"]
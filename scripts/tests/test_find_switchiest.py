@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+import random
+from array import array
+from pathlib import Path
+
+import click
+import pytest
+from click.testing import CliRunner
+
+import find_switchiest
+
+
+def _run(benchmark: Path, output: Path, *args: str) -> dict:
+    result = CliRunner().invoke(
+        find_switchiest.main,
+        ["--game-data", str(benchmark), "--output", str(output), "--top-k", "2", *args],
+    )
+    assert result.exit_code == 0, result.output
+    return json.loads(output.read_text())
+
+
+@pytest.mark.parametrize("summary", [[], ["--summary"]])
+def test_index_and_stream_select_the_same_entries(
+    split_seed_benchmark: Path, tmp_path: Path, summary: list[str]
+) -> None:
+    streamed = _run(split_seed_benchmark, tmp_path / "stream.json", "--no-index", *summary)
+    indexed = _run(split_seed_benchmark, tmp_path / "index.json", "--index", *summary)
+    # 2 groups of 4 models
+    assert len(streamed["game_results"]) == 8
+    assert indexed == streamed
+
+
+@pytest.mark.parametrize("engine", find_switchiest.ENGINES)
+def test_weights_are_honoured_by_every_engine(engine: str) -> None:
+    assert find_switchiest.resolve_weights(["switches=-1"], engine) == {"switches": -1.0}
+    assert find_switchiest.resolve_weights(["switches"], engine) == {"switches": 1.0}
+
+
+def test_python_engine_rejects_other_metrics() -> None:
+    with pytest.raises(click.UsageError):
+        find_switchiest.resolve_weights(["lead_changes"], "python")
+    with pytest.raises(click.BadParameter):
+        find_switchiest.resolve_weights(["switches=many"], "python")
+
+
+def test_engines_agree_on_switches() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(0)
+    for _ in range(300):
+        # Few distinct values, so that ties and uneven run counts are common
+        groups = {
+            f"model-{m}": array("d", [rng.choice([0.0, 1.0, 2.5, 4.0, -1.0]) for _ in range(rng.randint(0, 8))])
+            for m in range(rng.randint(1, 7))
+        }
+        top_n = rng.randint(1, 5)
+        weights = {"switches": 1.0}
+        assert find_switchiest.score_group(groups, top_n, "numpy", weights) == find_switchiest.score_group(
+            groups, top_n, "python", weights
+        )
+
+
+def test_whole_number_values_print_as_integers() -> None:
+    assert find_switchiest.format_value(1_000_000.0, 8) == " 1000000"
+    assert find_switchiest.format_value(3, 8) == f"{3:8d}"
+    assert find_switchiest.format_value(2.5, 8) == f"{2.5:8g}"
+    assert find_switchiest.format_value(-0.125, 5) == "-0.125"
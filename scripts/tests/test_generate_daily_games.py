@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from benchmark_io import iter_game_results, write_game_results
+from generate_daily_games import DailyManifest, app, update_games
+from synthetic_benchmark import Shape, write_synthetic_benchmark
+
+
+def _update(benchmark: Path, tmp_path: Path, *settings) -> list[str]:
+    manifest = DailyManifest(tmp_path)
+    written = update_games(benchmark, tmp_path / "games", manifest, *settings)
+    manifest.save()
+    return written
+
+
+@pytest.mark.parametrize("settings", [("compact", 3), ("json", 1)])
+def test_changed_settings_rewrite_the_games(
+    benchmark: Path, tmp_path: Path, settings: tuple[str, int]
+) -> None:
+    (tmp_path / "games").mkdir()
+    first = _update(benchmark, tmp_path, "json", 3)
+    game_file = tmp_path / "games" / first[0]
+    before = game_file.read_bytes()
+
+    assert _update(benchmark, tmp_path, "json", 3) == []
+    assert sorted(_update(benchmark, tmp_path, *settings)) == sorted(first)
+    assert game_file.read_bytes() != before
+    assert _update(benchmark, tmp_path, *settings) == []
+
+
+def test_results_without_game_or_scores_are_left_out(benchmark: Path, tmp_path: Path) -> None:
+    entries = list(iter_game_results(benchmark))
+    no_scores = copy.deepcopy(entries[0])
+    del no_scores["scores"]
+    no_scores["game"]["players"][0]["options"]["model"] = "no-scores"
+    no_scores["game"]["players"][0]["id"] = "no-scores"
+    write_game_results(benchmark, [{"game_results": []}, *entries, no_scores])
+
+    (tmp_path / "games").mkdir()
+    manifest = DailyManifest(tmp_path)
+    update_games(benchmark, tmp_path / "games", manifest)
+    assert "-_-.json" not in manifest.games
+    record = manifest.games["Condense_1000.json"]
+    assert "no-scores" not in record["models"]
+    game_file = json.loads((tmp_path / "games" / "Condense_1000.json").read_text())
+    assert len(game_file) == len(record["models"]) == 4
+
+
+def _assigned(output_dir: Path) -> list[tuple[str, str]]:
+    """(day, gameId) of every month file in ``output_dir``."""
+    return [
+        (day, game['gameId'])
+        for month_file in sorted(output_dir.glob('????-??.json'))
+        for day, game in json.loads(month_file.read_text()).items()
+    ]
+
+
+def test_month_range_never_assigns_a_game_twice(tmp_path: Path) -> None:
+    benchmark = tmp_path / 'benchmarkResults.json'
+    write_synthetic_benchmark(benchmark, Shape(games=2, seeds=40, models=3, rounds=2, tokens=2))
+    output_dir, games_dir = tmp_path / 'daily', tmp_path / 'games'
+
+    def generate(*months: str) -> None:
+        result = CliRunner().invoke(app, [
+            '--benchmark-file', str(benchmark), '--output-dir', str(output_dir),
+            '--games-dir', str(games_dir), '--no-precompress', '--jobs', '1', *months,
+        ])
+        assert result.exit_code == 0, result.output
+
+    # 80 games for the 59 days of January and February, the rest for March
+    generate('--from', '2025-01', '--to', '2025-02')
+    assigned = _assigned(output_dir)
+    assert len(assigned) == 59
+    assert len({game_id for _day, game_id in assigned}) == len(assigned)
+
+    generate('--from', '2025-03')
+    assigned = _assigned(output_dir)
+    assert len(assigned) == 80
+    assert len({game_id for _day, game_id in assigned}) == len(assigned)
+
+    # Regenerating a range keeps the games of the months outside it
+    generate('--from', '2025-01', '--to', '2025-02')
+    assert _assigned(output_dir) == assigned
+    manifest = DailyManifest(output_dir)
+    assert sorted((day, game_id) for game_id, day in manifest.used.items()) == sorted(assigned)
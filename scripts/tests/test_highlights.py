@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import copy
+from pathlib import Path
+
+import pytest
+
+from benchmark_io import iter_game_results
+
+highlights = pytest.importorskip("highlights")
+
+
+def test_null_scores_count_as_zero(benchmark: Path) -> None:
+    entries = [entry for entry in iter_game_results(benchmark) if entry["game"]["game"]["map_seed"] == "1000"]
+    entries = [entry for entry in entries if entry["game"]["game"]["name"] == "Condense"]
+    # The client needs even rounds to show events
+    n_rounds = min(len(entry["game_results"]) for entry in entries)
+    for entry in entries:
+        del entry["game_results"][n_rounds:]
+    zero = copy.deepcopy(entries)
+    entries[0]["game_results"][0]["scores"]["black"] = None
+    zero[0]["game_results"][0]["scores"]["black"] = 0.0
+
+    quantize = highlights.fixed_point(3)
+    events = highlights.compute_events(entries, quantize)
+    assert events is not None
+    assert events == highlights.compute_events(zero, quantize)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import json_rounding
+from benchmark_io import iter_game_results
+from export_barrace_csv import export_dataset
+from generate_daily_games import write_game_file
+from json_rounding import RoundingEncoder
+
+
+def _baseline_round_floats(obj: Any) -> Any:
+    """round_floats of the original generate_daily_games.py."""
+    if isinstance(obj, float):
+        return round(obj, 3)
+    elif isinstance(obj, dict):
+        return {k: _baseline_round_floats(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_baseline_round_floats(x) for x in obj]
+    else:
+        return obj
+
+
+@pytest.fixture(params=["encoder", "fallback"])
+def encoder(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "fallback":
+        monkeypatch.setattr(json_rounding, "_make_iterencode", None)
+    return request.param
+
+
+def _group(benchmark: Path) -> list[dict[str, Any]]:
+    return [entry for entry in iter_game_results(benchmark) if entry["game"]["game"]["map_seed"] == "1001"]
+
+
+def test_game_files_match_the_baseline(benchmark: Path, tmp_path: Path, encoder: str) -> None:
+    entries = _group(benchmark)
+    write_game_file(tmp_path / "game.json", entries)
+    with (tmp_path / "baseline.json").open("w") as f:
+        json.dump(_baseline_round_floats(entries), f, indent=0)
+    assert (tmp_path / "game.json").read_bytes() == (tmp_path / "baseline.json").read_bytes()
+
+
+def test_exports_match_the_baseline(benchmark: Path, tmp_path: Path, encoder: str) -> None:
+    entries = _group(benchmark)
+    export_dataset(entries, tmp_path / "exact.json", "json")
+    exact = (tmp_path / "exact.json").read_text()
+    # The original export: json.dump(data, f, indent=2)
+    assert exact == json.dumps(json.loads(exact), indent=2)
+
+    export_dataset(entries, tmp_path / "rounded.json", "json", precision=3)
+    assert (tmp_path / "rounded.json").read_text() == json.dumps(
+        _baseline_round_floats(json.loads(exact)), indent=2
+    )
+
+
+def test_float_keys_are_not_rounded(encoder: str) -> None:
+    data = {1.23456: [1.23456, {2.5555: "x", "y": 0.1 + 0.2}], "z": float("nan")}
+    assert json.dumps(data, cls=RoundingEncoder, precision=2) == (
+        '{"1.23456": [1.23, {"2.5555": "x", "y": 0.3}], "z": NaN}'
+    )
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+import precompress
+from precompress import MANIFEST_NAME, precompress_directory
+
+
+def _siblings(directory: Path) -> list[Path]:
+    return sorted(p for p in directory.iterdir() if p.suffix in (".gz", ".br"))
+
+
+def _mtimes(paths: list[Path]) -> dict[Path, int]:
+    return {path: path.stat().st_mtime_ns for path in paths}
+
+
+def test_unchanged_files_are_skipped(tmp_path: Path) -> None:
+    (tmp_path / "a.json").write_text('{"a": 1}')
+    (tmp_path / "b.json").write_text('{"b": 2}')
+    (tmp_path / "notes.txt").write_text("not json")
+    precompress_directory(tmp_path)
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert sorted(manifest) == ["a.json", "b.json"]
+    siblings = _siblings(tmp_path)
+    assert {p.name for p in siblings} >= {"a.json.gz", "b.json.gz"}
+    assert gzip.decompress((tmp_path / "a.json.gz").read_bytes()) == b'{"a": 1}'
+
+    # Backdate the siblings: a rewrite would move their mtime forward
+    for path in siblings:
+        os.utime(path, ns=(0, 0))
+    precompress_directory(tmp_path)
+    assert all(mtime == 0 for mtime in _mtimes(siblings).values())
+    assert json.loads((tmp_path / MANIFEST_NAME).read_text()) == manifest
+
+
+def test_changed_files_are_rewritten(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "a.json").write_text('{"a": 1}')
+    (tmp_path / "b.json").write_text('{"b": 2}')
+    precompress_directory(tmp_path)
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+
+    (tmp_path / "a.json").write_text('{"a": 10}')
+    written = []
+    write_atomic = precompress._write_atomic
+    monkeypatch.setattr(
+        precompress, "_write_atomic", lambda path, data: (written.append(path.name), write_atomic(path, data))
+    )
+    precompress_directory(tmp_path)
+
+    assert sorted(name for name in written if name != MANIFEST_NAME) == sorted(
+        "a.json" + ext for ext in precompress._encodings()
+    )
+    assert gzip.decompress((tmp_path / "a.json.gz").read_bytes()) == b'{"a": 10}'
+    new_manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    assert new_manifest["a.json"] != manifest["a.json"]
+    assert new_manifest["b.json"] == manifest["b.json"]
+
+
+def test_missing_siblings_are_rewritten(tmp_path: Path) -> None:
+    (tmp_path / "a.json").write_text('{"a": 1}')
+    precompress_directory(tmp_path)
+    (tmp_path / "a.json.gz").unlink()
+    precompress_directory(tmp_path)
+    assert gzip.decompress((tmp_path / "a.json.gz").read_bytes()) == b'{"a": 1}'
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from benchmark_io import iter_game_results
+from benchmark_records import reward_values
+from synthetic_benchmark import Shape, write_synthetic_benchmark
+
+
+def test_rounds_have_the_shape_of_real_games(tmp_path: Path) -> None:
+    path = tmp_path / "benchmarkResults.json"
+    write_synthetic_benchmark(path, Shape(games=3, seeds=2, models=3, rounds=4, tokens=5))
+
+    rounds: dict[tuple[str, str], set[int]] = {}
+    for entry in iter_game_results(path):
+        game = entry["game"]["game"]["name"]
+        key = (game, entry["game"]["map_seed"])
+        rounds.setdefault(key, set()).add(len(entry["game_results"]))
+        for run in entry["game_results"]:
+            history = run["xrt_history"]
+            assert [ev["type"] for ev in history].count("elicit_response") == 1
+            # What convertCondenseRound, convertContrastRound and convertSynthesizeRound accept
+            scales = [value["scale"] for value in reward_values(game, run)]
+            assert scales == {"Condense": [1], "Contrast": [1, -1], "Synthesize": [1, 1, 1]}[game]
+            assert all(len(value["pairs"]) == 5 for value in reward_values(game, run))
+
+    assert {game for game, _seed in rounds} == {"Condense", "Contrast", "Synthesize"}
+    # Every model of a game plays the same rounds
+    assert all(counts == {4} for counts in rounds.values())
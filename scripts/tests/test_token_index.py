@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import copy
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmark_io import iter_game_results, write_game_results
+from benchmark_records import get_game_name, get_model, get_seed, reward_values
+from token_index import open_index, update_index
+
+
+def _expected_stats(benchmarks: list[Path]) -> tuple[dict[str, list], dict[tuple[str, str], list]]:
+    """Token and (token, model) stats computed from scratch: [count, total, min, max]."""
+    tokens: dict[str, list] = {}
+    models: dict[tuple[str, str], list] = {}
+    for benchmark in benchmarks:
+        # A repeated (game, seed, model) keeps its last entry
+        last = {(get_game_name(e), get_seed(e), get_model(e)): e for e in iter_game_results(benchmark)}
+        for (game, _seed, model), entry in last.items():
+            for run in entry["game_results"]:
+                for value in reward_values(game, run):
+                    for tok, score in value["pairs"]:
+                        for stats, key in ((tokens, tok), (models, (tok, model))):
+                            s = stats.setdefault(key, [0, 0.0, score, score])
+                            s[0] += 1
+                            s[1] += score
+                            s[2] = min(s[2], score)
+                            s[3] = max(s[3], score)
+    return tokens, models
+
+
+def _stats(conn: sqlite3.Connection) -> tuple[dict[str, list], dict[tuple[str, str], list]]:
+    tokens = {
+        tok: [n, total, lo, hi]
+        for tok, n, total, lo, hi in conn.execute(
+            "SELECT t.token, count, total, min, max FROM token_stats s JOIN tokens t ON t.id = s.token"
+        )
+    }
+    models = {
+        (tok, model): [n, total, lo, hi]
+        for tok, model, n, total, lo, hi in conn.execute(
+            "SELECT t.token, model, count, total, min, max FROM model_stats s JOIN tokens t ON t.id = s.token"
+        )
+    }
+    return tokens, models
+
+
+def _assert_stats(conn: sqlite3.Connection, benchmarks: list[Path]) -> None:
+    def approx(stats: dict[Any, list]) -> dict[Any, Any]:
+        return {key: pytest.approx(value) for key, value in stats.items()}
+
+    tokens, models = _expected_stats(benchmarks)
+    actual_tokens, actual_models = _stats(conn)
+    assert actual_tokens == approx(tokens)
+    assert actual_models == approx(models)
+    n_entries = sum(len({(get_game_name(e), get_seed(e), get_model(e)) for e in iter_game_results(b)}) for b in benchmarks)
+    assert conn.execute("SELECT count(*) FROM entries").fetchone()[0] == n_entries
+
+
+def test_added_entries(benchmark: Path, tmp_path: Path) -> None:
+    conn = open_index(tmp_path / "index.sqlite")
+    assert update_index(conn, [benchmark])["added"] == [str(benchmark.resolve())]
+    _assert_stats(conn, [benchmark])
+    assert update_index(conn, [benchmark])["unchanged"] == [str(benchmark.resolve())]
+
+    entries = list(iter_game_results(benchmark))
+    extra = copy.deepcopy(entries[0])
+    extra["game"]["players"][0]["options"]["model"] = "new-model"
+    extra["game_results"][0]["xrt_history"][1]["value"]["pairs"].append(["brand new", 42.0])
+    write_game_results(benchmark, [*entries, extra])
+    assert update_index(conn, [benchmark])["updated"] == [str(benchmark.resolve())]
+    _assert_stats(conn, [benchmark])
+    tokens, models = _stats(conn)
+    assert tokens["brand new"] == [1, 42.0, 42.0, 42.0]
+    assert ("brand new", "new-model") in models
+
+    # A second file adds to the first, and pruning it takes its counts back out
+    other = tmp_path / "other.json"
+    write_game_results(other, entries[:3])
+    assert update_index(conn, [benchmark, other])["added"] == [str(other.resolve())]
+    _assert_stats(conn, [benchmark, other])
+    assert update_index(conn, [benchmark], prune=True)["removed"] == [str(other.resolve())]
+    _assert_stats(conn, [benchmark])
+
+
+def test_changed_entries(benchmark: Path, tmp_path: Path) -> None:
+    conn = open_index(tmp_path / "index.sqlite")
+    update_index(conn, [benchmark])
+    entries = list(iter_game_results(benchmark))
+    pairs = entries[0]["game_results"][0]["xrt_history"][1]["value"]["pairs"]
+    token = pairs[0][0]
+    before = _stats(conn)[0][token]
+
+    # Lower the token's highest score and drop another token: extrema shrink, counts drop
+    tokens, _models = _expected_stats([benchmark])
+    for entry in entries:
+        for run in entry["game_results"]:
+            for ev in run["xrt_history"]:
+                if ev["type"] == "reward":
+                    for pair in ev["value"]["pairs"]:
+                        if pair[0] == token and pair[1] == tokens[token][3]:
+                            pair[1] = -100.0
+    dropped = pairs.pop()
+    # A repeated (game, seed, model) replaces the earlier entry
+    write_game_results(benchmark, [*entries, copy.deepcopy(entries[1])])
+    update_index(conn, [benchmark])
+    _assert_stats(conn, [benchmark])
+
+    after = _stats(conn)[0][token]
+    assert after[3] < before[3]
+    assert after[2] == -100.0
+    assert after[0] == before[0] - (dropped[0] == token)
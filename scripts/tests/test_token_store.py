@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from benchmark_io import iter_game_results, write_game_results
+from benchmark_records import get_game_name, get_model, get_seed, reward_values
+from token_store import TokenStore, build_token_store
+
+
+def test_store_round_trip(benchmark: Path) -> None:
+    entries = list(iter_game_results(benchmark))
+    # A negative (scale -1) text before the positive one, shown after it in Contrast
+    for entry in entries:
+        entry["game_results"][0]["xrt_history"].insert(
+            1, {"type": "reward", "value": {"__TokenXentList__": True, "scale": -1, "pairs": [["x", -0.5], [" y", 1e-3]]}}
+        )
+    write_game_results(benchmark, entries)
+
+    with TokenStore(build_token_store(benchmark)) as store:
+        assert store.is_fresh(benchmark)
+        assert store.keys() == [(get_game_name(e), get_seed(e), get_model(e)) for e in entries]
+        for entry in entries:
+            game, seed, model = get_game_name(entry), get_seed(entry), get_model(entry)
+            assert store.rounds(game, seed, model) == len(entry["game_results"])
+            for round_index, run in enumerate(entry["game_results"]):
+                expected = [value["pairs"] for value in reward_values(game, run)]
+                pairs = store.pairs(game, seed, model, round_index)
+                assert [[tok for tok, _score in seq] for seq in pairs] == [
+                    [tok for tok, _score in seq] for seq in expected
+                ]
+                assert [[score for _tok, score in seq] for seq in pairs] == [
+                    pytest.approx([score for _tok, score in seq], rel=1e-6) for seq in expected
+                ]
+
+
+def test_store_goes_stale_when_the_benchmark_is_rewritten(benchmark: Path) -> None:
+    with TokenStore(build_token_store(benchmark)) as store:
+        assert store.is_fresh(benchmark)
+        entries = list(iter_game_results(benchmark))
+        write_game_results(benchmark, entries[:-1])
+        assert not store.is_fresh(benchmark)
+
+    # Same size, new mtime
+    with TokenStore(build_token_store(benchmark)) as store:
+        st = benchmark.stat()
+        os.utime(benchmark, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert not store.is_fresh(benchmark)
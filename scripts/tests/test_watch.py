@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+from typer.testing import CliRunner as TyperRunner
+
+import export_barrace_csv
+import find_switchiest
+import generate_daily_games
+import watch
+from benchmark_io import iter_game_results, write_game_results
+from find_switchiest import DEFAULT_METRICS
+
+
+def _files(directory: Path) -> dict[str, bytes]:
+    return {
+        str(path.relative_to(directory)): path.read_bytes()
+        for path in sorted(directory.rglob("*"))
+        if path.is_file() and path.name != generate_daily_games.MANIFEST_NAME
+    }
+
+
+def _invoke(command, args: list[str]) -> None:
+    result = CliRunner().invoke(command, args)
+    assert result.exit_code == 0, result.output
+
+
+def test_once_matches_the_standalone_scripts(split_seed_benchmark: Path, tmp_path: Path) -> None:
+    bench = str(split_seed_benchmark)
+    daemon, standalone = tmp_path / "daemon", tmp_path / "standalone"
+    _invoke(watch.main, [
+        "--game-data", bench, "--once", "--jobs", "1", "--top-k", "2",
+        "--switchiest", str(daemon / "switchiest.json"),
+        "--export-dir", str(daemon / "export"),
+        "--daily-dir", str(daemon / "daily"), "--games-dir", str(daemon / "games"),
+        "--from", "2025-09",
+    ])
+
+    _invoke(find_switchiest.main, [
+        "--game-data", bench, "--top-k", "2", "--output", str(standalone / "switchiest.json"),
+    ])
+    _invoke(export_barrace_csv.main, [
+        "--game-data", bench, "--all", "--jobs", "1", "--output", str(standalone / "export"),
+    ])
+    result = TyperRunner().invoke(generate_daily_games.app, [
+        "--benchmark-file", bench, "--from", "2025-09", "--jobs", "1", "--no-precompress",
+        "--output-dir", str(standalone / "daily"), "--games-dir", str(standalone / "games"),
+    ])
+    assert result.exit_code == 0, result.output
+
+    assert _files(daemon) == _files(standalone)
+    assert "games/Condense_1000.json" in _files(daemon)
+
+
+def test_appended_entries_match_a_standalone_run(benchmark: Path, tmp_path: Path) -> None:
+    entries = list(iter_game_results(benchmark))
+    write_game_results(benchmark, entries[:10])
+
+    resident = watch.ResidentBenchmark(benchmark)
+    weights = find_switchiest.resolve_weights(DEFAULT_METRICS, "python")
+    output = watch.SwitchiestOutput(tmp_path / "daemon.json", 5, 3, weights, "python")
+    output.update(resident, resident.refresh())
+
+    write_game_results(benchmark, entries)
+    change = resident.refresh()
+    assert not change.reloaded
+    assert change.entries == len(entries) - 10
+    output.update(resident, change)
+
+    _invoke(find_switchiest.main, [
+        "--game-data", str(benchmark), "--top-k", "3", "--engine", "python",
+        "--output", str(tmp_path / "standalone.json"),
+    ])
+    assert json.loads(output.output.read_text()) == json.loads((tmp_path / "standalone.json").read_text())
@@ -0,0 +1,453 @@
+"""Inverted index of token scores across benchmark files.
+
+Which tokens do models score highest, and how does a token fare from one model
+to the next? Answering that from the benchmarks means decoding every reward
+event of every file. The index is a SQLite database holding, for every token:
+
+    occurrences  every (entry, round, seq, position, score) it appears at, where
+                 ``seq`` is the reward event's position in display order (see
+                 ``reward_values``)
+    model_stats  count, sum, min and max of its scores for each model
+    token_stats  the same over all models
+
+It grows incrementally: ``update`` ingests the benchmark files it has not seen,
+re-ingests the ones whose size or mtime changed, and skips the rest, so adding a
+new benchmark file only costs a pass over that file. Within a file, a repeated
+(game, seed, model) keeps its last entry, like the other scripts; entries of
+different files are all counted.
+
+    python token_index.py update --game-data benchmarkResults.json
+    python token_index.py top --min-count 50 --limit 20
+    python token_index.py token " the" --occurrences 5
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable, Iterator
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+import click
+
+from benchmark_io import fingerprint, iter_game_results
+from benchmark_records import get_game_name, get_model, get_seed, reward_values
+
+INDEX_VERSION = 2
+DEFAULT_INDEX = Path("token_index.sqlite")
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    source INTEGER NOT NULL,
+    game TEXT NOT NULL,
+    seed TEXT NOT NULL,
+    model TEXT NOT NULL
+);
+CREATE INDEX entries_by_source ON entries (source);
+CREATE TABLE tokens (id INTEGER PRIMARY KEY, token TEXT NOT NULL UNIQUE);
+CREATE TABLE occurrences (
+    token INTEGER NOT NULL,
+    entry INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    score REAL NOT NULL
+);
+CREATE INDEX occurrences_by_token ON occurrences (token, score);
+CREATE INDEX occurrences_by_entry ON occurrences (entry);
+CREATE TABLE model_stats (
+    token INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (token, model)
+) WITHOUT ROWID;
+CREATE TABLE token_stats (
+    token INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL
+);
+"""
+
+# Stats of (token, model) pairs, recomputed from their occurrences
+_MODEL_STATS = """
+SELECT o.token, e.model, count(*), sum(o.score), min(o.score), max(o.score)
+FROM occurrences o JOIN entries e ON e.id = o.entry
+"""
+
+ORDERS = {
+    "mean": "total * 1.0 / count",
+    "count": "count",
+    "min": "min",
+    "max": "max",
+}
+
+
+def open_index(path: Path) -> sqlite3.Connection:
+    """Open (creating it if needed) the index at ``path``.
+
+    An index written by another version of this script is started over.
+    """
+    if path.exists():
+        conn = sqlite3.connect(path)
+        try:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.DatabaseError:
+            version = None
+        if version == (str(INDEX_VERSION),):
+            return conn
+        conn.close()
+        path.unlink()
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+    conn.commit()
+    return conn
+
+
+def _source_key(benchmark: Path) -> str:
+    return str(benchmark.resolve())
+
+
+def _create_temp_tables(conn: sqlite3.Connection) -> None:
+    # Tokens (and (token, model) pairs) whose stats an update changed
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS dirty (token INTEGER, model TEXT)")
+    conn.execute("DELETE FROM dirty")
+
+
+def _remove_entries(conn: sqlite3.Connection, where: str, params: Iterable[Any]) -> None:
+    """Drop the entries matching ``where`` and their occurrences, marking their stats dirty."""
+    entries = f"SELECT id FROM entries WHERE {where}"
+    params = tuple(params)
+    conn.execute(
+        "INSERT INTO dirty SELECT DISTINCT o.token, e.model FROM occurrences o "
+        f"JOIN entries e ON e.id = o.entry WHERE e.id IN ({entries})",
+        params,
+    )
+    conn.execute(f"DELETE FROM occurrences WHERE entry IN ({entries})", params)
+    conn.execute(f"DELETE FROM entries WHERE {where}", params)
+
+
+def _token_ids(conn: sqlite3.Connection) -> dict[str, int]:
+    return dict(conn.execute("SELECT token, id FROM tokens"))
+
+
+def _iter_occurrences(
+    benchmark: Path, conn: sqlite3.Connection, source: int, token_ids: dict[str, int]
+) -> Iterator[tuple[int, int, int, int, int, float]]:
+    """Insert the entries of ``benchmark`` and yield the rows of their occurrences."""
+    last: dict[tuple[str, str, str], int] = {}
+    for entry in iter_game_results(benchmark):
+        game = get_game_name(entry)
+        key = (game, get_seed(entry), get_model(entry))
+        previous = last.get(key)
+        if previous is not None:
+            _remove_entries(conn, "id = ?", (previous,))
+        entry_id = last[key] = conn.execute(
+            "INSERT INTO entries (source, game, seed, model) VALUES (?, ?, ?, ?)",
+            (source, *key),
+        ).lastrowid
+        for round_index, run in enumerate(entry.get("game_results") or []):
+            for seq, value in enumerate(reward_values(game, run)):
+                for pos, (tok, score) in enumerate(value.get("pairs") or []):
+                    idx = token_ids.get(tok)
+                    if idx is None:
+                        idx = token_ids[tok] = conn.execute(
+                            "INSERT INTO tokens (token) VALUES (?)", (tok,)
+                        ).lastrowid
+                    yield idx, entry_id, round_index, seq, pos, float(score)
+
+
+def _ingest(conn: sqlite3.Connection, benchmark: Path, token_ids: dict[str, int]) -> int:
+    """Add the entries of a benchmark not yet in the index; return how many it has."""
+    source = conn.execute(
+        "INSERT INTO sources (path, size, mtime_ns) VALUES (:path, :size, :mtime_ns)",
+        {"path": _source_key(benchmark), **fingerprint(benchmark)},
+    ).lastrowid
+    conn.executemany(
+        "INSERT INTO occurrences VALUES (?, ?, ?, ?, ?, ?)",
+        _iter_occurrences(benchmark, conn, source, token_ids),
+    )
+    # Fold the new source into the stats: sums and extrema only grow
+    conn.execute(
+        f"""
+        INSERT INTO model_stats {_MODEL_STATS}
+        WHERE e.source = ? GROUP BY o.token, e.model
+        ON CONFLICT (token, model) DO UPDATE SET
+            count = count + excluded.count,
+            total = total + excluded.total,
+            min = min(model_stats.min, excluded.min),
+            max = max(model_stats.max, excluded.max)
+        """,
+        (source,),
+    )
+    conn.execute(
+        "INSERT INTO dirty SELECT DISTINCT o.token, NULL FROM occurrences o "
+        "JOIN entries e ON e.id = o.entry WHERE e.source = ?",
+        (source,),
+    )
+    return conn.execute("SELECT count(*) FROM entries WHERE source = ?", (source,)).fetchone()[0]
+
+
+def _refresh_stats(conn: sqlite3.Connection) -> None:
+    """Recompute the stats marked dirty from what is left in the index."""
+    # (token, model) pairs that lost occurrences: sums and extrema cannot be undone
+    conn.execute(
+        "DELETE FROM model_stats WHERE (token, model) IN "
+        "(SELECT token, model FROM dirty WHERE model IS NOT NULL)"
+    )
+    conn.execute(
+        f"""
+        INSERT INTO model_stats {_MODEL_STATS}
+        WHERE (o.token, e.model) IN (SELECT token, model FROM dirty WHERE model IS NOT NULL)
+        GROUP BY o.token, e.model
+        """
+    )
+    conn.execute("DELETE FROM token_stats WHERE token IN (SELECT token FROM dirty)")
+    conn.execute(
+        """
+        INSERT INTO token_stats
+        SELECT token, sum(count), sum(total), min(min), max(max) FROM model_stats
+        WHERE token IN (SELECT token FROM dirty) GROUP BY token
+        """
+    )
+    conn.execute("DELETE FROM dirty")
+
+
+def update_index(
+    conn: sqlite3.Connection, benchmarks: Iterable[Path], *, prune: bool = False
+) -> dict[str, list[str]]:
+    """Bring the index up to date with ``benchmarks``.
+
+    New files are ingested, files whose size or mtime changed are re-ingested,
+    and the others are left as they are. With ``prune``, the files indexed
+    before but not in ``benchmarks`` are dropped. Returns the paths of the
+    files by what happened to them ("added", "updated", "unchanged", "removed").
+    """
+    report: dict[str, list[str]] = {"added": [], "updated": [], "unchanged": [], "removed": []}
+    known = {path: (source, size, mtime_ns) for source, path, size, mtime_ns in conn.execute(
+        "SELECT id, path, size, mtime_ns FROM sources"
+    )}
+    _create_temp_tables(conn)
+    token_ids = _token_ids(conn)
+    seen = set()
+    with conn:
+        for benchmark in benchmarks:
+            key = _source_key(benchmark)
+            if key in seen:
+                continue
+            seen.add(key)
+            previous = known.get(key)
+            if previous is not None:
+                source, size, mtime_ns = previous
+                if {"size": size, "mtime_ns": mtime_ns} == fingerprint(benchmark):
+                    report["unchanged"].append(key)
+                    continue
+                _remove_entries(conn, "source = ?", (source,))
+                conn.execute("DELETE FROM sources WHERE id = ?", (source,))
+            _ingest(conn, benchmark, token_ids)
+            report["updated" if previous is not None else "added"].append(key)
+        if prune:
+            for key, (source, _size, _mtime_ns) in known.items():
+                if key not in seen:
+                    _remove_entries(conn, "source = ?", (source,))
+                    conn.execute("DELETE FROM sources WHERE id = ?", (source,))
+                    report["removed"].append(key)
+        _refresh_stats(conn)
+    return report
+
+
+def token_summary(conn: sqlite3.Connection, token: str) -> dict[str, Any] | None:
+    """Stats of one token, overall and per model; None if it was never scored."""
+    row = conn.execute(
+        "SELECT t.id, s.count, s.total, s.min, s.max FROM tokens t "
+        "JOIN token_stats s ON s.token = t.id WHERE t.token = ?",
+        (token,),
+    ).fetchone()
+    if row is None:
+        return None
+    token_id, count, total, lo, hi = row
+    models = [
+        {"model": model, "count": n, "mean": t / n, "min": mn, "max": mx}
+        for model, n, t, mn, mx in conn.execute(
+            "SELECT model, count, total, min, max FROM model_stats WHERE token = ? "
+            "ORDER BY total / count DESC",
+            (token_id,),
+        )
+    ]
+    return {
+        "token": token,
+        "id": token_id,
+        "count": count,
+        "mean": total / count,
+        "min": lo,
+        "max": hi,
+        "models": models,
+    }
+
+
+def token_occurrences(
+    conn: sqlite3.Connection, token_id: int, limit: int, *, lowest: bool = False
+) -> list[tuple[str, str, str, int, int, int, float]]:
+    """(game, seed, model, round, seq, pos, score) of the highest (or lowest) scores of a token."""
+    return conn.execute(
+        "SELECT e.game, e.seed, e.model, o.round, o.seq, o.pos, o.score "
+        "FROM occurrences o JOIN entries e ON e.id = o.entry WHERE o.token = ? "
+        f"ORDER BY o.score {'ASC' if lowest else 'DESC'} LIMIT ?",
+        (token_id, limit),
+    ).fetchall()
+
+
+def top_tokens(
+    conn: sqlite3.Connection,
+    *,
+    order: str = "mean",
+    model: str | None = None,
+    min_count: int = 1,
+    limit: int = 20,
+    lowest: bool = False,
+) -> list[tuple[str, int, float, float, float]]:
+    """(token, count, mean, min, max) of the tokens ranking first by ``order``."""
+    table, where, params = "token_stats", "count >= ?", [min_count]
+    if model is not None:
+        table, where = "model_stats", "model = ? AND count >= ?"
+        params.insert(0, model)
+    return conn.execute(
+        f"SELECT t.token, s.count, s.total / s.count, s.min, s.max FROM {table} s "
+        f"JOIN tokens t ON t.id = s.token WHERE {where} "
+        f"ORDER BY {ORDERS[order]} {'ASC' if lowest else 'DESC'} LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+
+
+def _existing_index(path: Path) -> sqlite3.Connection:
+    if not path.exists():
+        raise click.ClickException(f"No token index at {path}; build it with `update` first.")
+    return open_index(path)
+
+
+index_option = click.option(
+    "--index",
+    "index",
+    type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
+    default=DEFAULT_INDEX,
+    show_default=True,
+    help="Path to the token index database.",
+)
+
+
+@click.group()
+def main() -> None:
+    """Inverted index of token scores across benchmark files."""
+
+
+@main.command()
+@click.option(
+    "--game-data",
+    "game_data",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
+    multiple=True,
+    required=True,
+    help="Path to benchmark JSON (full or filtered). Repeat for several files.",
+)
+@index_option
+@click.option("--prune", is_flag=True, help="Drop the files indexed before but not given now.")
+def update(game_data: tuple[Path, ...], index: Path, prune: bool) -> None:
+    """Ingest new or changed benchmark files into the index."""
+    with closing(open_index(index)) as conn:
+        report = update_index(conn, game_data, prune=prune)
+        n_entries, n_tokens = conn.execute(
+            "SELECT (SELECT count(*) FROM entries), (SELECT count(*) FROM token_stats)"
+        ).fetchone()
+    for status in ("added", "updated", "removed"):
+        for path in report[status]:
+            click.echo(f"{status}: {path}")
+    click.echo(
+        f"{len(report['unchanged'])} file(s) unchanged. "
+        f"{index} holds {n_entries} entries and {n_tokens} distinct tokens."
+    )
+
+
+@main.command()
+@click.argument("token")
+@index_option
+@click.option(
+    "--occurrences",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Also list this many of the token's highest and lowest scores.",
+)
+def token(token: str, index: Path, occurrences: int) -> None:
+    """Stats of TOKEN (exact text, leading space included), overall and per model."""
+    with closing(_existing_index(index)) as conn:
+        summary = token_summary(conn, token)
+        if summary is None:
+            raise click.ClickException(f"Token {token!r} is not in the index.")
+        click.echo(
+            f"{token!r}: {summary['count']} scores, mean {summary['mean']:.4f}, "
+            f"min {summary['min']:.4f}, max {summary['max']:.4f}"
+        )
+        for stats in summary["models"]:
+            click.echo(
+                f"  {stats['model']:<40} {stats['count']:>8} {stats['mean']:>9.4f} "
+                f"{stats['min']:>9.4f} {stats['max']:>9.4f}"
+            )
+        if occurrences:
+            for label, lowest in (("Highest", False), ("Lowest", True)):
+                click.echo(f"{label} scores:")
+                for game, seed, model, rnd, seq, pos, score in token_occurrences(
+                    conn, summary["id"], occurrences, lowest=lowest
+                ):
+                    click.echo(
+                        f"  {score:>9.4f}  {game} {seed} {model} round {rnd} seq {seq} pos {pos}"
+                    )
+
+
+@main.command()
+@index_option
+@click.option(
+    "--order",
+    type=click.Choice(list(ORDERS)),
+    default="mean",
+    show_default=True,
+    help="Statistic to rank tokens by.",
+)
+@click.option("--lowest", is_flag=True, help="Rank from the lowest value up.")
+@click.option("--model", help="Only count the scores of this model.")
+@click.option(
+    "--min-count",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Ignore tokens scored fewer times than this.",
+)
+@click.option(
+    "--limit", type=click.IntRange(min=1), default=20, show_default=True, help="Tokens to list."
+)
+def top(index: Path, order: str, lowest: bool, model: str | None, min_count: int, limit: int) -> None:
+    """Tokens ranking first by a statistic of their scores."""
+    with closing(_existing_index(index)) as conn:
+        rows = top_tokens(
+            conn, order=order, model=model, min_count=min_count, limit=limit, lowest=lowest
+        )
+    click.echo(f"{'token':<24} {'count':>8} {'mean':>9} {'min':>9} {'max':>9}")
+    for tok, count, mean, lo, hi in rows:
+        click.echo(f"{tok!r:<24} {count:>8} {mean:>9.4f} {lo:>9.4f} {hi:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
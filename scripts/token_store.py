@@ -0,0 +1,236 @@
+"""Every token score of a benchmark in one memory-mapped binary file.
+
+Token scores are nearly all of a benchmark's bytes, and reading them back from
+JSON means decoding whole entries. The store keeps them as flat columns that
+are sliced in place, without copies or decoding::
+
+    header     magic, version, byte order, and the counts and offsets below
+    scores     float32[n_pairs]    token scores of every reward event, back to back
+    token_ids  int32[n_pairs]      index of each token in the string table
+    ranges     int64[n_ranges, 4]  (round, seq, start, length) of every reward event
+    meta       JSON: the string table ("tokens"), the source's fingerprint, and
+               per entry [game, seed, model, first range, range count]
+
+An entry's ranges are contiguous and ordered by round, then by ``seq``: the
+reward events of a run in the order the web app shows them (see
+``reward_values``). Scores are stored as float32.
+
+Build it with ``python token_store.py --game-data benchmarkResults.json`` and
+read it with :class:`TokenStore`, which maps the file instead of loading it.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import click
+
+from benchmark_io import fingerprint, iter_game_results
+from benchmark_records import get_game_name, get_model, get_seed, reward_values
+
+MAGIC = b"XEGATOKS"
+STORE_VERSION = 2
+# magic, version, byte order, n_pairs, n_ranges, meta offset, meta length
+_HEADER = struct.Struct("<8sIcxxxQQQQ")
+_DATA_OFFSET = 64
+
+
+def store_path(benchmark: Path) -> Path:
+    return benchmark.with_name(benchmark.name + ".tokens.bin")
+
+
+def _pad(f: Any, alignment: int) -> None:
+    f.write(b"\0" * (-f.tell() % alignment))
+
+
+def build_token_store(benchmark: Path, output: Path | None = None) -> Path:
+    """Write the token store of ``benchmark`` in one streaming pass; return its path.
+
+    Only the current entry and the string table are held in memory: the columns
+    are written out as each entry is decoded.
+    """
+    path = output or store_path(benchmark)
+    token_ids: dict[str, int] = {}
+    entries: list[list[Any]] = []
+    n_pairs = n_ranges = 0
+
+    temp_path = path.with_suffix(".tmp")
+    with (
+        temp_path.open("wb") as f,
+        tempfile.TemporaryFile() as ids_file,
+        tempfile.TemporaryFile() as ranges_file,
+    ):
+        f.write(b"\0" * _DATA_OFFSET)
+        for entry in iter_game_results(benchmark):
+            game = get_game_name(entry)
+            first_range = n_ranges
+            scores = array("f")
+            ids = array("i")
+            ranges = array("q")
+            for round_index, run in enumerate(entry.get("game_results") or []):
+                for seq, value in enumerate(reward_values(game, run)):
+                    pairs = value.get("pairs") or []
+                    ranges.extend((round_index, seq, n_pairs + len(scores), len(pairs)))
+                    for tok, score in pairs:
+                        idx = token_ids.get(tok)
+                        if idx is None:
+                            idx = token_ids[tok] = len(token_ids)
+                        ids.append(idx)
+                        scores.append(score)
+            scores.tofile(f)
+            ids.tofile(ids_file)
+            ranges.tofile(ranges_file)
+            n_pairs += len(scores)
+            n_ranges += len(ranges) // 4
+            entries.append(
+                [game, get_seed(entry), get_model(entry), first_range, n_ranges - first_range]
+            )
+
+        for column, alignment in ((ids_file, 4), (ranges_file, 8)):
+            _pad(f, alignment)
+            column.seek(0)
+            shutil.copyfileobj(column, f)
+
+        meta_offset = f.tell()
+        meta = json.dumps(
+            {"source": fingerprint(benchmark), "tokens": list(token_ids), "entries": entries},
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode()
+        f.write(meta)
+        f.seek(0)
+        byte_order = b"<" if sys.byteorder == "little" else b">"
+        f.write(
+            _HEADER.pack(MAGIC, STORE_VERSION, byte_order, n_pairs, n_ranges, meta_offset, len(meta))
+        )
+    temp_path.replace(path)
+    return path
+
+
+class TokenStore:
+    """Read access to a token store, through a read-only memory map.
+
+    ``sequences`` returns memoryviews into the map (``'i'`` token ids and
+    ``'f'`` scores); wrap them with ``numpy.frombuffer`` for array maths without
+    a copy. Close the store (or use it as a context manager) only once they are
+    no longer used.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order, n_pairs, n_ranges, meta_offset, meta_length = (
+            _HEADER.unpack_from(self._mmap)
+        )
+        if magic != MAGIC or version != STORE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {STORE_VERSION} token store")
+        if byte_order != (b"<" if sys.byteorder == "little" else b">"):
+            self._mmap.close()
+            raise ValueError(f"{path} was written on a machine of another byte order")
+
+        buf = memoryview(self._mmap)
+        ids_offset = _DATA_OFFSET + 4 * n_pairs
+        ranges_offset = ids_offset + 4 * n_pairs
+        ranges_offset += -ranges_offset % 8
+        self._views = [buf]
+        self.scores = self._view(buf, _DATA_OFFSET, 4 * n_pairs, "f")
+        self.token_ids = self._view(buf, ids_offset, 4 * n_pairs, "i")
+        self._ranges = self._view(buf, ranges_offset, 32 * n_ranges, "q")
+
+        meta = json.loads(bytes(buf[meta_offset : meta_offset + meta_length]))
+        self.source: dict[str, int] = meta["source"]
+        self.tokens: list[str] = meta["tokens"]
+        self._entries: list[list[Any]] = meta["entries"]
+        # A repeated (game, seed, model) keeps its last entry, like the other scripts
+        self._by_key = {(game, seed, model): i for i, (game, seed, model, _, _) in enumerate(self._entries)}
+
+    def _view(self, buf: memoryview, offset: int, length: int, fmt: str) -> memoryview:
+        view = buf[offset : offset + length].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def __enter__(self) -> TokenStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+    def is_fresh(self, benchmark: Path) -> bool:
+        """Whether the store was built from ``benchmark`` as it is now."""
+        return self.source == fingerprint(benchmark)
+
+    def keys(self) -> list[tuple[str, str, str]]:
+        """(game, seed, model) of every entry, in benchmark order."""
+        return [(game, seed, model) for game, seed, model, _, _ in self._entries]
+
+    def _entry_ranges(self, key: tuple[str, str, str]) -> Iterator[tuple[int, int, int, int]]:
+        _game, _seed, _model, first, count = self._entries[self._by_key[key]]
+        r = self._ranges
+        for i in range(4 * first, 4 * (first + count), 4):
+            yield r[i], r[i + 1], r[i + 2], r[i + 3]
+
+    def rounds(self, game: str, seed: str, model: str) -> int:
+        """Number of rounds of an entry with reward events."""
+        return max((rnd + 1 for rnd, _seq, _start, _length in self._entry_ranges((game, seed, model))), default=0)
+
+    def sequences(
+        self, game: str, seed: str, model: str, round_index: int
+    ) -> list[tuple[memoryview, memoryview]]:
+        """(token ids, scores) of every reward event of a round, as views into the map.
+
+        Raises KeyError for an unknown (game, seed, model).
+        """
+        return [
+            (self.token_ids[start : start + length], self.scores[start : start + length])
+            for rnd, _seq, start, length in self._entry_ranges((game, seed, model))
+            if rnd == round_index
+        ]
+
+    def pairs(self, game: str, seed: str, model: str, round_index: int) -> list[list[tuple[str, float]]]:
+        """The (token, score) pairs of every reward event of a round, decoded."""
+        return [
+            [(self.tokens[tok], score) for tok, score in zip(ids, scores)]
+            for ids, scores in self.sequences(game, seed, model, round_index)
+        ]
+
+
+@click.command()
+@click.option(
+    "--game-data",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
+    required=True,
+    help="Path to benchmark JSON (full or filtered).",
+)
+@click.option(
+    "--output",
+    type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
+    help="Where to write the store.  [default: <game-data>.tokens.bin]",
+)
+def main(game_data: Path, output: Path | None) -> None:
+    """Write every token score of a benchmark to a memory-mappable binary store."""
+    path = build_token_store(game_data, output)
+    with TokenStore(path) as store:
+        click.echo(
+            f"Wrote {len(store.scores)} token scores of {len(store.keys())} entries "
+            f"({len(store.tokens)} distinct tokens, {path.stat().st_size / 1e6:.1f} MB) to {path}."
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""Keep a benchmark resident and regenerate its outputs as it grows.
+
+The pipeline scripts each start cold and parse the whole benchmark. This one
+parses it once, keeping only what the outputs need (every group's byte spans,
+run scores and entry hash), then polls the file: when its size or mtime change,
+only the entries appended since the previous pass are parsed, and only the
+outputs of the groups they belong to are rebuilt:
+
+- ``--switchiest``: the selection of find_switchiest.py; only changed groups
+  are rescored, and the file is rewritten only when the selection or one of the
+  selected groups changes
+- ``--export-dir``: one export_barrace_csv.py dataset per group, as its batch
+  mode writes them
+- ``--daily-dir``: the game files, games index and month files of
+  generate_daily_games.py; month files are rewritten only when their contents
+  change
+
+A benchmark that was rewritten rather than appended to (its bytes up to the
+last parsed entry differ) is parsed again from the start. Everything runs in
+this process and its worker pools; stop it with Ctrl-C.
+
+    python watch.py --game-data benchmarkResults.json --switchiest switchiest.json \\
+        --daily-dir public/daily --games-dir public/games
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import os
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import click
+
+from benchmark_io import (
+    fingerprint,
+    iter_appended_spans,
+    iter_game_result_spans,
+    read_game_result,
+    write_game_results,
+)
+from benchmark_records import Entry
+from export_barrace_csv import export_batch
+from find_switchiest import DEFAULT_METRICS, ENGINES, Scored, rank_key, resolve_weights, score_group
+from generate_daily_games import (
+    GAME_FORMATS,
+    DailyManifest,
+    GameGroup,
+    months_between,
+    parse_month,
+    update_games,
+    write_daily_files,
+)
+
+GroupKey = tuple[str, str]
+_CHUNK_SIZE = 1 << 20
+
+
+@dataclass(slots=True)
+class ResidentGroup:
+    spans: list[tuple[int, int]] = field(default_factory=list)
+    # {model: run scores}; like the scripts, a repeated model keeps its last entry
+    scores: dict[str, array[float]] = field(default_factory=dict)
+    # Of the group's entry bytes in benchmark order, as generate_daily_games hashes them
+    digest: Any = field(default_factory=hashlib.sha256)
+
+
+@dataclass(slots=True)
+class Change:
+    groups: list[GroupKey]
+    entries: int
+    reloaded: bool
+
+
+def _hash_range(f: BinaryIO, digest: Any, start: int, stop: int) -> Any:
+    f.seek(start)
+    remaining = stop - start
+    while remaining > 0:
+        chunk = f.read(min(_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest
+
+
+class ResidentBenchmark:
+    """The groups of a benchmark file, kept up to date by :meth:`refresh`."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.groups: dict[GroupKey, ResidentGroup] = {}
+        self._fingerprint: dict[str, int] | None = None
+        # End of the last parsed entry, and the hash of the bytes before it
+        self._end = 0
+        self._prefix = hashlib.sha256()
+
+    def refresh(self) -> Change | None:
+        """Parse what changed since the previous call; None if the file did not change.
+
+        Raises ValueError, leaving the state as it was, if the file cannot be
+        parsed (e.g. while it is being written); call again later.
+        """
+        source = fingerprint(self.path)
+        if source == self._fingerprint:
+            return None
+
+        with self.path.open("rb") as f:
+            appended = (
+                self._end > 0
+                and source["size"] > self._end
+                and _hash_range(f, hashlib.sha256(), 0, self._end).digest() == self._prefix.digest()
+            )
+            if appended:
+                spans = iter_appended_spans(self.path, self._end, skip_xrt_history=True)
+            else:
+                spans = iter_game_result_spans(self.path, skip_xrt_history=True)
+            new = [(offset, length, Entry.from_json(entry)) for offset, length, entry in spans]
+
+            if not appended:
+                self.groups = {}
+                self._end = 0
+                self._prefix = hashlib.sha256()
+            changed: dict[GroupKey, None] = {}
+            for offset, length, record in new:
+                group = self.groups.setdefault(record.key, ResidentGroup())
+                group.spans.append((offset, length))
+                group.scores[record.model] = record.scores
+                f.seek(offset)
+                group.digest.update(f.read(length))
+                changed[record.key] = None
+            if new:
+                offset, length, _record = new[-1]
+                _hash_range(f, self._prefix, self._end, offset + length)
+                self._end = offset + length
+
+        self._fingerprint = source
+        return Change(list(changed), len(new), not appended)
+
+    def spans(self, keys: list[GroupKey]) -> dict[GroupKey, list[tuple[int, int]]]:
+        return {key: self.groups[key].spans for key in keys}
+
+    def game_groups(self) -> list[GameGroup]:
+        """Every group as ``generate_daily_games.update_games`` takes them."""
+        return [
+            (game, seed, group.spans, group.digest.hexdigest())
+            for (game, seed), group in self.groups.items()
+        ]
+
+
+class SwitchiestOutput:
+    """The entries of the switchiest groups, as written by find_switchiest.py."""
+
+    def __init__(
+        self, output: Path, top_n: int, top_k: int, weights: dict[str, float], engine: str
+    ) -> None:
+        self.output = output
+        self.top_n = top_n
+        self.top_k = top_k
+        self.weights = weights
+        self.engine = engine
+        self._scored: dict[GroupKey, Scored] = {}
+        self._selected: list[GroupKey] | None = None
+
+    def update(self, bench: ResidentBenchmark, change: Change) -> bool:
+        """Rescore the changed groups; return whether the output was rewritten."""
+        if change.reloaded:
+            self._scored = {}
+        for key in change.groups:
+            self._scored[key] = (
+                key,
+                *score_group(bench.groups[key].scores, self.top_n, self.engine, self.weights),
+            )
+        top = heapq.nsmallest(self.top_k, self._scored.values(), key=rank_key)
+        selected = [key for key, *_rest in top]
+        if selected == self._selected and self.output.exists() and not set(selected) & set(change.groups):
+            return False
+
+        spans = sorted(span for key in selected for span in bench.groups[key].spans)
+        temp_file = self.output.with_suffix(".tmp")
+        with bench.path.open("rb") as f:
+            write_game_results(temp_file, (read_game_result(f, offset, length) for offset, length in spans))
+        temp_file.replace(self.output)
+        self._selected = selected
+        return True
+
+
+class DailyOutput:
+    """Game files, games index and month files, as written by generate_daily_games.py.
+
+    ``months=None`` follows the calendar: the current month.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        games_dir: Path,
+        months: list[tuple[int, int]] | None,
+        seed: int,
+        game_format: str,
+        precision: int,
+        precompress: bool,
+        jobs: int,
+    ) -> None:
+        self.output_dir = output_dir
+        self.games_dir = games_dir
+        self.months = months
+        self.seed = seed
+        self.game_format = game_format
+        self.precision = precision
+        self.precompress = precompress
+        self.jobs = jobs
+        output_dir.mkdir(parents=True, exist_ok=True)
+        games_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = DailyManifest(output_dir)
+        # Months and games of the month files last written
+        self._published: tuple[list[tuple[int, int]], list[dict[str, Any]]] | None = None
+
+    def current_months(self) -> list[tuple[int, int]]:
+        if self.months is not None:
+            return self.months
+        # Without an explicit range, follow the calendar
+        now = datetime.now()
+        return [(now.year, now.month)]
+
+    def update(self, bench: ResidentBenchmark | None) -> list[str]:
+        """Update the game files of changed groups (``bench=None``: none changed),
+        then the month files if the months or the games to assign changed.
+        Returns the game files written.
+        """
+        written: list[str] = []
+        if bench is None and self._published is None:
+            # Nothing to assign before the benchmark is first loaded
+            return written
+        if bench is not None:
+            written = update_games(
+                bench.path,
+                self.games_dir,
+                self.manifest,
+                self.game_format,
+                self.precision,
+                self.jobs,
+                groups=bench.game_groups(),
+            )
+        published = (self.current_months(), self.manifest.available_games())
+        if written or published != self._published:
+            write_daily_files(
+                self.manifest,
+                published[0],
+                self.output_dir,
+                self.games_dir,
+                self.seed,
+                self.game_format,
+                self.precompress,
+            )
+            self._published = published
+        elif bench is not None:
+            self.manifest.save()
+        return written
+
+
+def _log(message: str) -> None:
+    click.echo(f"[{datetime.now():%H:%M:%S}] {message}")
+
+
+@click.command()
+@click.option(
+    "--game-data",
+    type=click.Path(path_type=Path, exists=True, dir_okay=False, file_okay=True),
+    required=True,
+    help="Path to the benchmark JSON to watch.",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0.1),
+    default=2.0,
+    show_default=True,
+    help="Seconds between two checks of the benchmark.",
+)
+@click.option("--once", is_flag=True, help="Build the outputs once and exit instead of watching.")
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes writing game and export files.  [default: CPU count]",
+)
+@click.option(
+    "--switchiest",
+    type=click.Path(path_type=Path, dir_okay=False, file_okay=True),
+    help="Keep the entries of the switchiest groups in this file (see find_switchiest.py).",
+)
+@click.option("--top-n", type=click.IntRange(min=1), default=5, show_default=True, help="Switchiest: top-N frontier.")
+@click.option("--top-k", type=click.IntRange(min=1), default=10, show_default=True, help="Switchiest: groups selected.")
+@click.option(
+    "--metric",
+    "metric_specs",
+    type=str,
+    multiple=True,
+    default=DEFAULT_METRICS,
+    show_default=True,
+    help="Switchiest: metric to rank by, as NAME or NAME=WEIGHT (repeatable).",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(ENGINES),
+    default=ENGINES[0],
+    show_default=True,
+    help="Switchiest: implementation.",
+)
+@click.option(
+    "--export-dir",
+    type=click.Path(path_type=Path, file_okay=False, dir_okay=True),
+    help="Keep one bar-race dataset per group in this directory (see export_barrace_csv.py).",
+)
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["csv", "json", "compact", "split"], case_sensitive=False),
+    default="csv",
+    show_default=True,
+    help="Export: dataset format.",
+)
+@click.option(
+    "--precision",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Export: decimals kept in JSON floats.  [default: exact; 3 for compact and split]",
+)
+@click.option(
+    "--daily-dir",
+    type=click.Path(path_type=Path, file_okay=False, dir_okay=True),
+    help="Keep the daily month files in this directory (see generate_daily_games.py).",
+)
+@click.option(
+    "--games-dir",
+    type=click.Path(path_type=Path, file_okay=False, dir_okay=True),
+    default=Path("public/games"),
+    show_default=True,
+    help="Daily: directory of the game files.",
+)
+@click.option("--from", "from_month", help="Daily: first month to assign (YYYY-MM).  [default: the current month]")
+@click.option("--to", "to_month", help="Daily: last month to assign (YYYY-MM).  [default: --from]")
+@click.option("--seed", type=int, default=42, show_default=True, help="Daily: random seed of the assignment.")
+@click.option(
+    "--game-format",
+    type=click.Choice(GAME_FORMATS),
+    default="json",
+    show_default=True,
+    help="Daily: format of the game files.",
+)
+@click.option(
+    "--game-precision",
+    type=click.IntRange(min=0),
+    default=3,
+    show_default=True,
+    help="Daily: decimals kept in game file floats.",
+)
+@click.option("--precompress", is_flag=True, help="Also keep .gz/.br siblings of the exported, game and month files.")
+def main(
+    game_data: Path,
+    interval: float,
+    once: bool,
+    jobs: int | None,
+    switchiest: Path | None,
+    top_n: int,
+    top_k: int,
+    metric_specs: tuple[str, ...],
+    engine: str,
+    export_dir: Path | None,
+    fmt: str,
+    precision: int | None,
+    daily_dir: Path | None,
+    games_dir: Path,
+    from_month: str | None,
+    to_month: str | None,
+    seed: int,
+    game_format: str,
+    game_precision: int,
+    precompress: bool,
+) -> None:
+    """Load a benchmark once and keep its outputs up to date as it changes."""
+    if switchiest is None and export_dir is None and daily_dir is None:
+        raise click.UsageError("Nothing to do: give --switchiest, --export-dir and/or --daily-dir.")
+    if to_month is not None and from_month is None:
+        raise click.UsageError("--to requires --from.")
+    months = None
+    if from_month is not None:
+        try:
+            start = parse_month(from_month)
+            months = months_between(start, parse_month(to_month) if to_month is not None else start)
+        except ValueError:
+            raise click.BadParameter("months must be given as YYYY-MM.", param_hint="--from/--to") from None
+        if not months:
+            raise click.BadParameter("--to must not be before --from.", param_hint="--from/--to")
+    jobs = jobs or os.cpu_count() or 1
+
+    switchiest_output = (
+        SwitchiestOutput(switchiest, top_n, top_k, resolve_weights(metric_specs, engine), engine)
+        if switchiest is not None
+        else None
+    )
+    daily_output = (
+        DailyOutput(daily_dir, games_dir, months, seed, game_format, game_precision, precompress, jobs)
+        if daily_dir is not None
+        else None
+    )
+
+    bench = ResidentBenchmark(game_data)
+    _log(f"Watching {game_data} every {interval:g}s" if not once else f"Loading {game_data}")
+    try:
+        while True:
+            try:
+                change = bench.refresh()
+            except ValueError as e:
+                # Most likely caught mid-write: try again on the next check
+                _log(f"Could not parse {game_data} ({e}); retrying")
+                change = None
+            except FileNotFoundError:
+                _log(f"{game_data} is missing; waiting for it")
+                change = None
+
+            if change is not None and change.groups:
+                what = "Loaded" if change.reloaded else "Appended"
+                _log(f"{what} {change.entries} entries in {len(change.groups)} groups")
+                if switchiest_output is not None and switchiest_output.update(bench, change):
+                    _log(f"Wrote {switchiest}")
+                if export_dir is not None:
+                    export_batch(
+                        game_data,
+                        change.groups,
+                        export_dir,
+                        fmt,
+                        jobs,
+                        precompress,
+                        precision,
+                        spans=bench.spans(change.groups),
+                    )
+            if daily_output is not None and (change is not None or daily_output.months is None):
+                written = daily_output.update(bench if change is not None and change.groups else None)
+                if written:
+                    _log(f"Wrote {len(written)} game files to {games_dir}")
+
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        _log("Stopped")
+
+
+if __name__ == "__main__":
+    main()
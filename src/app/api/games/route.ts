@@ -1,19 +1,54 @@
-import { NextResponse } from "next/server";
+import { NextResponse, type NextRequest } from "next/server";
 import { promises as fs } from "fs";
+import { createHash } from "crypto";
 import path from "path";
+import { GamesIndexSchema, type GameListing } from "@/lib/daily";
 
-export async function GET() {
-  const dir = path.join(process.cwd(), "public", "games");
+const GAMES_DIR = path.join(process.cwd(), "public", "games");
+const INDEX_FILE = path.join(GAMES_DIR, "index.json");
+
+type Listing = { key: string; body: string; etag: string };
+
+// Last listing built, reused until the index (or, without one, the directory) changes mtime
+let cached: Listing | null = null;
+
+async function readListing(): Promise<GameListing[]> {
+  try {
+    const index = GamesIndexSchema.parse(JSON.parse(await fs.readFile(INDEX_FILE, "utf8")));
+    return index.games.map((g) => ({ name: path.basename(g.gameUrl), url: g.gameUrl, ...g }));
+  } catch (e) {
+    if ((e as NodeJS.ErrnoException).code !== "ENOENT") throw e;
+  }
+  // No index.json (games not written by generate_daily_games.py): list the directory
+  const entries = await fs.readdir(GAMES_DIR, { withFileTypes: true });
+  return entries
+    .filter((e) => e.isFile() && e.name.endsWith(".json") && e.name !== "index.json")
+    .map((e) => ({
+      name: e.name,
+      url: `/games/${e.name}`,
+    }));
+}
+
+async function getListing(): Promise<Listing> {
+  const stat = await fs.stat(INDEX_FILE).catch(() => fs.stat(GAMES_DIR));
+  const key = `${stat.isDirectory() ? "dir" : "index"}:${stat.mtimeMs}:${stat.size}`;
+  if (cached?.key === key) return cached;
+
+  const body = JSON.stringify({ files: await readListing() });
+  const etag = `"${createHash("sha1").update(body).digest("hex").slice(0, 20)}"`;
+  cached = { key, body, etag };
+  return cached;
+}
+
+export async function GET(request: NextRequest) {
   try {
-    const entries = await fs.readdir(dir, { withFileTypes: true });
-    const files = entries
-      .filter((e) => e.isFile() && e.name.endsWith(".json"))
-      .map((e) => ({
-        name: e.name,
-        url: `/games/${e.name}`,
-      }));
-    return NextResponse.json({ files });
+    const { body, etag } = await getListing();
+    const headers = { ETag: etag, "Cache-Control": "no-cache" };
+    if (request.headers.get("if-none-match") === etag) {
+      return new NextResponse(null, { status: 304, headers });
+    }
+    return new NextResponse(body, { headers: { ...headers, "Content-Type": "application/json" } });
   } catch (e) {
     return NextResponse.json({ files: [], error: e instanceof Error ? e.message : String(e) }, { status: 500 });
   }
-}
\ No newline at end of file
+}
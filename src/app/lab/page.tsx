@@ -12,20 +12,28 @@ import { BarRace } from "@/components/BarRace";
 import { Slider } from "@/components/Slider";
 import { ControlBar } from "@/components/ControlBar";
 import DailyCalendar from "@/components/DailyCalendar";
+import type { GameListing } from "@/lib/daily";
 import { useDailyGameSelection } from "@/hooks/useDailyGameSelection";
 
 export default function LabPage() {
   const { selectedDateUTC, selectDate } = useDailyGameSelection("2025-09-05");
   const [datasetUrl, setDatasetUrl] = useState<string | null>(null);
-  const { game, raceData, error } = useDataset(datasetUrl);
+  const { game, raceData, loadedUrl, error } = useDataset(datasetUrl, (rd) => Object.keys(rd.tokenShards));
 
   // List game files from the local API for easy selection
-  const [availableFiles, setAvailableFiles] = useState<Array<{ name: string; url: string }>>([]);
+  const [availableFiles, setAvailableFiles] = useState<GameListing[]>([]);
   const [selectedFile, setSelectedFile] = useState<string>("");
+  const [typeFilter, setTypeFilter] = useState<string>("");
+  const gameTypes = useMemo(
+    () => Array.from(new Set(availableFiles.flatMap((f) => (f.gameType ? [f.gameType] : [])))).sort(),
+    [availableFiles]
+  );
+  const listedFiles = typeFilter ? availableFiles.filter((f) => f.gameType === typeFilter) : availableFiles;
 
   useEffect(() => {
     let isMounted = true;
-    fetch("/api/games", { cache: "no-store" })
+    // Revalidates with the ETag of the listing
+    fetch("/api/games", { cache: "no-cache" })
       .then((r) => r.json())
       .then((json) => {
         if (isMounted) setAvailableFiles(json.files ?? []);
@@ -52,7 +60,7 @@ export default function LabPage() {
   const [roundIndex, setRoundIndex] = useState(0);
   useEffect(() => {
     setRoundIndex(0);
-  }, [raceData]);
+  }, [loadedUrl]);
 
   // Events detection and selection
   const allEvents = useMemo(() => (raceData ? computeEvents(raceData) : []), [raceData]);
@@ -169,6 +177,23 @@ export default function LabPage() {
 
       {/* Fixed bottom control bar */}
       <ControlBar>
+        {/* Game type filter (needs the metadata of index.json) */}
+        {gameTypes.length > 0 && (
+          <div className="flex-shrink-0">
+            <label className="block text-xs font-medium mb-1 text-gray-600 dark:text-gray-400">Game</label>
+            <select
+              className="rounded-md border px-3 py-2 bg-transparent text-sm"
+              value={typeFilter}
+              onChange={(e) => setTypeFilter(e.target.value)}
+            >
+              <option value="">All</option>
+              {gameTypes.map((t) => (
+                <option key={t} value={t}>{t}</option>
+              ))}
+            </select>
+          </div>
+        )}
+
         {/* Dataset selector */}
         <div className="flex-shrink-0">
           <label className="block text-xs font-medium mb-1 text-gray-600 dark:text-gray-400">Dataset</label>
@@ -181,8 +206,12 @@ export default function LabPage() {
             }}
           >
             <option value="">— Select a file —</option>
-            {availableFiles.map((f) => (
-              <option key={f.url} value={f.url}>{f.name}</option>
+            {listedFiles.map((f) => (
+              <option key={f.url} value={f.url}>
+                {f.models && f.rounds !== undefined
+                  ? `${f.name} · ${f.models.length} models × ${f.rounds} rounds · ${(f.bytes ?? 0) >> 10} KB`
+                  : f.name}
+              </option>
             ))}
           </select>
         </div>
@@ -17,7 +17,12 @@ import { useTourManager } from "@/hooks/useTourManager";
 
 export default function Home() {
   const { selectedGameUrl, selectedDateUTC, selectDate } = useDailyGameSelection("2025-09-05");
-  const { game, raceData, error, isLoading } = useDataset(selectedGameUrl);
+  const [focusedModelId, setFocusedModelId] = useState<string | null>(null);
+
+  // Token scores show in the bars (every model) if the game has heatmaps, and in the focused model's details
+  const { game, raceData, loadedUrl, error, isLoading } = useDataset(selectedGameUrl, (rd, g) =>
+    g.barRaceOptions?.heatmapLines ? Object.keys(rd.tokenShards) : focusedModelId ? [focusedModelId] : []
+  );
 
   const frames = useMemo(() => (raceData ? raceData.buildFrames() : []), [raceData]);
 
@@ -26,16 +31,15 @@ export default function Home() {
     { isPlaying: true, round: 0, speed: 1 }
   );
 
-  // Reset round to 0 state when race data changes
+  // Reset round to 0 state when another game loads (not when its token scores arrive)
+  const finalist = raceData?.finalists()[0] ?? null;
   useEffect(() => {
     setPlaybackState((s) => ({ ...s, round: 0 }));
-    setFocusedModelId(raceData?.finalists()[0] ?? null);
-  }, [raceData, setPlaybackState]);
+    setFocusedModelId(finalist);
+  }, [loadedUrl, finalist, setPlaybackState]);
 
   const stepDurationMs = Math.max(1, Math.round(1000 / (playbackState.speed || 1)) * 0.7);
 
-  const [focusedModelId, setFocusedModelId] = useState<string | null>(null);
-
   const tourManager = useTourManager({
     raceData,
     playback: playbackState,
@@ -1,22 +1,68 @@
+import { useEffect, useState } from "react";
 import useSWR from "swr";
-import { loadParsedDataset } from "@/lib/dataset";
+import { loadParsedDataset, loadTokenScores } from "@/lib/dataset";
 import type { GameDisplay } from "@/lib/types";
 import type { RaceData } from "@/lib/barRace";
 
-export function useDataset(url: string | null) {
+type TokenScoresState = { base: RaceData; raceData: RaceData; error: unknown };
+
+/** Models whose token scores are displayed, given the loaded game */
+export type TokenScoresFor = (raceData: RaceData, game: GameDisplay) => readonly string[];
+
+/**
+ * Load a game file. Split game files come without token scores: those of the
+ * models picked by `tokenScoresFor` are fetched afterwards, and `raceData` is
+ * replaced once they arrive, so the race renders without waiting for them.
+ * `loadedUrl` is the URL of the game currently returned, which stays the same
+ * while its token scores load.
+ */
+export function useDataset(url: string | null, tokenScoresFor?: TokenScoresFor) {
   const shouldFetch = !!url;
-  const { data, error, isLoading, mutate } = useSWR<{ game: GameDisplay; raceData: RaceData }>(
+  const { data, error, isLoading, mutate } = useSWR<{ url: string; game: GameDisplay; raceData: RaceData }>(
     shouldFetch ? ["dataset", url] : null,
-    () => loadParsedDataset(url as string),
+    async () => ({ url: url as string, ...(await loadParsedDataset(url as string)) }),
     { keepPreviousData: true },
   );
+
+  const base = data?.raceData ?? null;
+  const [tokens, setTokens] = useState<TokenScoresState | null>(null);
+  const current = tokens && tokens.base === base ? tokens : null;
+  const raceData = current?.raceData ?? base;
+
+  // Models whose shards are still missing, joined into a stable effect dependency
+  const wanted = raceData && data && tokenScoresFor ? tokenScoresFor(raceData, data.game) : [];
+  const missing = raceData ? wanted.filter((model) => model in raceData.tokenShards).join("\n") : "";
+
+  useEffect(() => {
+    if (!base || !missing) return;
+    let cancelled = false;
+    loadTokenScores(base.tokenShards, missing.split("\n")).then(
+      (byModel) => {
+        if (cancelled) return;
+        setTokens((prev) => {
+          const rd = prev && prev.base === base ? prev.raceData : base;
+          return { base, raceData: rd.withTokenScores(byModel), error: null };
+        });
+      },
+      (e) => {
+        if (cancelled) return;
+        setTokens((prev) => ({ base, raceData: prev && prev.base === base ? prev.raceData : base, error: e }));
+      },
+    );
+    return () => {
+      cancelled = true;
+    };
+  }, [base, missing]);
+
+  const anyError = error ?? current?.error;
   return {
     game: data?.game ?? null,
-    raceData: data?.raceData ?? null,
+    raceData,
+    loadedUrl: data?.url ?? null,
     isLoading: !!shouldFetch && isLoading,
-    error: error ? (error instanceof Error ? error.message : String(error)) : null,
+    error: anyError ? (anyError instanceof Error ? anyError.message : String(anyError)) : null,
     refetch: () => mutate(),
   } as const;
 }
 
-export default useDataset;
\ No newline at end of file
+export default useDataset;
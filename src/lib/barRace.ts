@@ -1,5 +1,6 @@
 import type { Dataset, RoundModel, TokenScoresList } from "@/lib/types";
 import { deriveModelPresentation } from "@/lib/model-metadata";
+import type { Event } from "@/lib/tour/types";
 
 export interface RoundModelWithBest extends RoundModel {
   bestRoundIndex: number;
@@ -30,7 +31,12 @@ export type BarRaceFrame = BarRaceItem[];
 export class RaceData {
   readonly data: Dataset;
   readonly augmented: AugmentedFrame[];
-  readonly maxAbsScore: number;
+  /** Largest absolute token score; split game files ship it, as their token scores load later */
+  maxAbsScore: number;
+  /** Highlight events shipped with the game file, if any (see computeEvents) */
+  precomputedEvents: Event[] | null = null;
+  /** Shard URL by model, for the models whose token scores are not loaded yet (split game files) */
+  tokenShards: Record<string, string> = {};
 
   constructor(data: Dataset) {
     this.data = data;
@@ -38,6 +44,21 @@ export class RaceData {
     this.maxAbsScore = this.computeMaxAbsScore();
   }
 
+  /**
+   * A copy with the token scores of some models filled in, one list per round.
+   * The shipped maxAbsScore and events are kept, so only the token displays change.
+   */
+  withTokenScores(byModel: Record<string, TokenScoresList[]>): RaceData {
+    const rounds = this.data.rounds.map((round, i) =>
+      round.map((r) => (r.model in byModel ? { ...r, tokenScores: byModel[r.model][i] ?? [] } : r))
+    );
+    const rd = new RaceData({ ...this.data, rounds });
+    rd.maxAbsScore = this.maxAbsScore;
+    rd.precomputedEvents = this.precomputedEvents;
+    rd.tokenShards = Object.fromEntries(Object.entries(this.tokenShards).filter(([model]) => !(model in byModel)));
+    return rd;
+  }
+
   get roundsLength(): number {
     return this.augmented.length;
   }
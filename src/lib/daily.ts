@@ -14,6 +14,24 @@ export const DailyMonthSchema = z.record(z.string(), DailyDaySchema);
 export type DailyDay = z.infer<typeof DailyDaySchema>;
 export type DailyMonth = z.infer<typeof DailyMonthSchema>;
 
+// public/games/index.json, written by scripts/generate_daily_games.py
+export const GameIndexEntrySchema = DailyDaySchema.extend({
+  seed: z.string(),
+  models: z.array(z.string()),
+  rounds: z.number().int().nonnegative(),
+  bytes: z.number().int().nonnegative(),
+});
+
+export const GamesIndexSchema = z.object({
+  version: z.literal(1),
+  games: z.array(GameIndexEntrySchema),
+});
+
+export type GameIndexEntry = z.infer<typeof GameIndexEntrySchema>;
+
+/** A game file listed by /api/games; the metadata is missing without an index.json */
+export type GameListing = { name: string; url: string } & Partial<GameIndexEntry>;
+
 export function parseUTCDate(value: string): Date | null {
   const m = /^\d{4}-\d{2}-\d{2}$/.test(value);
   if (!m) return null;
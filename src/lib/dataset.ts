@@ -1,8 +1,10 @@
-import type { RawElicitResponseEvent } from "./types";
-import { DatasetSchema, type Dataset, type RawBenchmark, RawBenchmarkSchema, type RawRewardEvent, type TokenScoresList, ElicitResponseEventSchema, RewardEventSchema, type RawGameResult } from "./types";
+import type { CompactGame, RaceGame, RawElicitResponseEvent, RawXrtEvent, TokenShard } from "./types";
+import type { Event } from "./tour/types";
+import { CompactGameSchema, RaceGameSchema, TokenShardSchema, DatasetSchema, type Dataset, type RawBenchmark, RawBenchmarkSchema, type RawRewardEvent, type TokenScoresList, ElicitResponseEventSchema, RewardEventSchema, type RawGameResult } from "./types";
 import { DailyMonthSchema, type DailyMonth } from "@/lib/daily";
 import { ALL_GAMES } from "@/components/games/games";
 import type { GameDisplay } from "@/lib/types";
+import type { RaceData } from "./barRace";
 
 export function ensureIsSingleGame(results: RawBenchmark) {
 
@@ -71,6 +73,85 @@ export function getElicitEvents(round: RawGameResult): RawElicitResponseEvent[]
     return round.xrt_history.filter((e) => e.type === "elicit_response").map((e) => ElicitResponseEventSchema.parse(e));
 }
 
+// ---------------- Compact game files ----------------
+
+export function isCompactGame(json: unknown): boolean {
+    return typeof json === "object" && json !== null && (json as { format?: unknown }).format === "xega-compact";
+}
+
+/**
+ * Rebuild the raw benchmark entries of a compact game file (see scripts/compact_format.py),
+ * so that the per-game round converters apply unchanged.
+ */
+export function decodeCompactGame(compact: CompactGame): RawBenchmark {
+    const scale = 10 ** compact.precision;
+    const texts = compact.texts.map((ids) => ids.map((id) => compact.tokens[id]));
+
+    return compact.players.map((id, p) => {
+        const { scores, moves, rewards } = compact.results[p];
+        return {
+            game: { game: compact.game, players: [{ id }] },
+            game_results: scores.map((score, r) => {
+                const xrt_history: RawXrtEvent[] = [];
+                const move = moves[r];
+                if (move !== null) {
+                    xrt_history.push({ type: "elicit_response", response: move });
+                }
+                for (const [rewardScale, text, values] of rewards[r]) {
+                    const tokens = texts[text];
+                    const pairs = values.map((v, i): [string, number] => [tokens[i], v / scale]);
+                    xrt_history.push({ type: "reward", value: { scale: rewardScale, pairs } });
+                }
+                return { scores: { black: score / scale }, xrt_history };
+            }),
+        };
+    });
+}
+
+// ---------------- Split game files ----------------
+
+export function isRaceGame(json: unknown): boolean {
+    return typeof json === "object" && json !== null && (json as { format?: unknown }).format === "xega-race";
+}
+
+/**
+ * Rebuild the raw benchmark entries of a race file, with empty token scores:
+ * each reward event keeps its scale so the per-game round converters apply,
+ * and the token scores are filled in later from the shards (see decodeTokenShard).
+ */
+export function decodeRaceGame(race: RaceGame): RawBenchmark {
+    const scale = 10 ** race.precision;
+    return race.players.map((id, p) => {
+        const { scores, moves, scales } = race.results[p];
+        return {
+            game: { game: race.game, players: [{ id }] },
+            game_results: scores.map((score, r) => {
+                const xrt_history: RawXrtEvent[] = [];
+                const move = moves[r];
+                if (move !== null) {
+                    xrt_history.push({ type: "elicit_response", response: move });
+                }
+                for (const rewardScale of scales[r]) {
+                    xrt_history.push({ type: "reward", value: { scale: rewardScale, pairs: [] } });
+                }
+                return { scores: { black: score / scale }, xrt_history };
+            }),
+        };
+    });
+}
+
+/** Token scores of every round of a shard's player, in display order. */
+export function decodeTokenShard(shard: TokenShard): TokenScoresList[] {
+    const scale = 10 ** shard.precision;
+    const texts = shard.texts.map((ids) => ids.map((id) => shard.tokens[id]));
+    return shard.rounds.map((sequences) =>
+        sequences.map(([text, values]) => {
+            const tokens = texts[text];
+            return values.map((v, i): [string, number] => [tokens[i], v / scale]);
+        })
+    );
+}
+
 // ---------------- High-level fetchers ----------------
 
 export async function getMonth(monthKey: string): Promise<DailyMonth> {
@@ -82,15 +163,58 @@ export async function getMonth(monthKey: string): Promise<DailyMonth> {
     return DailyMonthSchema.parse(json);
 }
 
-export async function getDataset(url: string): Promise<RawBenchmark> {
+export type GameFile = {
+    raw: RawBenchmark;
+    events: Event[] | null;
+    // Split files only: color scale bound, and shard URL by model of the token scores left out of raw
+    maxAbsScore: number | null;
+    tokenShards: Record<string, string>;
+};
+
+export async function getGameFile(url: string): Promise<GameFile> {
     const res = await fetch(url, { cache: "no-store" });
     if (!res.ok) {
         throw new Error(`${res.status} ${res.statusText}`);
     }
-    return RawBenchmarkSchema.parse(await res.json());
+    const json = await res.json();
+    if (isRaceGame(json)) {
+        const race = RaceGameSchema.parse(json);
+        const base = url.slice(0, url.lastIndexOf("/") + 1);
+        return {
+            raw: decodeRaceGame(race),
+            events: (race.events as Event[] | undefined) ?? null,
+            maxAbsScore: race.maxAbsScore,
+            tokenShards: Object.fromEntries(race.players.map((id, p) => [id, base + race.shards[p]])),
+        };
+    }
+    if (isCompactGame(json)) {
+        const compact = CompactGameSchema.parse(json);
+        return { raw: decodeCompactGame(compact), events: (compact.events as Event[] | undefined) ?? null, maxAbsScore: null, tokenShards: {} };
+    }
+    return { raw: RawBenchmarkSchema.parse(json), events: null, maxAbsScore: null, tokenShards: {} };
 }
 
-export function parseDataset(raw: RawBenchmark): { game: GameDisplay; raceData: import("./barRace").RaceData } {
+export async function getTokenScores(shardUrl: string): Promise<TokenScoresList[]> {
+    const res = await fetch(shardUrl);
+    if (!res.ok) {
+        throw new Error(`${res.status} ${res.statusText}`);
+    }
+    return decodeTokenShard(TokenShardSchema.parse(await res.json()));
+}
+
+/** Fetch the token-score shards of some models of a split game (see RaceData.withTokenScores). */
+export async function loadTokenScores(tokenShards: Record<string, string>, models: string[]): Promise<Record<string, TokenScoresList[]>> {
+    const entries = await Promise.all(
+        models.map(async (model) => [model, await getTokenScores(tokenShards[model])] as const)
+    );
+    return Object.fromEntries(entries);
+}
+
+export async function getDataset(url: string): Promise<RawBenchmark> {
+    return (await getGameFile(url)).raw;
+}
+
+export function parseDataset(raw: RawBenchmark, file: Omit<GameFile, "raw"> | null = null): { game: GameDisplay; raceData: RaceData } {
     // Determine game name from raw input (first entry)
     const gameName = raw[0]?.game?.game?.name;
     if (!gameName || typeof gameName !== "string") {
@@ -100,10 +224,15 @@ export function parseDataset(raw: RawBenchmark): { game: GameDisplay; raceData:
     if (!game) throw new Error(`Unknown game '${gameName}'`);
     const rd = game.barRaceData(raw);
     if (!rd) throw new Error("Failed to convert dataset to race data");
+    if (file) {
+        rd.precomputedEvents = file.events;
+        rd.tokenShards = file.tokenShards;
+        if (file.maxAbsScore !== null) rd.maxAbsScore = file.maxAbsScore;
+    }
     return { game, raceData: rd };
 }
 
-export async function loadParsedDataset(url: string): Promise<{ game: GameDisplay; raceData: import("./barRace").RaceData }> {
-    const raw = await getDataset(url);
-    return parseDataset(raw);
+export async function loadParsedDataset(url: string): Promise<{ game: GameDisplay; raceData: RaceData }> {
+    const { raw, ...file } = await getGameFile(url);
+    return parseDataset(raw, file);
 }
\ No newline at end of file
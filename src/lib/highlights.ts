@@ -9,8 +9,11 @@ import { niceModelName } from "./model-metadata";
 
 /**
  * Computes all significant events from race data using all available detectors.
+ * Game files may ship the events precomputed (scripts/highlights.py); detection
+ * only runs when they don't.
  */
 export function computeEvents(race: RaceData): Event[] {
+  if (race.precomputedEvents) return race.precomputedEvents;
   const detectors = allDetectors();
   return detectors.flatMap((fn) => fn(race));
 }
@@ -92,4 +92,69 @@ export const RawGameSchema = z.object({
 export type RawGame = z.infer<typeof RawGameSchema>;
 
 export const RawBenchmarkSchema = z.array(RawGameSchema);
-export type RawBenchmark = z.infer<typeof RawBenchmarkSchema>;
\ No newline at end of file
+export type RawBenchmark = z.infer<typeof RawBenchmarkSchema>;
+
+// -------------------- Compact game files (scripts/compact_format.py) --------------------
+
+// Highlight events precomputed by scripts/highlights.py (see Event in ./tour/types)
+export const PrecomputedEventSchema = z.object({
+  type: z.enum(["big_jump", "first_to_top", "lead_change", "max_token_positive", "max_token_negative"]),
+  modelId: z.string(),
+  round: z.number().int(),
+  magnitudeRaw: z.number(),
+  magnitudeNorm: z.number(),
+  details: z.record(z.string(), z.union([z.string(), z.number()])),
+});
+
+// [scale, index into texts, fixed-point token scores]
+export const CompactRewardSchema = z.tuple([z.number(), z.number().int(), z.array(z.number())]);
+
+export const CompactGameSchema = z.object({
+  format: z.literal("xega-compact"),
+  version: z.literal(1),
+  game: RawGameMetaSchema,
+  precision: z.number().int().nonnegative(),
+  tokens: z.array(z.string()),
+  texts: z.array(z.array(z.number().int())),
+  players: z.array(z.string()),
+  results: z.array(z.object({
+    scores: z.array(z.number()),
+    moves: z.array(z.string().nullable()),
+    rewards: z.array(z.array(CompactRewardSchema)),
+  })),
+  events: z.array(PrecomputedEventSchema).optional(),
+});
+export type CompactGame = z.infer<typeof CompactGameSchema>;
+
+// -------------------- Split game files: race file + token-score shards --------------------
+
+export const RaceGameSchema = z.object({
+  format: z.literal("xega-race"),
+  version: z.literal(1),
+  game: RawGameMetaSchema,
+  precision: z.number().int().nonnegative(),
+  players: z.array(z.string()),
+  results: z.array(z.object({
+    scores: z.array(z.number()),
+    moves: z.array(z.string().nullable()),
+    // Scales of each round's reward events, whose token scores are in the shards
+    scales: z.array(z.array(z.number())),
+  })),
+  maxAbsScore: z.number().nonnegative(),
+  // One per player, relative to the race file
+  shards: z.array(z.string()),
+  events: z.array(PrecomputedEventSchema).optional(),
+});
+export type RaceGame = z.infer<typeof RaceGameSchema>;
+
+export const TokenShardSchema = z.object({
+  format: z.literal("xega-tokens"),
+  version: z.literal(1),
+  player: z.string(),
+  precision: z.number().int().nonnegative(),
+  tokens: z.array(z.string()),
+  texts: z.array(z.array(z.number().int())),
+  // Per round, its token-score sequences in display order: [index into texts, fixed-point scores]
+  rounds: z.array(z.array(z.tuple([z.number().int(), z.array(z.number())]))),
+});
+export type TokenShard = z.infer<typeof TokenShardSchema>;